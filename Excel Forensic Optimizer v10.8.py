@@ -1,8 +1,9 @@
-import os, psutil, time, ctypes, threading, platform, re
+import os, psutil, ctypes, threading, re, queue
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, simpledialog
-import win32com.client
-import pythoncom
+from tkinter import filedialog, ttk, simpledialog
+from forensic_engine import get_backend
+from forensic_pool import ExcelWorkerPool, BatchAudit
+from forensic_cache import ResultCache, ruleset_key
 
 # --- DESIGN SYSTEM ---
 CLR_BG = "#F3F2F1"
@@ -12,6 +13,189 @@ CLR_WARN = "#FFB900"
 CLR_ERR = "#D13438"
 CLR_HEADER = "#201F1E"
 
+FILE_TIMEOUT = 300  # seconds before a hung workbook's Excel worker is killed and respawned
+UI_TICK_MS = 100    # how often the main loop drains worker events
+UI_MAX_EVENTS = 50  # events applied per tick, so a burst of results never freezes the window
+PASSWORD_LIST = os.path.join(os.path.expanduser("~"), ".forensic_pro", "passwords.txt")
+
+# --- VIRTUALIZED RESULTS VIEW ---
+ROW_HEIGHT = 150
+ISSUE_LINES = 3
+HEALTH_RANK = {"Critical": 0, "Needs Optimization": 1, "Fully Compliant": 2}
+SORT_KEYS = {
+    "Input order": lambda m: m["index"],
+    "Health (worst first)": lambda m: (m["rank"], m["index"]),
+    "Size (largest first)": lambda m: (-m["mb"], m["index"]),
+    "Issue count": lambda m: (-len(m["issues"]), m["index"]),
+}
+MIN_SIZES = {"Any": 0, ">= 1 MB": 1, ">= 10 MB": 10, ">= 50 MB": 50, ">= 100 MB": 100}
+WHEEL_EVENTS = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+
+
+def issue_type(issue):
+    m = re.match(r"\s*([A-Za-z][\w /.-]{0,40}?)\s*[(:]", issue)
+    return m.group(1) if m else "Other"
+
+
+def size_mb(size):
+    try: return float(size.split()[0])
+    except (ValueError, IndexError, AttributeError): return -1.0
+
+
+class _ResultRow:
+    """One recycled card: its widgets are created once and re-filled as the view scrolls; a click opens its details."""
+    def __init__(self, canvas, on_click):
+        self.res = None
+        self.frame = tk.Frame(canvas, bg="white", padx=25, pady=10, highlightthickness=1, highlightbackground="#E0E0E0")
+        self.title = tk.Label(self.frame, font=("Segoe UI", 12, "bold"), bg="white", anchor="w")
+        self.title.pack(fill="x")
+        self.size = tk.Label(self.frame, font=("Segoe UI", 9), bg="white", fg="#666", anchor="w")
+        self.size.pack(fill="x")
+        self.status = tk.Label(self.frame, font=("Segoe UI", 9, "bold"), bg="white", anchor="w")
+        self.status.pack(fill="x", pady=(4, 2))
+        self.lines = [tk.Label(self.frame, font=("Segoe UI", 9), bg="white", anchor="w") for _ in range(ISSUE_LINES)]
+        for line in self.lines: line.pack(fill="x")
+        for w in [self.frame, self.title, self.size, self.status] + self.lines:
+            w.bind("<Button-1>", lambda e: self.res and on_click(self.res))
+            w.configure(cursor="hand2")
+        self.window = canvas.create_window(0, -2 * ROW_HEIGHT, window=self.frame, anchor="nw", width=1050, height=ROW_HEIGHT - 10)
+
+    def fill(self, res):
+        self.res = res
+        self.title.config(text=f"📄 {res['name']}  {res['dims']}")
+        self.size.config(text=f"Size: {res['size']}")
+        if res['health'] == "Fully Compliant":
+            self.status.config(text="STATUS: FULLY COMPLIANT", fg=CLR_EXCEL)
+            texts = ["• Structural Audit: Clean UsedRange.", "• Calculation Audit: No Volatile Lag.", "• Security: Clean Metadata."]
+            colors = ["#444"] * ISSUE_LINES
+        else:
+            self.status.config(text=f"STATUS: {res['health'].upper()}", fg=CLR_ERR)
+            issues = res['issues']
+            texts = [f"DETECTED: {p}" if len(p) < 150 else f"DETECTED: {p[:147]}..." for p in issues[:ISSUE_LINES]]
+            if len(issues) > ISSUE_LINES: texts[-1] = f"... and {len(issues) - ISSUE_LINES + 1} more issues (click for the full list)"
+            colors = [CLR_ERR] * ISSUE_LINES
+        texts += [""] * (ISSUE_LINES - len(texts))
+        for line, text, color in zip(self.lines, texts, colors):
+            line.config(text=text, fg=color, bg="#FFF9F9" if text.startswith("DETECTED") else "white")
+
+
+class VirtualResultList:
+    """Result cards for 10k+ workbook batches: only the rows in view exist, and they are recycled on scroll.
+
+    Sorting and filtering run over an in-memory index (per-health and per-issue-type buckets) rather than widgets.
+    Clicking a card shows its full, untruncated issue list in the detail pane below.
+    """
+    def __init__(self, master):
+        self.meta, self.by_health, self.by_type = [], {}, {}
+        self.view, self.rows, self.dirty = [], [], False
+
+        bar = tk.Frame(master, bg=CLR_BG)
+        bar.pack(fill="x", pady=(0, 10))
+        self.sort_var, self.health_var, self.type_var = tk.StringVar(value="Input order"), tk.StringVar(value="All"), tk.StringVar(value="All")
+        self.size_var = tk.StringVar(value="Any")
+        tk.Label(bar, text="Sort:", font=("Segoe UI", 9), bg=CLR_BG).pack(side="left")
+        ttk.Combobox(bar, textvariable=self.sort_var, values=list(SORT_KEYS), state="readonly", width=20).pack(side="left", padx=(5, 15))
+        tk.Label(bar, text="Health:", font=("Segoe UI", 9), bg=CLR_BG).pack(side="left")
+        ttk.Combobox(bar, textvariable=self.health_var, values=["All"] + list(HEALTH_RANK), state="readonly", width=20).pack(side="left", padx=(5, 15))
+        tk.Label(bar, text="Issue type:", font=("Segoe UI", 9), bg=CLR_BG).pack(side="left")
+        self.type_box = ttk.Combobox(bar, textvariable=self.type_var, values=["All"], state="readonly", width=28)
+        self.type_box.pack(side="left", padx=(5, 15))
+        tk.Label(bar, text="Size:", font=("Segoe UI", 9), bg=CLR_BG).pack(side="left")
+        ttk.Combobox(bar, textvariable=self.size_var, values=list(MIN_SIZES), state="readonly", width=10).pack(side="left", padx=5)
+        self.count = tk.Label(bar, font=("Segoe UI", 9), bg=CLR_BG, fg="#605E5C")
+        self.count.pack(side="right")
+        for var in (self.sort_var, self.health_var, self.type_var, self.size_var): var.trace_add("write", lambda *a: self.invalidate())
+
+        detail = tk.Frame(master, bg="white", highlightthickness=1, highlightbackground="#E0E0E0")
+        detail.pack(side="bottom", fill="x", pady=(10, 0))
+        self.detail = tk.Text(detail, height=8, wrap="word", font=("Segoe UI", 9), relief="flat", padx=15, pady=8)
+        detail_scroll = ttk.Scrollbar(detail, orient="vertical", command=self.detail.yview)
+        self.detail.configure(yscrollcommand=detail_scroll.set)
+        self.detail.pack(side="left", fill="both", expand=True)
+        detail_scroll.pack(side="right", fill="y")
+        self.show_detail(None)
+
+        self.canvas = tk.Canvas(master, bg=CLR_BG, highlightthickness=0)
+        scroll = ttk.Scrollbar(master, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=scroll.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        # the wheel is bound application-wide so it scrolls over the cards too; drop it with the canvas
+        self.canvas.bind_all("<MouseWheel>", lambda e: self.wheel(e, -1 if e.delta > 0 else 1))
+        self.canvas.bind_all("<Button-4>", lambda e: self.wheel(e, -1))
+        self.canvas.bind_all("<Button-5>", lambda e: self.wheel(e, 1))
+        self.canvas.bind("<Destroy>", lambda e: [self.canvas.unbind_all(seq) for seq in WHEEL_EVENTS])
+
+    def add(self, res):
+        i = len(self.meta)
+        types = {issue_type(p) for p in res['issues']}
+        self.meta.append({"index": i, "res": res, "rank": HEALTH_RANK.get(res['health'], 0), "mb": size_mb(res['size']),
+                          "issues": res['issues'], "types": types})
+        self.by_health.setdefault(res['health'], []).append(i)
+        new_types = [t for t in types if t not in self.by_type]
+        for t in types: self.by_type.setdefault(t, []).append(i)
+        if new_types: self.type_box.configure(values=["All"] + sorted(self.by_type))
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+        self.refresh()
+        self.canvas.yview_moveto(0)
+
+    def refresh(self):
+        """Rebuild the filtered/sorted index if anything changed, then redraw the visible rows."""
+        if self.dirty:
+            health, kind = self.health_var.get(), self.type_var.get()
+            picked = range(len(self.meta))
+            if health != "All": picked = self.by_health.get(health, [])
+            if kind != "All":
+                typed = set(self.by_type.get(kind, []))
+                picked = [i for i in picked if i in typed]
+            min_mb = MIN_SIZES.get(self.size_var.get(), 0)
+            if min_mb: picked = [i for i in picked if self.meta[i]["mb"] >= min_mb]
+            key = SORT_KEYS.get(self.sort_var.get(), SORT_KEYS["Input order"])
+            self.view = sorted(picked, key=lambda i: key(self.meta[i]))
+            self.canvas.configure(scrollregion=(0, 0, 1050, len(self.view) * ROW_HEIGHT))
+            self.count.config(text=f"Showing {len(self.view)} of {len(self.meta)} workbooks")
+            self.dirty = False
+        self.render()
+
+    def show_detail(self, res):
+        """Full issue list of one workbook, nothing truncated."""
+        if res is None: text = "Click a workbook card to see its full issue list."
+        else:
+            text = f"{res['name']}  {res['dims']}  |  {res['size']}  |  {res['health']}\n"
+            text += "\n".join(f"{n}. {p}" for n, p in enumerate(res['issues'], 1)) or "No issues detected."
+        self.detail.configure(state="normal")
+        self.detail.delete("1.0", "end")
+        self.detail.insert("1.0", text)
+        self.detail.configure(state="disabled")
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+
+    def scroll(self, units):
+        self.canvas.yview_scroll(units, "units")
+        self.render()
+
+    def wheel(self, event, units):
+        if event.widget is not self.detail: self.scroll(units)  # the detail pane scrolls itself
+
+    def render(self):
+        first = max(int(self.canvas.canvasy(0) // ROW_HEIGHT), 0)
+        needed = self.canvas.winfo_height() // ROW_HEIGHT + 2
+        while len(self.rows) < needed: self.rows.append(_ResultRow(self.canvas, self.show_detail))
+        for k, row in enumerate(self.rows):
+            pos = first + k
+            if k < needed and pos < len(self.view):
+                row.fill(self.meta[self.view[pos]]["res"])
+                self.canvas.coords(row.window, 0, pos * ROW_HEIGHT)
+            else:
+                self.canvas.coords(row.window, 0, -2 * ROW_HEIGHT)
+
+
 class ForensicProV108:
     def __init__(self, root):
         self.root = root
@@ -21,6 +205,14 @@ class ForensicProV108:
         
         self.file_paths = []
         self.batch_results = []
+        self.fast_scan = tk.BooleanVar(value=False)
+        self.backend_name = "com"
+        self.worker_count = tk.IntVar(value=1)
+        try: self.cache = ResultCache()
+        except Exception: self.cache = None
+        self.pool, self.pool_key = None, None
+        self.passwords = self.load_passwords()
+        self.root.protocol("WM_DELETE_WINDOW", self.shutdown)
         self.container = tk.Frame(self.root, bg=CLR_BG)
         self.container.pack(fill="both", expand=True, padx=40, pady=20)
         
@@ -28,13 +220,27 @@ class ForensicProV108:
         self.show_home()
 
     def engine_reset(self):
-        """Standard IT Protocol: Clean environment before audit."""
+        """Standard IT Protocol: Clean environment before audit (only Excel instances this tool spawned)."""
         try:
-            for proc in psutil.process_iter(['name']):
-                if proc.info['name'].upper() == "EXCEL.EXE": proc.kill()
+            from forensic_com import kill_tracked
+            kill_tracked()
             ctypes.windll.psapi.EmptyWorkingSet(ctypes.windll.kernel32.GetCurrentProcess())
         except: pass
 
+    def shutdown(self):
+        """Quit the warm Excel instances kept alive between batches, then close the window."""
+        if self.pool: self.pool.close()
+        self.root.destroy()
+
+    def get_pool(self):
+        """Reuse the warm worker pool across batches; rebuild only if the engine or worker count changed."""
+        key = (self.backend_name, self.workers)
+        if self.pool_key != key:
+            if self.pool: self.pool.close()
+            backend_name = self.backend_name
+            self.pool, self.pool_key = ExcelWorkerPool(self.workers, lambda: get_backend(backend_name), timeout=FILE_TIMEOUT), key
+        return self.pool
+
     def show_home(self):
         for widget in self.container.winfo_children(): widget.destroy()
         tk.Label(self.container, text="Excel Forensic Intelligence", font=("Segoe UI", 28, "bold"), bg=CLR_BG).pack(pady=(80, 10))
@@ -43,6 +249,12 @@ class ForensicProV108:
         btn = tk.Button(self.container, text="📂 START DEEP AUDIT", command=self.select_files, 
                         bg=CLR_EXCEL, fg="white", font=("Segoe UI", 11, "bold"), relief="flat", padx=40, pady=15, cursor="hand2")
         btn.pack(pady=40)
+        tk.Checkbutton(self.container, text="Fast COM-free scan (.xlsx/.xlsm/.xlsb/.xls, no Excel required)", variable=self.fast_scan,
+                       bg=CLR_BG, font=("Segoe UI", 9), activebackground=CLR_BG).pack()
+        pool_f = tk.Frame(self.container, bg=CLR_BG)
+        pool_f.pack(pady=5)
+        tk.Label(pool_f, text="Parallel Excel workers:", font=("Segoe UI", 9), bg=CLR_BG).pack(side="left")
+        tk.Spinbox(pool_f, from_=1, to=os.cpu_count() or 1, width=4, textvariable=self.worker_count).pack(side="left", padx=5)
 
     def select_files(self):
         paths = filedialog.askopenfilenames(filetypes=[("Excel Files", "*.xlsx *.xlsm *.xlsb *.xls")])
@@ -51,86 +263,107 @@ class ForensicProV108:
         self.start_audit()
 
     def start_audit(self):
+        self.backend_name = "ooxml" if self.fast_scan.get() else "com"
+        self.workers = max(1, self.worker_count.get())
         for widget in self.container.winfo_children(): widget.destroy()
-        self.pb = ttk.Progressbar(self.container, orient="horizontal", length=700, mode="determinate")
-        self.pb.pack(pady=40)
-        self.status = tk.Label(self.container, text="Initializing Forensic Engine...", bg=CLR_BG, font=("Segoe UI", 10))
-        self.status.pack()
+        self.header = tk.Frame(self.container, bg=CLR_BG)
+        self.header.pack(fill="x")
+        self.pb = ttk.Progressbar(self.header, orient="horizontal", length=700, mode="determinate")
+        self.pb.pack(pady=(20, 10))
+        self.status = tk.Label(self.header, text="Initializing Forensic Engine...", bg=CLR_BG, font=("Segoe UI", 10))
+        self.status.pack(pady=(0, 10))
+        self.btn_frame = tk.Frame(self.container, bg=CLR_BG)
+        self.btn_frame.pack(side="bottom", fill="x", pady=20)
+        self.build_results_view()
+
+        self.events = queue.Queue()
+        self.audit, self.batch_results = None, []
+        self.shown, self.done_count = set(), 0
         threading.Thread(target=self.run_forensics, daemon=True).start()
+        self.root.after(UI_TICK_MS, self.drain_events)
+
+    def load_passwords(self):
+        """Optional password list, one per line, tried on every deferred encrypted file."""
+        try:
+            with open(PASSWORD_LIST, encoding="utf-8") as fh: return [line.rstrip("\n") for line in fh if line.strip()]
+        except OSError: return []
 
     def run_forensics(self):
-        self.batch_results = []
-        pythoncom.CoInitialize()
+        """Worker thread: never touches Tk; everything goes through self.events."""
+        locked = []
         try:
-            excel = win32com.client.DispatchEx("Excel.Application")
-            excel.DisplayAlerts, excel.Visible, excel.AutomationSecurity = False, False, 3
-            
-            for index, path in enumerate(self.file_paths):
-                fname = os.path.basename(path)
-                fsize = os.path.getsize(path) / (1024 * 1024)
-                self.pb['value'] = ((index + 1) / len(self.file_paths)) * 100
-                
-                wb = None
-                password = ""
-                
-                # INTERACTIVE PASSWORD LOGIC
-                attempt = 0
-                while attempt < 3:
-                    try:
-                        wb = excel.Workbooks.Open(path, UpdateLinks=0, ReadOnly=True, Password=password)
-                        break
-                    except Exception as e:
-                        if "password" in str(e).lower():
-                            password = simpledialog.askstring("Encrypted File", f"File '{fname}' is protected.\nEnter Password:", show='*')
-                            if not password: break
-                            attempt += 1
-                        else: break
-
-                if not wb:
-                    self.batch_results.append({"name": fname, "size": "N/A", "dims": "LOCKED", "issues": ["Authentication Failed: Incorrect Password."], "health": "Critical"})
-                    continue
-
-                try:
-                    issues = []
-                    volatile_pattern = re.compile(r"OFFSET\(|INDIRECT\(|TODAY\(|RAND\(")
-                    t_rows, t_cols = 0, 0
-                    
-                    for sh in wb.Sheets:
-                        used = sh.UsedRange
-                        r, c = used.Rows.Count, used.Columns.Count
-                        t_rows += r; t_cols += c
-                        
-                        last_cell = sh.Cells.SpecialCells(11)
-                        if last_cell.Row > 5000 and r < (last_cell.Row * 0.5):
-                            issues.append(f"Phantom Data ({sh.Name}): {last_cell.Row} rows detected vs {r} filled.")
-                        
-                        try:
-                            f_range = used.SpecialCells(-4123).Formula
-                            if volatile_pattern.search(str(f_range)): issues.append(f"Volatile Lag ({sh.Name}): OFFSET/INDIRECT found.")
-                        except: pass
-
-                    if wb.HasVBProject: issues.append("VBA Metadata: Script-based security risk.")
-                    if wb.LinkSources(1): issues.append("External Links: Network dependency detected.")
-
-                    self.batch_results.append({
-                        "name": fname, "size": f"{fsize:.2f} MB", 
-                        "dims": f"[{t_rows}R x {t_cols}C]", 
-                        "issues": issues,
-                        "health": "Fully Compliant" if not issues else "Needs Optimization"
-                    })
-                    wb.Close(False)
-                except Exception as e:
-                    self.batch_results.append({"name": fname, "size": "N/A", "dims": "ERR", "issues": [str(e)], "health": "Critical"})
-            excel.Quit()
-        finally:
-            pythoncom.CoUninitialize()
-            self.root.after(100, self.display_final_audit)
+            self.audit = BatchAudit(self.get_pool(), self.file_paths, on_result=lambda i, res: self.events.put(("result", i, res)),
+                                    cache=self.cache, ruleset=ruleset_key(self.backend_name))
+            locked = self.audit.run(self.passwords)
+        except Exception as e: self.events.put(("error", str(e)))
+        finally: self.events.put(("deferred", locked))
+
+    def retry_deferred(self, password):
+        locked = self.locked
+        try: locked = self.audit.retry(self.locked, [password])
+        except Exception as e: self.events.put(("error", str(e)))
+        finally: self.events.put(("final", locked))
+
+    def drain_events(self):
+        """Main-thread tick: apply queued results, coalescing progress into one update per tick."""
+        handled, finished = 0, None
+        while handled < UI_MAX_EVENTS:
+            try: event = self.events.get_nowait()
+            except queue.Empty: break
+            handled += 1
+            if event[0] == "result":
+                _, index, res = event
+                if index not in self.shown: self.done_count += 1
+                self.add_result_card(index, res)
+            elif event[0] == "error":
+                self.status.config(text=f"Engine Error: {event[1]}", fg=CLR_ERR)
+            else:
+                finished = event
+                break
+        if handled:
+            self.results_view.refresh()
+            total = len(self.file_paths)
+            self.pb['value'] = (self.done_count / total) * 100 if total else 100
+            self.status.config(text=f"Audited {self.done_count} of {total} workbooks...")
+        if finished is None:
+            self.root.after(UI_TICK_MS, self.drain_events)
+        elif finished[0] == "deferred":
+            self.locked = finished[1]
+            self.resolve_deferred()
+        else:
+            self.locked = finished[1]
+            self.display_final_audit()
+
+    def resolve_deferred(self):
+        """Main thread: a single prompt covers every encrypted file the password list could not open."""
+        if self.locked and self.backend_name == "com":
+            names = "\n".join(os.path.basename(self.file_paths[i]) for i in self.locked[:10])
+            more = f"\n... and {len(self.locked) - 10} more" if len(self.locked) > 10 else ""
+            password = simpledialog.askstring("Encrypted Files", f"{len(self.locked)} protected file(s) were deferred:\n{names}{more}\n\nEnter a password to try on all of them:", show='*')
+            if password:
+                self.passwords.append(password)
+                self.status.config(text="Retrying deferred encrypted files...")
+                threading.Thread(target=self.retry_deferred, args=(password,), daemon=True).start()
+                self.root.after(UI_TICK_MS, self.drain_events)
+                return
+        self.display_final_audit()
+
+    def build_results_view(self):
+        self.results_view = VirtualResultList(self.container)
+
+    def add_result_card(self, index, res):
+        if index in self.shown: return
+        self.shown.add(index)
+        self.results_view.add(res)
 
     def display_final_audit(self):
-        for widget in self.container.winfo_children(): widget.destroy()
-        
+        self.batch_results = self.audit.results if self.audit else []
+        for index in self.locked: self.add_result_card(index, self.batch_results[index])
+        self.results_view.refresh()
+        for widget in self.header.winfo_children(): widget.destroy()
+
         # 1. TRIPLE TELEMETRY DASHBOARD
-        sys_f = tk.Frame(self.container, bg="white", padx=20, pady=15, highlightthickness=1, highlightbackground="#DDD")
+        sys_f = tk.Frame(self.header, bg="white", padx=20, pady=15, highlightthickness=1, highlightbackground="#DDD")
         sys_f.pack(fill="x", pady=(0, 20))
         tk.Label(sys_f, text="HARDWARE & RESOURCE TELEMETRY", font=("Segoe UI", 9, "bold"), bg="white", fg=CLR_BLUE).pack(anchor="w")
         
@@ -143,42 +376,10 @@ class ForensicProV108:
         tk.Label(metrics_f, text=f"RAM: {ram}%", font=("Segoe UI", 10, "bold"), bg="white", fg=CLR_BLUE if ram < 80 else CLR_ERR).pack(side="left", padx=20)
         tk.Label(metrics_f, text=f"DISK: {disk}% Used", font=("Segoe UI", 10, "bold"), bg="white").pack(side="left", padx=20)
 
-        # 2. SCROLLABLE VERTICAL RESULTS
-        canvas = tk.Canvas(self.container, bg=CLR_BG, highlightthickness=0)
-        scroll = ttk.Scrollbar(self.container, orient="vertical", command=canvas.yview)
-        frame = tk.Frame(canvas, bg=CLR_BG)
-        frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.create_window((0, 0), window=frame, anchor="nw", width=1050)
-        canvas.configure(yscrollcommand=scroll.set)
-
-        for res in self.batch_results:
-            card = tk.Frame(frame, bg="white", padx=25, pady=20, highlightthickness=1, highlightbackground="#E0E0E0")
-            card.pack(fill="x", pady=10)
-            
-            tk.Label(card, text=f"📄 {res['name']}  {res['dims']}", font=("Segoe UI", 12, "bold"), bg="white").pack(anchor="w")
-            tk.Label(card, text=f"Size: {res['size']}", font=("Segoe UI", 9), bg="white", fg="#666").pack(anchor="w", pady=(2, 10))
-            
-            if res['health'] == "Fully Compliant":
-                tk.Label(card, text="STATUS: FULLY COMPLIANT", font=("Segoe UI", 9, "bold"), fg=CLR_EXCEL, bg="white").pack(anchor="w")
-                compliance = ["Structural Audit: Clean UsedRange.", "Calculation Audit: No Volatile Lag.", "Security: Clean Metadata."]
-                for info in compliance:
-                    tk.Label(card, text=f"• {info}", font=("Segoe UI", 9), fg="#444", bg="white").pack(anchor="w", padx=10)
-            else:
-                tk.Label(card, text=f"STATUS: {res['health'].upper()}", font=("Segoe UI", 9, "bold"), fg=CLR_ERR, bg="white").pack(anchor="w")
-                for prob in res['issues']:
-                    p_frame = tk.Frame(card, bg="#FFF9F9", pady=5)
-                    p_frame.pack(fill="x", pady=2)
-                    tk.Label(p_frame, text=f"DETECTED: {prob}", font=("Segoe UI", 9, "bold"), fg=CLR_ERR, bg="#FFF9F9", wraplength=800, justify="left").pack(anchor="w")
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scroll.pack(side="right", fill="y")
-
-        # 3. CONTROL COMMAND BAR
-        btn_frame = tk.Frame(self.container, bg=CLR_BG)
-        btn_frame.pack(fill="x", pady=20)
-        tk.Frame(btn_frame, bg=CLR_BG).pack(side="left", expand=True)
-        tk.Button(btn_frame, text="ADD MORE FILES", command=self.show_home, bg=CLR_BLUE, fg="white", font=("Segoe UI", 9, "bold"), padx=20, pady=10).pack(side="left", padx=10)
-        tk.Button(btn_frame, text="EXECUTE MASTER OPTIMIZATION", bg=CLR_EXCEL, fg="white", font=("Segoe UI", 9, "bold"), padx=20, pady=10).pack(side="left")
+        # 2. CONTROL COMMAND BAR
+        tk.Frame(self.btn_frame, bg=CLR_BG).pack(side="left", expand=True)
+        tk.Button(self.btn_frame, text="ADD MORE FILES", command=self.show_home, bg=CLR_BLUE, fg="white", font=("Segoe UI", 9, "bold"), padx=20, pady=10).pack(side="left", padx=10)
+        tk.Button(self.btn_frame, text="EXECUTE MASTER OPTIMIZATION", bg=CLR_EXCEL, fg="white", font=("Segoe UI", 9, "bold"), padx=20, pady=10).pack(side="left")
 
 if __name__ == "__main__":
     root = tk.Tk()
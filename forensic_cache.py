@@ -0,0 +1,106 @@
+import os, json, time, sqlite3, hashlib, threading
+from forensic_engine import SCANNER_VERSION, RULESET_VERSION
+from forensic_cost import table_tag
+
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".forensic_pro", "results.sqlite")
+HASH_CHUNK = 1 << 20
+
+
+def ruleset_key(backend_name):
+    """Results from different backends, rule sets or calibrated cost tables never satisfy each other."""
+    return f"{backend_name}:{RULESET_VERSION}:{table_tag()}"
+
+
+class ResultCache:
+    """Persistent per-file result cache keyed on (content hash, scanner version, rule set version).
+
+    A (path, mtime, size) table is consulted before hashing, so unchanged files cost one stat(). It is
+    only written when the file's stat is the same before and after hashing.
+    Entries are evicted least-recently-used once either cap is exceeded.
+    """
+    def __init__(self, path=DEFAULT_CACHE, max_entries=50000, max_bytes=256 * 1024 * 1024):
+        if path != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_entries, self.max_bytes = max_entries, max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                hash TEXT, scanner TEXT, ruleset TEXT, result TEXT, bytes INTEGER, last_used REAL,
+                PRIMARY KEY (hash, scanner, ruleset));
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, hash TEXT, seen REAL);
+            CREATE INDEX IF NOT EXISTS results_lru ON results (last_used);
+        """)
+
+    def content_hash(self, path):
+        st = os.stat(path)
+        key = os.path.normcase(os.path.abspath(path))
+        with self.lock:
+            row = self.db.execute("SELECT mtime_ns, size, hash FROM files WHERE path = ?", (key,)).fetchone()
+        if row and row[0] == st.st_mtime_ns and row[1] == st.st_size: return row[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(HASH_CHUNK), b""): h.update(chunk)
+        digest = h.hexdigest()
+        after = os.stat(path)
+        if (after.st_mtime_ns, after.st_size) != (st.st_mtime_ns, st.st_size): return digest  # written while hashing: no fast path
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", (key, st.st_mtime_ns, st.st_size, digest, time.time()))
+        return digest
+
+    def lookup(self, path, ruleset):
+        """(content hash, cached result or None)."""
+        digest = self.content_hash(path)
+        with self.lock, self.db:
+            row = self.db.execute("SELECT result FROM results WHERE hash = ? AND scanner = ? AND ruleset = ?",
+                                  (digest, SCANNER_VERSION, ruleset)).fetchone()
+            if not row: return digest, None
+            self.db.execute("UPDATE results SET last_used = ? WHERE hash = ? AND scanner = ? AND ruleset = ?",
+                            (time.time(), digest, SCANNER_VERSION, ruleset))
+        res = json.loads(row[0])
+        res["name"] = os.path.basename(path)
+        return digest, res
+
+    def store(self, digest, ruleset, result):
+        if result.get("health") == "Critical": return  # locked / failed files must be retried next time
+        blob = json.dumps(result)
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                            (digest, SCANNER_VERSION, ruleset, blob, len(blob), time.time()))
+
+    def evict(self):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                            (self.max_entries,))
+            self.db.execute("""DELETE FROM results WHERE rowid IN (
+                                   SELECT rowid FROM (SELECT rowid, SUM(bytes) OVER (ORDER BY last_used DESC) AS total FROM results)
+                                   WHERE total > ?)""", (self.max_bytes,))
+            self.db.execute("DELETE FROM files WHERE rowid IN (SELECT rowid FROM files ORDER BY seen DESC LIMIT -1 OFFSET ?)",
+                            (self.max_entries * 2,))
+
+    def close(self):
+        with self.lock: self.db.close()
+
+
+def cached_map(pool, cache, ruleset, paths, on_result=None, **kw):
+    """pool.map() that answers hits straight from the cache and only schedules the misses."""
+    paths = list(paths)
+    results, misses, digests = [None] * len(paths), [], {}
+    for i, p in enumerate(paths):
+        try: digest, res = cache.lookup(p, ruleset)
+        except (OSError, sqlite3.Error): digest, res = None, None
+        if res is None:
+            misses.append(i); digests[i] = digest
+            continue
+        results[i] = res
+        if on_result: on_result(i, res)
+
+    def on_miss(j, res):
+        i = misses[j]
+        results[i] = res
+        if digests[i]: cache.store(digests[i], ruleset, res)
+        if on_result: on_result(i, res)
+
+    pool.map([paths[i] for i in misses], on_result=on_miss, **kw)
+    cache.evict()
+    return results
@@ -0,0 +1,124 @@
+import struct
+from array import array
+
+# --- OLE COMPOUND FILE (CFB) READER ---
+# Reads the header, FAT and directory only; stream data is pulled sector by sector on demand.
+CFB_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+ENDOFCHAIN, FREESECT = 0xFFFFFFFE, 0xFFFFFFFF
+STORAGE, STREAM, ROOT = 1, 2, 5
+NOSTREAM = 0xFFFFFFFF
+
+
+def is_cfb(path):
+    try:
+        with open(path, "rb") as fh: return fh.read(8) == CFB_SIGNATURE
+    except OSError: return False
+
+
+class DirEntry:
+    def __init__(self, name, kind, left, right, child, start, size):
+        self.name, self.kind, self.left, self.right, self.child = name, kind, left, right, child
+        self.start, self.size = start, size
+        self.path = name
+
+
+class CompoundFile:
+    """Directory-level view of a compound file; `entries` maps '/'-joined paths (case-insensitive) to DirEntry."""
+    def __init__(self, path):
+        self.fh = open(path, "rb")
+        hdr = self.fh.read(512)
+        if hdr[:8] != CFB_SIGNATURE: raise ValueError("not an OLE compound file")
+        self.sector_size = 1 << struct.unpack_from("<H", hdr, 0x1E)[0]
+        self.mini_size = 1 << struct.unpack_from("<H", hdr, 0x20)[0]
+        n_fat, first_dir = struct.unpack_from("<II", hdr, 0x2C)
+        self.mini_cutoff, first_minifat, n_minifat, first_difat, n_difat = struct.unpack_from("<IIIII", hdr, 0x38)
+
+        difat = list(struct.unpack_from("<109I", hdr, 0x4C))
+        sect, per = first_difat, self.sector_size // 4 - 1
+        for _ in range(n_difat):
+            if sect >= ENDOFCHAIN: break
+            vals = struct.unpack(f"<{per + 1}I", self._sector(sect))
+            difat.extend(vals[:per]); sect = vals[per]
+        self.fat = array("I")
+        for s in difat[:n_fat]:
+            if s < ENDOFCHAIN: self.fat.frombytes(self._sector(s))
+
+        raw = b"".join(self._sector(s) for s in self._chain(first_dir))
+        self.dir = []
+        for off in range(0, len(raw) - 127, 128):
+            name_len, kind = struct.unpack_from("<HB", raw, off + 64)
+            left, right, child = struct.unpack_from("<III", raw, off + 68)
+            start, size = struct.unpack_from("<IQ", raw, off + 116)
+            name = raw[off:off + max(name_len - 2, 0)].decode("utf-16-le", "replace")
+            if self.sector_size == 512: size &= 0xFFFFFFFF
+            self.dir.append(DirEntry(name, kind, left, right, child, start, size))
+        self.entries = {}
+        if self.dir: self._walk(self.dir[0].child, "")
+
+        self.minifat = array("I")
+        for s in self._chain(first_minifat): self.minifat.frombytes(self._sector(s))
+
+    def _sector(self, n):
+        self.fh.seek((n + 1) * self.sector_size)
+        return self.fh.read(self.sector_size)
+
+    def _chain(self, start):
+        hops = 0
+        while start < len(self.fat) and hops <= len(self.fat):
+            yield start
+            start = self.fat[start]
+            hops += 1
+
+    def _walk(self, idx, prefix):
+        stack = [idx]
+        while stack:
+            i = stack.pop()
+            if i == NOSTREAM or i >= len(self.dir): continue
+            e = self.dir[i]
+            e.path = prefix + e.name
+            self.entries[e.path.lower()] = e
+            stack.extend((e.left, e.right))
+            if e.kind == STORAGE and e.child != NOSTREAM: self._walk(e.child, e.path + "/")
+
+    def exists(self, name): return name.lower() in self.entries
+
+    def names(self): return [e.path for e in self.entries.values()]
+
+    def iter_stream(self, name, offset=0):
+        """Yield the stream's bytes from `offset` chunk by chunk without materializing it."""
+        e = self.entries[name.lower()]
+        left, skip = e.size - offset, offset
+        if e.size < self.mini_cutoff:
+            root = self.dir[0]
+            mini_sectors = list(self._chain(root.start))
+            per = self.sector_size // self.mini_size
+            s = e.start
+            while left > 0 and s < ENDOFCHAIN and s < len(self.minifat):
+                if skip < self.mini_size:
+                    big = mini_sectors[s // per]
+                    self.fh.seek((big + 1) * self.sector_size + (s % per) * self.mini_size + skip)
+                    data = self.fh.read(min(self.mini_size - skip, left))
+                    left -= len(data); skip = 0; yield data
+                else: skip -= self.mini_size
+                s = self.minifat[s]
+            return
+        for s in self._chain(e.start):
+            if left <= 0: break
+            if skip >= self.sector_size:
+                skip -= self.sector_size
+                continue
+            data = self._sector(s)[skip:skip + left]
+            left -= len(data); skip = 0; yield data
+
+    def close(self): self.fh.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+
+def is_encrypted_package(path):
+    """Password-protected .xlsx/.xlsm/.xlsb are CFB wrappers holding EncryptionInfo + EncryptedPackage."""
+    if not is_cfb(path): return False
+    try:
+        with CompoundFile(path) as cf: return cf.exists("EncryptionInfo") and cf.exists("EncryptedPackage")
+    except (OSError, ValueError, struct.error): return False
@@ -0,0 +1,126 @@
+import os, sys, json, argparse
+from forensic_engine import expand_paths, get_backend
+from forensic_pool import ExcelWorkerPool, ProcessWorkerPool, BatchAudit
+
+# Headless batch entry point. Deliberately free of tkinter so it starts fast on servers and CI.
+EXIT_COMPLIANT, EXIT_NEEDS_OPTIMIZATION, EXIT_CRITICAL = 0, 1, 3
+
+
+def build_pool(backend, workers, timeout=None):
+    """Excel automation runs on COM threads under the watchdog; the COM-free engine fans out across processes."""
+    if backend != "com" and workers > 1: return ProcessWorkerPool(workers, backend)
+    return ExcelWorkerPool(workers, lambda: get_backend(backend), timeout=timeout)
+
+
+def format_text(res):
+    lines = [f"[{res['health'].upper()}] {res['name']}  {res['dims']}  {res['size']}"]
+    lines.extend(f"    DETECTED: {issue}" for issue in res["issues"])
+    return "\n".join(lines)
+
+
+class OrderedEmitter:
+    """Streams results as soon as every earlier file has finished, so output keeps input order.
+
+    Deferred (encrypted or locked) files are the exception: they never hold back the files after them,
+    and their results are written whenever the password pass settles them. JSONL records carry "index".
+    """
+    def __init__(self, paths, out, jsonl):
+        self.paths, self.out, self.jsonl = paths, out, jsonl
+        self.pending, self.next, self.deferred = {}, 0, set()
+
+    def defer(self, idxs):
+        self.deferred.update(idxs)
+        self._drain()
+
+    def __call__(self, idx, res):
+        if idx in self.deferred: self._write(idx, res)
+        else:
+            self.pending[idx] = res
+            self._drain()
+
+    def _drain(self):
+        while self.next in self.pending or self.next in self.deferred:
+            if self.next in self.pending: self._write(self.next, self.pending.pop(self.next))
+            self.next += 1
+
+    def _write(self, idx, res):
+        if self.jsonl: self.out.write(json.dumps(dict(res, path=self.paths[idx], index=idx)) + "\n")
+        else: self.out.write(format_text(res) + "\n")
+        self.out.flush()
+
+
+def exit_code(results):
+    health = {r["health"] for r in results if r}
+    if "Critical" in health: return EXIT_CRITICAL
+    if health - {"Fully Compliant"}: return EXIT_NEEDS_OPTIMIZATION
+    return EXIT_COMPLIANT
+
+
+def write_link_inventory(dest, paths, results):
+    """One entry per distinct link target across the batch, plus how many workbooks lean on each share."""
+    from forensic_links import LinkInventory
+    inv = LinkInventory()
+    for path, res in zip(paths, results):
+        if res and res.get("links"): inv.add(path, res["links"])
+    targets = [{"target": t, "share": share, "workbooks": n, "cached_bytes": size, "sheets": sheets}
+               for t, share, n, size, sheets in inv.rows()]
+    with open(dest, "w", encoding="utf-8") as fh: json.dump({"shares": inv.shares(), "targets": targets}, fh, indent=1)
+    for share, n in list(inv.shares().items())[:5]: print(f"links: {n} workbooks depend on {share or '(relative path)'}", file=sys.stderr)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="forensic_cli", description="Excel Forensic Pro headless batch audit.",
+                                 epilog="exit codes: 0 all compliant, 1 optimization needed, 2 usage error, 3 critical/locked files")
+    ap.add_argument("paths", nargs="+", help="files, globs or directories (searched recursively)")
+    ap.add_argument("--backend", choices=["ooxml", "com"], default="ooxml", help="scan engine (default: COM-free ooxml)")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="parallel workers (default: CPU count)")
+    ap.add_argument("--timeout", type=float, default=300, help="per-file deadline for Excel workers in seconds (default: 300)")
+    ap.add_argument("--jsonl", action="store_true", help="emit one JSON object per workbook")
+    ap.add_argument("-o", "--output", help="write results here instead of stdout")
+    ap.add_argument("--cache", default=None, help="result cache database (default: ~/.forensic_pro/results.sqlite)")
+    ap.add_argument("--no-cache", action="store_true", help="audit every file even if unchanged")
+    ap.add_argument("--password-file", help="passwords (one per line) tried on deferred encrypted files")
+    ap.add_argument("--triage-first", action="store_true", help="fully audit only files the central-directory triage flags")
+    ap.add_argument("--link-inventory", metavar="FILE", help="write the batch's de-duplicated external link targets here (JSON)")
+    args = ap.parse_args(argv)
+
+    paths = expand_paths(args.paths)
+    if args.triage_first:
+        from forensic_triage import split_batch
+        suspicious, profiles = split_batch(paths)
+        print(f"triage: {len(suspicious)} of {len(paths)} files flagged for full audit", file=sys.stderr)
+        keep = set(suspicious)
+        paths = [p for p in paths if p in keep]
+    if not paths:
+        print("no Excel files found", file=sys.stderr)
+        return EXIT_COMPLIANT
+
+    passwords = []
+    if args.password_file:
+        with open(args.password_file, encoding="utf-8") as fh: passwords = [line.rstrip("\n") for line in fh if line.strip()]
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    pool = None
+    try:
+        emit = OrderedEmitter(paths, out, args.jsonl)
+        pool = build_pool(args.backend, max(1, args.workers), args.timeout)
+        cache = None
+        if not args.no_cache:
+            from forensic_cache import ResultCache, DEFAULT_CACHE, ruleset_key
+            cache = ResultCache(args.cache or DEFAULT_CACHE)
+        try:
+            audit = BatchAudit(pool, paths, on_result=emit, cache=cache, ruleset=ruleset_key(args.backend) if cache else None,
+                               on_deferred=emit.defer)
+            for i in audit.run(passwords): emit(i, audit.results[i])
+            results = audit.results
+        finally:
+            if cache: cache.close()
+    finally:
+        if pool: pool.close()
+        if out is not sys.stdout: out.close()
+    if args.link_inventory: write_link_inventory(args.link_inventory, paths, results)
+    return exit_code(results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import os, json, time, tempfile, threading
+from contextlib import contextmanager
+from forensic_engine import make_result, failure_result, locked_result
+from forensic_formula import FunctionCounter, LookupCounter, iter_formulas
+from forensic_detectors import lookup_issue
+
+# --- SPAWNED-INSTANCE REGISTRY ---
+# Only EXCEL.EXE processes this tool started are ever killed; users' own Excel sessions are left alone.
+# Every tool process (GUI, CLI batches) shares one registry, so each entry records its owner:
+#   {excel pid: [owner pid, owner create time, excel create time]}
+# Updates happen under a lock file and are written through a temp file + os.replace.
+PID_REGISTRY = os.path.join(tempfile.gettempdir(), "forensic_pro_excel_pids.json")
+_registry_lock = threading.Lock()
+
+
+def _lock_file(fh, lock):
+    fh.seek(0)
+    if os.name == "nt":
+        import msvcrt
+        while True:
+            try: return msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK if lock else msvcrt.LK_UNLCK, 1)
+            except OSError:
+                if not lock: return  # LK_LOCK gives up after ten tries; keep waiting
+    else:
+        import fcntl
+        fcntl.flock(fh, fcntl.LOCK_EX if lock else fcntl.LOCK_UN)
+
+
+def _load_registry():
+    try:
+        with open(PID_REGISTRY) as fh: raw = json.load(fh)
+    except (OSError, ValueError): return {}
+    # entries written before owners were recorded have no owner and count as orphaned
+    return {int(k): v if isinstance(v, list) and len(v) == 3 else [0, 0, v] for k, v in raw.items()}
+
+
+def _save_registry(reg):
+    try:
+        fd, tmp = tempfile.mkstemp(prefix="forensic_pro_pids_", dir=os.path.dirname(PID_REGISTRY))
+        with os.fdopen(fd, "w") as fh: json.dump(reg, fh)
+        os.replace(tmp, PID_REGISTRY)
+    except OSError: pass
+
+
+@contextmanager
+def _registry():
+    """The registry dict, held under the thread lock and the cross-process lock file; saved on exit if changed."""
+    with _registry_lock, open(PID_REGISTRY + ".lock", "a+") as lock:
+        _lock_file(lock, True)
+        try:
+            reg = _load_registry()
+            before = {k: list(v) for k, v in reg.items()}
+            yield reg
+            if reg != before: _save_registry(reg)
+        finally: _lock_file(lock, False)
+
+
+def excel_pid(app):
+    """PID behind a DispatchEx instance, via its main window handle."""
+    try:
+        import win32process
+        return win32process.GetWindowThreadProcessId(app.Hwnd)[1]
+    except Exception: return None
+
+
+def _started(pid):
+    import psutil
+    return psutil.Process(pid).create_time()
+
+
+def _alive(pid, created):
+    """True if `pid` still runs and is the same process (create time) that was recorded."""
+    import psutil
+    if not pid: return False
+    try: return abs(_started(pid) - created) <= 1
+    except psutil.Error: return False
+
+
+def track_pid(pid):
+    owner = os.getpid()
+    entry = [owner, _started(owner), _started(pid)]
+    with _registry() as reg: reg[pid] = entry
+
+
+def untrack_pid(pid):
+    with _registry() as reg: reg.pop(pid, None)
+
+
+def kill_pid(pid, created=None):
+    """Kill one tracked Excel; the name and create-time checks guard against PID reuse."""
+    import psutil
+    try:
+        proc = psutil.Process(pid)
+        if proc.name().upper() != "EXCEL.EXE": return False
+        if created is not None and abs(proc.create_time() - created) > 1: return False
+        proc.kill()
+        return True
+    except psutil.Error: return False
+    finally: untrack_pid(pid)
+
+
+def kill_tracked():
+    """Engine reset: kill the instances this process spawned and those orphaned by runs that have exited.
+
+    Instances owned by another live tool process (e.g. a CLI batch next to the GUI) are left alone.
+    """
+    me = os.getpid()
+    with _registry() as reg: entries = dict(reg)
+    for pid, (owner, owner_created, created) in entries.items():
+        if owner == me or not _alive(owner, owner_created): kill_pid(pid, created)
+
+
+# --- WARM INSTANCE POLICY ---
+RECYCLE_AFTER = 250    # workbooks opened before an instance is replaced
+MAX_RSS_MB = 2048      # working set that forces a recycle
+XL_CALC_MANUAL = -4135
+
+
+class ComBackend:
+    """Excel automation backend holding one warm, pre-configured instance.
+
+    The instance survives between batches (the pool keeps its worker thread alive) and is only
+    replaced when the health probe fails, after RECYCLE_AFTER workbooks or when it grows past MAX_RSS_MB.
+    `app_factory` swaps DispatchEx for a stand-in object model (see forensic_standin).
+    """
+    name = "com"
+
+    def __init__(self, app_factory=None, recycle_after=RECYCLE_AFTER, max_rss_mb=MAX_RSS_MB):
+        self.app_factory = app_factory
+        self.recycle_after, self.max_rss_mb = recycle_after, max_rss_mb
+        self.excel = None
+        self.pid = None
+        self.opened = 0
+        self._com = False
+
+    def start(self):
+        if self.app_factory is None and not self._com:
+            import pythoncom
+            pythoncom.CoInitialize()
+            self._com = True
+        self._spawn()
+
+    def _spawn(self):
+        if self.app_factory is None:
+            import win32com.client
+            self.excel = win32com.client.DispatchEx("Excel.Application")
+            self.pid = excel_pid(self.excel)
+            if self.pid:
+                try: track_pid(self.pid)
+                except Exception: pass
+        else:
+            self.excel = self.app_factory()
+        self.opened = 0
+        self.configure()
+
+    def configure(self):
+        app = self.excel
+        app.DisplayAlerts, app.Visible, app.AutomationSecurity = False, False, 3
+        for attr, value in (("ScreenUpdating", False), ("EnableEvents", False), ("Calculation", XL_CALC_MANUAL)):
+            try: setattr(app, attr, value)
+            except: pass  # Calculation is refused until a workbook is open; re-applied after each Open
+
+    def _release(self, kill=False):
+        try:
+            if kill: self.kill()
+            elif self.excel: self.excel.Quit()
+        except: pass
+        self.excel = None
+        if self.pid: untrack_pid(self.pid); self.pid = None
+
+    def healthy(self):
+        """Cheap round-trip probe: a hung or crashed instance raises or never answers."""
+        try: return self.excel is not None and self.excel.Workbooks.Count >= 0
+        except: return False
+
+    def memory_mb(self):
+        if not self.pid: return 0
+        try:
+            import psutil
+            return psutil.Process(self.pid).memory_info().rss / (1024 * 1024)
+        except Exception: return 0
+
+    def ensure_ready(self):
+        if not self.healthy(): self._release(kill=True)
+        elif self.opened >= self.recycle_after or self.memory_mb() > self.max_rss_mb: self._release()
+        else: return
+        self._spawn()
+
+    def stop(self):
+        self._release()
+        if self._com:
+            import pythoncom
+            pythoncom.CoUninitialize()
+            self._com = False
+
+    def kill(self):
+        """Watchdog hook; safe to call from another thread because it never touches the COM object."""
+        if self.pid: kill_pid(self.pid)
+        elif hasattr(self.excel, "terminate"): self.excel.terminate()
+
+    def open_workbook(self, path, passwords=(), password_prompt=None):
+        """Try no password, then each candidate, then (only if a prompt is supplied) up to three prompted ones."""
+        candidates = [""] + [p for p in passwords if p]
+        for password in candidates:
+            try: return self.excel.Workbooks.Open(path, UpdateLinks=0, ReadOnly=True, Password=password)
+            except Exception as e:
+                if "password" not in str(e).lower(): return None
+
+        # INTERACTIVE PASSWORD LOGIC
+        for _ in range(3 if password_prompt else 0):
+            password = password_prompt(os.path.basename(path))
+            if not password: break
+            try: return self.excel.Workbooks.Open(path, UpdateLinks=0, ReadOnly=True, Password=password)
+            except Exception as e:
+                if "password" not in str(e).lower(): break
+        return None
+
+    def time_calculate_full(self, path, passwords=()):
+        """Seconds Application.CalculateFull() takes on `path` (None if it cannot be opened); closed unsaved."""
+        self.ensure_ready()
+        wb = self.open_workbook(path, passwords)
+        if not wb: return None
+        self.opened += 1
+        try:
+            start = time.perf_counter()
+            self.excel.CalculateFull()
+            return time.perf_counter() - start
+        finally:
+            try: wb.Close(False)
+            except: pass
+
+    def scan(self, path, password_prompt=None, passwords=()):
+        fname = os.path.basename(path)
+        fsize = os.path.getsize(path) / (1024 * 1024)
+        self.ensure_ready()
+        wb = self.open_workbook(path, passwords, password_prompt)
+        if not wb: return locked_result(fname)
+        self.opened += 1
+        try: self.excel.Calculation = XL_CALC_MANUAL
+        except: pass
+
+        try:
+            issues = []
+            t_rows, t_cols = 0, 0
+
+            for sh in wb.Sheets:
+                used = sh.UsedRange
+                r, c = used.Rows.Count, used.Columns.Count
+                t_rows += r; t_cols += c
+
+                last_cell = sh.Cells.SpecialCells(11)
+                if last_cell.Row > 5000 and r < (last_cell.Row * 0.5):
+                    issues.append(f"Phantom Data ({sh.Name}): {last_cell.Row} rows detected vs {r} filled.")
+
+                try:
+                    counter, lookups = FunctionCounter(), LookupCounter()
+                    for area in used.SpecialCells(-4123).Areas:
+                        for f in iter_formulas(area.Formula):
+                            counter.add(f)
+                            lookups.add(f)
+                    if counter.cells: issues.append(f"Volatile Lag ({sh.Name}): {counter.summary()} in {counter.cells} cells.")
+                    issues.extend(lookup_issue(sh.Name, lookups))
+                except: pass
+
+            if wb.HasVBProject: issues.append("VBA Metadata: Script-based security risk.")
+            if wb.LinkSources(1): issues.append("External Links: Network dependency detected.")
+            return make_result(fname, f"{fsize:.2f} MB", f"[{t_rows}R x {t_cols}C]", issues)
+        except Exception as e:
+            return failure_result(fname, "ERR", str(e))
+        finally:  # the instance stays warm, so a failed book must not stay open in it
+            try: wb.Close(False)
+            except: pass
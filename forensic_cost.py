@@ -0,0 +1,203 @@
+import os, sys, json, hashlib, argparse
+from collections import Counter
+from forensic_formula import call_profile, MAX_ROWS, MAX_COLS
+
+# --- STATIC RECALCULATION COST MODEL ---
+# Replaces timing Application.CalculateFull(), which needs Excel, dirties calc state and can run for minutes.
+# A formula's cost is linear in its features: one "_cell" per formula cell, one unit per function call, and
+# the cells each function's references cover ("F@cells"), clipped to the referenced sheet's declared extent.
+# Costs are microseconds. Functions missing from the table fall back to "_call" / "_cells".
+DEFAULT_COSTS = {
+    "_cell": 0.3, "_call": 0.2, "_cells": 0.002,
+    "VLOOKUP": 1.0, "VLOOKUP@cells": 0.01, "HLOOKUP": 1.0, "HLOOKUP@cells": 0.01,
+    "MATCH": 1.0, "MATCH@cells": 0.01, "XLOOKUP": 1.5, "XLOOKUP@cells": 0.01, "XMATCH": 1.5, "XMATCH@cells": 0.01,
+    "LOOKUP": 1.0, "LOOKUP@cells": 0.001, "INDEX": 0.5, "INDEX@cells": 0.0,
+    "SUMIF": 1.0, "SUMIF@cells": 0.01, "SUMIFS": 1.5, "SUMIFS@cells": 0.01,
+    "COUNTIF": 1.0, "COUNTIF@cells": 0.01, "COUNTIFS": 1.5, "COUNTIFS@cells": 0.01,
+    "AVERAGEIF": 1.0, "AVERAGEIF@cells": 0.01, "AVERAGEIFS": 1.5, "AVERAGEIFS@cells": 0.01,
+    "SUMPRODUCT": 2.0, "SUMPRODUCT@cells": 0.02, "FILTER": 2.0, "FILTER@cells": 0.02,
+    "INDIRECT": 5.0, "OFFSET": 2.0, "OFFSET@cells": 0.0,
+}
+COST_TABLE = os.path.join(os.path.expanduser("~"), ".forensic_pro", "cost_table.json")
+CALC_TIMINGS = os.path.join(os.path.expanduser("~"), ".forensic_pro", "calc_timings.jsonl")
+SLOW_RECALC_SECONDS = 1.0
+SLOW_EDIT_SECONDS = 0.1
+TOP_CONTRIBUTORS = 3
+
+
+def load_costs(path=COST_TABLE):
+    costs = dict(DEFAULT_COSTS)
+    try:
+        with open(path, encoding="utf-8") as fh: costs.update(json.load(fh))
+    except (OSError, ValueError): pass
+    return costs
+
+
+def table_tag(path=COST_TABLE):
+    """Short digest of the calibrated table, so cached results never outlive a recalibration."""
+    try:
+        with open(path, "rb") as fh: return hashlib.sha256(fh.read()).hexdigest()[:8]
+    except OSError: return "default"
+
+
+def _covered(ref, here, sheet_index, extents):
+    sheet, last, r1, c1, r2, c2, _ = ref
+    if sheet is None: sheets = (here,)
+    else:
+        first = sheet_index.get(sheet.lower())
+        if first is None: return 0
+        end = sheet_index.get(last.lower(), first) if last else first
+        sheets = range(min(first, end), max(first, end) + 1)
+    total = 0
+    for s in sheets:
+        max_r, max_c = extents.get(s, (MAX_ROWS, MAX_COLS))
+        lo_r, hi_r = (min(r1, r2), min(max(r1, r2), max_r)) if r1 else (1, max_r)
+        lo_c, hi_c = (min(c1, c2), min(max(c1, c2), max_c)) if c1 else (1, max_c)
+        total += max(hi_r - lo_r + 1, 1) * max(hi_c - lo_c + 1, 1)
+    return total
+
+
+def formula_features(text, here, sheet_index, extents, costs):
+    calls, refs = call_profile(text)
+    feats = Counter(_cell=1)
+    for name, n in calls.items(): feats[name if name in costs else "_call"] += n
+    for func, ref in refs:
+        key = f"{func}@cells"
+        feats[key if key in costs else "_cells"] += _covered(ref, here, sheet_index, extents)
+    return feats
+
+
+def feature_cost(feats, costs): return sum(costs.get(k, 0.0) * v for k, v in feats.items())
+
+
+class CostModel:
+    """Prices the distinct formulas of one scanned workbook; per-formula features are computed once per sheet."""
+    def __init__(self, scan, costs=None):
+        self.scan, self.costs = scan, costs or load_costs()
+        self.sheet_index = {s.name.lower(): s.index for s in scan.sheets}
+        self.extents = scan.data.get("extent", {})
+        self._memo = {}
+
+    def features(self, text, sheet):
+        key = (text, sheet)
+        feats = self._memo.get(key)
+        if feats is None: feats = self._memo[key] = formula_features(text, sheet, self.sheet_index, self.extents, self.costs)
+        return feats
+
+    def totals(self):
+        """Workbook feature vector: every distinct formula's features times its cell count."""
+        total = Counter()
+        for sheet, formulas in self.scan.data.get("formulas", {}).items():
+            for text, n in formulas:
+                for k, v in self.features(text, sheet).items(): total[k] += v * n
+        return total
+
+    def full_recalc(self):
+        """(estimated seconds, [(seconds, sheet name, formula, cells)] most expensive first)."""
+        names = {s.index: s.name for s in self.scan.sheets}
+        parts, total = [], 0.0
+        for sheet, formulas in self.scan.data.get("formulas", {}).items():
+            for text, n in formulas:
+                us = feature_cost(self.features(text, sheet), self.costs) * n
+                total += us
+                parts.append((us / 1e6, names.get(sheet, "?"), text, n))
+        parts.sort(key=lambda p: -p[0])
+        return total / 1e6, parts[:TOP_CONTRIBUTORS]
+
+    def per_edit(self, graph):
+        """Seconds spent on every edit recalculating the volatile cells and everything downstream of them."""
+        cache, us = {}, 0.0
+        for v in graph.reached(graph.all_volatile_nodes()):
+            key = (graph.fids[v], graph.sheet_of(v))
+            cost = cache.get(key)
+            if cost is None:
+                text = graph.texts[key[0]]
+                cost = cache[key] = feature_cost(self.features(text, key[1]), self.costs) if text else 0.0
+            us += cost
+        return us / 1e6
+
+
+# --- CALIBRATION ---
+def nnls(rows, target, prior=None, ridge=1e-3, iters=500):
+    """Non-negative least squares by cyclic coordinate descent on the normal equations (few features, few samples).
+
+    A small ridge pull towards `prior` keeps features the samples barely constrain near their defaults.
+    """
+    k = len(rows[0]) if rows else 0
+    prior = prior or [0.0] * k
+    gram = [[sum(r[i] * r[j] for r in rows) for j in range(k)] for i in range(k)]
+    rhs = [sum(r[i] * t for r, t in zip(rows, target)) for i in range(k)]
+    for i in range(k):
+        pull = ridge * gram[i][i]
+        gram[i][i] += pull
+        rhs[i] += pull * prior[i]
+    x = list(prior)
+    for _ in range(iters):
+        moved = 0.0
+        for i in range(k):
+            if gram[i][i] <= 0: continue
+            step = (rhs[i] - sum(gram[i][j] * x[j] for j in range(k))) / gram[i][i]
+            new = max(0.0, x[i] + step)
+            moved = max(moved, abs(new - x[i]))
+            x[i] = new
+        if moved < 1e-12: break
+    return x
+
+
+def workbook_features(path, costs):
+    """Feature totals of one .xlsx/.xlsm from the COM-free sheet pass."""
+    import zipfile
+    from forensic_engine import WorkbookScan
+    with zipfile.ZipFile(path) as zf:
+        scan = WorkbookScan(zf, path)
+        for sheet in scan.sheets:
+            if sheet.part in scan.names: scan.scan_sheet(sheet)
+    return CostModel(scan, costs).totals()
+
+
+def calibrate(timings=CALC_TIMINGS, out=COST_TABLE):
+    """Fit the cost table to measured CalculateFull seconds; only features seen in the samples are refitted."""
+    costs, samples = dict(DEFAULT_COSTS), []
+    with open(timings, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip(): continue
+            m = json.loads(line)
+            try: samples.append((workbook_features(m["path"], costs), m["seconds"] * 1e6))
+            except Exception as e: print(f"skipped {m.get('path')}: {e}", file=sys.stderr)
+    keys = sorted({k for feats, _ in samples for k in feats})
+    if not keys: raise ValueError("no usable timing samples")
+    fitted = nnls([[feats.get(k, 0) for k in keys] for feats, _ in samples], [us for _, us in samples],
+                  prior=[costs.get(k, 0.0) for k in keys])
+    costs.update(zip(keys, fitted))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh: json.dump(costs, fh, indent=1, sort_keys=True)
+    return costs, len(samples)
+
+
+def measure(paths, timings=CALC_TIMINGS, passwords=()):
+    """Time CalculateFull in Excel for each workbook and append the samples used by calibrate()."""
+    from forensic_com import ComBackend
+    backend = ComBackend()
+    backend.start()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(timings)), exist_ok=True)
+        with open(timings, "a", encoding="utf-8") as fh:
+            for p in paths:
+                seconds = backend.time_calculate_full(p, passwords)
+                if seconds is None: continue
+                fh.write(json.dumps({"path": os.path.abspath(p), "seconds": seconds}) + "\n")
+                print(f"{seconds:8.3f}s  {p}")
+    finally: backend.stop()
+
+
+if __name__ == "__main__":
+    from forensic_engine import expand_paths
+    ap = argparse.ArgumentParser(description="Recalculation cost model: calibrate it against Excel's CalculateFull timings.")
+    ap.add_argument("mode", choices=["measure", "calibrate"], help="measure: time CalculateFull in Excel; calibrate: refit the cost table")
+    ap.add_argument("paths", nargs="*", help="workbooks to measure")
+    ap.add_argument("--timings", default=CALC_TIMINGS, help=f"timing samples (default: {CALC_TIMINGS})")
+    args = ap.parse_args()
+    if args.mode == "measure": measure(expand_paths(args.paths), args.timings)
+    else:
+        costs, n = calibrate(args.timings)
+        print(f"fitted {len(costs)} costs from {n} workbooks -> {COST_TABLE}")
@@ -0,0 +1,403 @@
+from forensic_ooxml import MAX_COLS, MAX_ROWS, local_name, parse_area, read_rels, stream_part
+from forensic_formula import FunctionCounter, LookupCounter, shift_formula
+from forensic_cost import CostModel, SLOW_RECALC_SECONDS, SLOW_EDIT_SECONDS
+from forensic_graph import CalcChainReader
+from forensic_macros import macro_issues
+from forensic_names import NameUsageDetector, name_issues, name_tokens
+from forensic_pivot import pivot_issues
+from forensic_styles import StyleUsageDetector, style_issues
+
+# --- SHEET DETECTORS ---
+# One instance per sheet; all of them share a single streaming pass over the sheet part.
+# Formula rules read scan.formulas (the sheet's FormulaExtractor) and cost O(distinct formulas).
+LOOKUP_CELLS_LIMIT = 5000
+WHOLE_COLUMN_LOOKUP_LIMIT = 500
+SERIAL_CHAIN_LIMIT = 1000
+HOT_SPOT_LIMIT = 10000
+CALC_STRUCTURE_CELL_LIMIT = 200000  # larger graphs skip the cycle/chain/hot-spot/drift pass; it outweighs the rest of the scan
+CHAIN_DRIFT_LIMIT = 100
+CF_FRAGMENT_LIMIT = 1000
+CF_MERGEABLE_LIMIT = 100
+CF_ANCHOR = (MAX_ROWS // 2, MAX_COLS // 2)  # rule formulas are re-anchored here so copies of one rule compare equal
+VALIDATION_ENTRY_LIMIT = 1000
+HYPERLINK_ENTRY_LIMIT = 10000
+FRAGMENT_BYTES_LIMIT = 1024 * 1024
+
+class DimensionDetector:
+    """Declared <dimension ref>, the XML twin of UsedRange.Rows/Columns.Count."""
+    tags = ("dimension",)
+
+    def __init__(self, scan, sheet):
+        self.scan, self.sheet = scan, sheet
+        self.rows = self.cols = 1  # an empty sheet still reports A1, like UsedRange
+        self.extent = (1, 1)
+
+    def start(self, tag, attrs):
+        r1, c1, r2, c2 = parse_area(attrs.get("ref", "A1"))
+        self.rows, self.cols = r2 - r1 + 1, c2 - c1 + 1
+        self.extent = (r2, c2)
+
+    def end(self, tag, text): pass
+
+    def finish(self):
+        self.scan.t_rows += self.rows
+        self.scan.t_cols += self.cols
+        self.scan.data.setdefault("extent", {})[self.sheet.index] = self.extent
+        return []
+
+
+class PhantomDetector:
+    """Declared extent vs last value row vs last formatting-only row, in constant memory.
+
+    Replaces the UsedRange / SpecialCells(11) comparison, which makes Excel walk the whole sheet.
+    """
+    tags = ("dimension", "row", "c", "v", "is", "f")
+    row_format_attrs = ("s", "customFormat", "customHeight", "hidden")
+
+    def __init__(self, scan, sheet):
+        self.sheet, self.stream = sheet, None
+        self.declared_ref, self.declared_last = "", 0
+        self.last_value = self.last_format = self.format_only_rows = 0
+        self.row_styled = self.row_has_value = self.cell_styled = self.cell_has_value = False
+        self.row = 0
+
+    def bind(self, stream): self.stream = stream
+
+    def start(self, tag, attrs):
+        if tag == "c":
+            self.cell_styled, self.cell_has_value = "s" in attrs, False
+        elif tag == "row":
+            self.row = self.stream.row
+            self.row_styled = any(a in attrs for a in self.row_format_attrs)
+            self.row_has_value = False
+        elif tag == "dimension":
+            self.declared_ref = attrs.get("ref", "A1")
+            self.declared_last = parse_area(self.declared_ref)[2]
+        else:
+            self.cell_has_value = True
+
+    def end(self, tag, text):
+        if tag == "c":
+            if self.cell_has_value: self.row_has_value = True
+            elif self.cell_styled: self.row_styled = True
+        elif tag == "row":
+            if self.row_has_value: self.last_value = self.row
+            elif self.row_styled:
+                self.last_format = self.row
+                self.format_only_rows += 1
+
+    def finish(self):
+        detected = max(self.declared_last, self.last_format)
+        if detected > 5000 and self.last_value < detected * 0.5:
+            trailing = max(self.last_format - self.last_value, 0)
+            return [f"Phantom Data ({self.sheet.name}): {detected} rows detected vs {self.last_value} filled "
+                    f"(declared {self.declared_ref or 'none'}, {trailing} rows past the last value, "
+                    f"{self.format_only_rows} formatting-only)."]
+        return []
+
+
+class VolatileDetector:
+    """Per-function volatile counts, weighted by the number of cells sharing each formula.
+
+    The issue itself is raised by check_volatile once every sheet is in the dependency graph.
+    """
+    tags = ()
+
+    def __init__(self, scan, sheet):
+        self.scan, self.sheet = scan, sheet
+
+    def finish(self):
+        c = FunctionCounter()
+        for text, n in self.scan.formulas.distinct(): c.add(text, n)
+        if c.cells: self.scan.data.setdefault("volatile", []).append((self.sheet, c))
+        return []
+
+
+def lookup_issue(sheet_name, c):
+    if c.cells < LOOKUP_CELLS_LIMIT and c.whole < WHOLE_COLUMN_LOOKUP_LIMIT: return []
+    return [f"Lookup Load ({sheet_name}): {c.summary()} in {c.cells} cells, {c.whole} over whole columns/rows."]
+
+
+class LookupDetector:
+    """Heavy lookup usage: many lookup cells, or lookups that scan entire columns."""
+    tags = ()
+
+    def __init__(self, scan, sheet):
+        self.scan, self.sheet = scan, sheet
+
+    def finish(self):
+        c = LookupCounter()
+        for text, n in self.scan.formulas.distinct(): c.add(text, n)
+        return lookup_issue(self.sheet.name, c)
+
+
+class FormulaCostDetector:
+    """Keeps the sheet's distinct formulas for the workbook-level recalculation cost estimate."""
+    tags = ()
+
+    def __init__(self, scan, sheet):
+        self.scan, self.sheet = scan, sheet
+
+    def finish(self):
+        formulas = list(self.scan.formulas.distinct())
+        if formulas: self.scan.data.setdefault("formulas", {})[self.sheet.index] = formulas
+        return []
+
+
+def sqref_areas(sqref):
+    """Space-separated ranges -> ([(r1, c1, r2, c2)], covered cells)."""
+    areas = [parse_area(a) for a in sqref.split()]
+    return areas, sum((r2 - r1 + 1) * (c2 - c1 + 1) for r1, c1, r2, c2 in areas)
+
+
+def anchor_formula(formula, areas):
+    """A range-relative rule formula re-anchored to CF_ANCHOR, so copies over different ranges compare equal."""
+    return shift_formula(formula, CF_ANCHOR[0] - min(a[0] for a in areas), CF_ANCHOR[1] - min(a[1] for a in areas))
+
+
+class ConditionalFormatDetector:
+    """Conditional-format fragmentation: rules, sqref fragments, covered cells and rules that only differ by range.
+
+    Covers <conditionalFormatting> and the x14 copies in extLst (whose xm:sqref follows the rules).
+    Rule formulas are re-anchored to one cell, so the copies a row paste leaves behind group together.
+    """
+    tags = ("conditionalFormatting", "cfRule", "formula", "f", "sqref", "cfvo", "color")
+    text_tags = ("formula", "f", "sqref")
+
+    def __init__(self, scan, sheet):
+        self.sheet = sheet
+        self.block = None  # [sqref, [rule keys]] of the open <conditionalFormatting>
+        self.rule = None
+        self.rules = self.fragments = self.cells = 0
+        self.groups = {}   # rule key -> [blocks, fragments, cells]
+
+    def start(self, tag, attrs):
+        if tag == "conditionalFormatting": self.block = [attrs.get("sqref", ""), []]
+        elif self.block is None: return
+        elif tag == "cfRule": self.rule = [tuple(sorted((k, v) for k, v in attrs.items() if local_name(k) not in ("priority", "id")))]
+        elif tag in ("cfvo", "color") and self.rule is not None: self.rule.append((tag, tuple(sorted(attrs.items()))))
+
+    def end(self, tag, text):
+        if self.block is None: return
+        if tag in ("formula", "f") and self.rule is not None: self.rule.append(("f", text))
+        elif tag == "sqref": self.block[0] = text
+        elif tag == "cfRule" and self.rule is not None:
+            self.block[1].append(self.rule)
+            self.rule = None
+        elif tag == "conditionalFormatting":
+            self._close(*self.block)
+            self.block = None
+
+    def _close(self, sqref, rules):
+        areas, cells = sqref_areas(sqref)
+        if not areas: return
+        for rule in rules:
+            key = tuple((kind, anchor_formula(val, areas)) if kind == "f" else (kind, val) for kind, val in rule[1:])
+            group = self.groups.setdefault((rule[0], key), [0, 0, 0])
+            group[0] += 1
+            group[1] += len(areas)
+            group[2] += cells
+            self.rules += 1
+            self.fragments += len(areas)
+            self.cells += cells
+
+    def finish(self):
+        mergeable = self.rules - len(self.groups)
+        if self.fragments <= CF_FRAGMENT_LIMIT and mergeable <= CF_MERGEABLE_LIMIT: return []
+        (attrs, _), (blocks, _, _) = max(self.groups.items(), key=lambda kv: kv[1][0])
+        kind = dict(attrs).get("type", "rule")
+        return [f"Conditional Format Fragmentation ({self.sheet.name}): {self.rules} rules over {self.fragments} ranges "
+                f"covering {self.cells} cells; {mergeable} rules are copies that merge into {len(self.groups)} "
+                f"(largest: one {kind} rule split {blocks} ways)."]
+
+
+class RangeListDetector:
+    """<dataValidations> and <hyperlinks> (plus the x14 validation copies): entries, distinct bodies, covered cells
+    and the bytes each block takes in the sheet part (bytes need the XML parser, so .xlsb/.xls report none).
+
+    A validation body is its attributes and range-relative formulas; a hyperlink body is its destination.
+    """
+    tags = ("dataValidations", "dataValidation", "formula1", "formula2", "f", "sqref", "hyperlinks", "hyperlink")
+    text_tags = ("formula1", "formula2", "f", "sqref")
+    BLOCKS = {"dataValidations": "dataValidation", "hyperlinks": "hyperlink"}
+    IGNORED = frozenset(("sqref", "ref", "uid", "display", "tooltip", "prompt", "promptTitle", "error", "errorTitle"))
+
+    def __init__(self, scan, sheet):
+        self.scan, self.sheet = scan, sheet
+        self.stream = None
+        self.block = self.entry = self.mark = None
+        self.tally = {tag: [0, set(), 0, 0] for tag in self.BLOCKS.values()}  # entries, bodies, cells, bytes
+
+    def bind(self, stream): self.stream = stream
+
+    def start(self, tag, attrs):
+        if tag in self.BLOCKS:
+            self.block = self.BLOCKS[tag]
+            if self.stream.parser: self.mark = self.stream.parser.CurrentByteIndex
+        elif tag == self.block:
+            body = tuple(sorted((local_name(k), v) for k, v in attrs.items() if local_name(k) not in self.IGNORED))
+            self.entry = [body, attrs.get("sqref") or attrs.get("ref", ""), []]
+
+    def end(self, tag, text):
+        if self.entry is None:
+            if tag in self.BLOCKS and self.mark is not None:
+                self.tally[self.BLOCKS[tag]][3] += self.stream.parser.CurrentByteIndex - self.mark + len(self.stream.qname) + 3
+                self.mark = None
+            if tag in self.BLOCKS: self.block = None
+            return
+        if tag == "sqref": self.entry[1] = text
+        elif tag in ("formula1", "formula2", "f") and text.strip(): self.entry[2].append(text)
+        elif tag == self.block:
+            body, sqref, formulas = self.entry
+            self.entry = None
+            areas, cells = sqref_areas(sqref)
+            if areas and formulas: body += tuple(anchor_formula(f, areas) for f in formulas)
+            t = self.tally[tag]
+            t[0] += 1
+            t[1].add(body)
+            t[2] += cells
+
+    def _targets(self, bodies):
+        """Hyperlink bodies keyed by r:id become their relationship targets, so distinct means distinct destinations."""
+        if self.scan.zf is None or not any(k == "id" for body in bodies for k, _ in body): return bodies
+        rels = read_rels(self.scan.zf, self.sheet.part)
+        return {tuple((k, rels.get(v, (v,))[0]) if k == "id" else (k, v) for k, v in body) for body in bodies}
+
+    def finish(self):
+        issues = []
+        for tag, label, noun, limit in (("dataValidation", "Data Validation", "rules", VALIDATION_ENTRY_LIMIT),
+                                        ("hyperlink", "Hyperlink", "targets", HYPERLINK_ENTRY_LIMIT)):
+            entries, bodies, cells, size = self.tally[tag]
+            if entries <= limit and size <= FRAGMENT_BYTES_LIMIT: continue
+            if tag == "hyperlink": bodies = self._targets(bodies)
+            xml = f", {size / (1024 * 1024):.2f} MB of sheet XML" if size else ""
+            issues.append(f"{label} Fragmentation ({self.sheet.name}): {entries} entries, {len(bodies)} distinct {noun}, "
+                          f"{cells} cells covered{xml}.")
+        return issues
+
+
+SHEET_DETECTORS = [DimensionDetector, PhantomDetector, VolatileDetector, LookupDetector, FormulaCostDetector, StyleUsageDetector,
+                   ConditionalFormatDetector, RangeListDetector, NameUsageDetector]
+
+
+# --- WORKBOOK CHECKS ---
+# Package-level checks, run after the sheet pass. Most only look at the zip directory.
+
+def check_volatile(scan):
+    """Volatile Lag per sheet, with the cells each edit really recalculates through the dependency graph."""
+    found = scan.data.get("volatile")
+    if not found: return []
+    graph = scan.graph.build()
+    more = "at least " if graph.truncated else ""
+    issues = []
+    for sheet, c in found:
+        total, worst, worst_n = graph.blast_radius(sheet.index)
+        text = f"Volatile Lag ({sheet.name}): {c.summary()} in {c.cells} cells"
+        if total > c.cells: text += f"; every edit recalculates {more}{total} cells"
+        if worst_n > 1: text += f" ({graph.label(worst)} alone drives {worst_n})"
+        issues.append(text + ".")
+    return issues
+
+
+def check_recalc_cost(scan):
+    """Static stand-in for timing CalculateFull: estimated full recalculation and per-edit volatile cost."""
+    if not scan.data.get("formulas"): return []
+    model = CostModel(scan, scan.costs)
+    seconds, top = model.full_recalc()
+    edit = model.per_edit(scan.graph.build()) if scan.data.get("volatile") else 0.0
+    if seconds < SLOW_RECALC_SECONDS and edit < SLOW_EDIT_SECONDS: return []
+    text = f"Slow Logic: estimated full recalculation {seconds:.2f}s"
+    if edit: text += f", {edit:.2f}s on every edit from volatile chains"
+    heavy = [f"{sheet}!={formula if len(formula) <= 60 else formula[:57] + '...'} x{n} {s:.2f}s" for s, sheet, formula, n in top]
+    return [text + " (top cost: " + "; ".join(heavy) + ")."]
+
+
+def find_calc_chain(scan):
+    if scan.zf is None: return None
+    for target, kind, _ in read_rels(scan.zf, scan.wb_part).values():
+        if kind == "/calcChain" and target in scan.names: return target
+    return "xl/calcChain.xml" if "xl/calcChain.xml" in scan.names else None
+
+
+def check_calc_structure(scan):
+    """Circular references, serial chains, fan-in/fan-out hot spots and calcChain.xml drift from the formula graph.
+
+    Runs only up to CALC_STRUCTURE_CELL_LIMIT formula cells on a complete graph (the one check_volatile built);
+    otherwise it says the structure was not checked, so a missing finding never reads as a clean model.
+    """
+    if not scan.data.get("formulas"): return []
+    if len(scan.graph) > CALC_STRUCTURE_CELL_LIMIT and not scan.graph.truncated:
+        return [f"Calc Structure Not Checked: {len(scan.graph)} formula cells exceed the {CALC_STRUCTURE_CELL_LIMIT} the COM-free "
+                "pass analyzes; circular references, serial chains and hot spots are unverified (use the Excel engine)."]
+    graph = scan.graph.build()
+    if graph.truncated:
+        return ["Calc Structure Not Checked: the dependency graph hit its size limit; circular references, serial chains "
+                "and hot spots are unverified (use the Excel engine)."]
+    issues = []
+    found = graph.structure()
+    cycles = found["cycles"]
+    if cycles:
+        cells = sum(len(c) for c in cycles)
+        sample = ", ".join(graph.label(min(c)) for c in cycles[:3])
+        issues.append(f"Circular References: {len(cycles)} loops covering {cells} formula cells (e.g. {sample}).")
+    length, first, last = found["chain"]
+    if length >= SERIAL_CHAIN_LIMIT:
+        issues.append(f"Serial Chain: {length} formulas recalculate one after another from {graph.label(first)} "
+                      f"to {graph.label(last)}, which defeats multi-threaded calculation.")
+    fan_in, fan_out = graph.hot_spots()
+    hot = [f"{graph.label(v)} feeds {k}" for k, v in fan_out if k >= HOT_SPOT_LIMIT]
+    hot += [f"{graph.label(v)} reads {k}" for k, v in fan_in if k >= HOT_SPOT_LIMIT]
+    if hot: issues.append(f"Dependency Hot Spots: {'; '.join(hot)} formula cells.")
+
+    part = find_calc_chain(scan)
+    if part and part.endswith(".xml"):  # calcChain.bin (xlsb) is not compared
+        reader = CalcChainReader(graph, {s.sheet_id: s.index for s in scan.sheets})
+        stream_part(scan.zf, part, [reader])
+        early, missing = graph.chain_drift(reader.positions), reader.missing()
+        if early + reader.stale + missing >= CHAIN_DRIFT_LIMIT:
+            issues.append(f"Calc Chain Drift: {early} formulas are stored ahead of their precedents in {part} "
+                          f"({reader.stale} stale entries, {missing} formulas missing); Excel re-sorts it on the next full calculation.")
+    return issues
+
+
+def check_vba(scan):
+    return macro_issues(scan.macros)
+
+
+def check_external_links(scan):
+    """Linked sources by target, largest cached copy first, with the cached value bytes they carry."""
+    if not scan.links: return []
+    links = sorted(scan.links, key=lambda link: -link.cached_bytes)
+    targets = list(dict.fromkeys(link.target or link.part for link in links))
+    shown = ", ".join(targets[:3]) + (f" +{len(targets) - 3} more" if len(targets) > 3 else "")
+    cached = sum(link.cached_bytes for link in links)
+    issue = f"External Links: Network dependency detected on {len(targets)} source(s) ({shown})"
+    if cached: issue += f"; {cached / (1024 * 1024):.2f} MB of cached values in {sum(link.cached_cells for link in links)} cells"
+    return [issue + "."]
+
+
+def check_styles(scan):
+    return style_issues(scan.read_styles(), scan.data.get("styles_used", ()))
+
+
+def check_pivot_caches(scan):
+    return pivot_issues(scan.pivots)
+
+
+def check_defined_names(scan):
+    used = set(scan.data.get("names_used", ()))
+    for c in scan.pivots:  # a pivot cache over a named range or table of this workbook keeps the name in use
+        if c.source and c.source[0] == "range" and c.source[1] is None and c.source[4]: name_tokens(c.source[4], used)
+    return name_issues(scan.read_names(), used)
+
+
+def check_unparsed_formulas(scan):
+    """Binary formulas the decompiler gave up on are invisible to every formula check; say so instead of passing them."""
+    book = scan.xlsb or getattr(scan, "book", None)
+    if not book or not book.unparsed: return []
+    return [f"Unparsed Formulas: {book.unparsed} distinct formulas use tokens the COM-free decoder cannot read; "
+            "they were left out of the formula checks (use the Excel engine for a full audit)."]
+
+
+WORKBOOK_CHECKS = [check_volatile, check_recalc_cost, check_calc_structure, check_styles, check_pivot_caches, check_vba, check_external_links,
+                  check_defined_names, check_unparsed_formulas]
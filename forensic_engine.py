@@ -0,0 +1,200 @@
+import os, glob, struct, zipfile
+from functools import partial
+from forensic_cfb import CompoundFile, is_cfb, is_encrypted_package
+from forensic_ooxml import PartStream, FormulaExtractor, find_workbook_part, read_workbook, read_rels
+from forensic_detectors import SHEET_DETECTORS, WORKBOOK_CHECKS
+from forensic_graph import DependencyGraph
+from forensic_cost import load_costs
+from forensic_macros import zip_macros, ole_macros
+from forensic_links import read_external_links
+from forensic_names import read_defined_names, binary_names
+from forensic_pivot import read_pivot_caches, ole_pivot_caches
+from forensic_styles import read_styles, StyleSummary
+from forensic_xlsb import XlsbWorkbook, XlsbSheetReader
+from forensic_xls import XlsWorkbook, XlsSheetReader, WORKBOOK_STREAM, BIFF8, has_filepass
+
+SCANNER_VERSION = "10.8"
+RULESET_VERSION = 20
+OOXML_EXTENSIONS = (".xlsx", ".xlsm", ".xlsb")
+
+
+# --- RESULT FORMAT ---
+def make_result(name, size, dims, issues, health=None):
+    if health is None: health = "Fully Compliant" if not issues else "Needs Optimization"
+    return {"name": name, "size": size, "dims": dims, "issues": issues, "health": health}
+
+
+def failure_result(name, dims, message):
+    return make_result(name, "N/A", dims, [message], "Critical")
+
+
+def locked_result(name):
+    return make_result(name, "N/A", "LOCKED", ["Authentication Failed: Incorrect Password."], "Critical")
+
+
+def is_encrypted(path):
+    """Password-protected OOXML package (EncryptionInfo) or legacy .xls whose globals carry FILEPASS."""
+    if is_encrypted_package(path): return True
+    if not path.lower().endswith(".xls") or not is_cfb(path): return False
+    try:
+        with CompoundFile(path) as cf: return cf.exists(WORKBOOK_STREAM) and has_filepass(cf)
+    except (OSError, ValueError, struct.error): return False
+
+
+def partition_encrypted(paths):
+    """(plain indexes, encrypted indexes) decided from the container alone, without opening anything in Excel."""
+    plain, encrypted = [], []
+    for i, p in enumerate(paths): (encrypted if is_encrypted(p) else plain).append(i)
+    return plain, encrypted
+
+
+def size_label(path):
+    return f"{os.path.getsize(path) / (1024 * 1024):.2f} MB"
+
+
+# --- COM-FREE BACKEND ---
+class WorkbookScan:
+    """Per-workbook state shared by the detectors of one OOXML scan."""
+    def __init__(self, zf, path):
+        self.zf, self.path = zf, path
+        self.names = set(zf.NameToInfo)
+        self.wb_part = find_workbook_part(zf)
+        self.xlsb = XlsbWorkbook(zf, self.wb_part) if self.wb_part.endswith(".bin") else None
+        self.sheets = self.xlsb.sheets if self.xlsb else read_workbook(zf, self.wb_part)
+        self.macros = zip_macros(zf)
+        self.links = read_external_links(zf, self.wb_part)
+        self.pivots = read_pivot_caches(zf, self.wb_part)
+        self._init_state()
+
+    def _init_state(self):
+        self.t_rows = self.t_cols = 0
+        self.data = {}
+        self.costs = None
+        self.formulas = None
+        self.graph = DependencyGraph(s.name for s in self.sheets)
+
+    def scan_sheet(self, sheet):
+        self.formulas = FormulaExtractor(sink=partial(self.graph.add, sheet.index))
+        detectors = [cls(self, sheet) for cls in SHEET_DETECTORS]
+        self._replay(sheet, PartStream([self.formulas] + detectors))
+        issues = []
+        for d in detectors: issues.extend(d.finish())
+        return issues
+
+    def read_styles(self):
+        part = next((t for t, kind, _ in read_rels(self.zf, self.wb_part).values() if kind == "/styles" and t in self.names), None)
+        return read_styles(self.zf, part) if part else StyleSummary()
+
+    def read_names(self):
+        return binary_names(self.xlsb) if self.xlsb else read_defined_names(self.zf, self.wb_part)
+
+    def _replay(self, sheet, stream):
+        with self.zf.open(sheet.part) as fh:
+            if sheet.part.endswith(".bin"): XlsbSheetReader(stream, self.xlsb).run(fh)
+            else: stream.run(fh)
+
+
+class XlsScan(WorkbookScan):
+    """Legacy .xls: the same detectors fed from the BIFF8 Workbook stream of the compound file."""
+    def __init__(self, cf, path):
+        self.cf, self.zf, self.path = cf, None, path
+        self.names = set(cf.names()) | {WORKBOOK_STREAM}
+        self.wb_part = WORKBOOK_STREAM
+        self.xlsb = None
+        self.book = XlsWorkbook(cf)
+        self.sheets = self.book.sheets
+        self.macros = ole_macros(cf)
+        self.macros["macrosheets"] = self.book.sheets_of("macrosheet")
+        self.macros["vba"] += self.book.sheets_of("vbamodule")
+        self.links = self.book.links
+        self.pivots = ole_pivot_caches(cf)
+        self._init_state()
+
+    def read_styles(self): return self.book.styles
+
+    def read_names(self): return binary_names(self.book, BIFF8)
+
+    def _replay(self, sheet, stream):
+        XlsSheetReader(stream, self.book).run(self.cf.iter_stream(WORKBOOK_STREAM, self.book.offsets[sheet.index]))
+
+
+def encrypted_result(fname, path):
+    return make_result(fname, size_label(path), "LOCKED",
+                       ["Encrypted Workbook: password-protected package; the COM-free engine cannot decrypt it, use the Excel engine."], "Critical")
+
+
+class OOXMLBackend:
+    """Reads .xlsx/.xlsm/.xlsb parts straight from the zip (and .xls from the compound file); no Excel, no Windows."""
+    name = "ooxml"
+
+    def __init__(self):
+        self.costs = load_costs()  # read once; every workbook this backend scans is priced from it
+
+    def start(self): pass
+    def stop(self): pass
+
+    def scan(self, path, password_prompt=None, passwords=()):
+        fname = os.path.basename(path)
+        if is_encrypted_package(path): return encrypted_result(fname, path)
+        if path.lower().endswith(".xls") and is_cfb(path): return self.scan_xls(fname, path)
+        if not path.lower().endswith(OOXML_EXTENSIONS) or not zipfile.is_zipfile(path):
+            return failure_result(fname, "ERR", "Unsupported Format: COM-free scan reads .xlsx/.xlsm/.xlsb packages and .xls (Excel 97+) files only.")
+        try:
+            with zipfile.ZipFile(path) as zf: return self.audit(fname, path, WorkbookScan(zf, path))
+        except Exception as e:
+            return failure_result(fname, "ERR", str(e))
+
+    def scan_xls(self, fname, path):
+        try:
+            with CompoundFile(path) as cf:
+                if not cf.exists(WORKBOOK_STREAM):
+                    return failure_result(fname, "ERR", "Unsupported Format: pre-Excel 97 (BIFF5) workbook; use the Excel engine.")
+                scan = XlsScan(cf, path)
+                if scan.book.encrypted: return encrypted_result(fname, path)
+                return self.audit(fname, path, scan)
+        except Exception as e:
+            return failure_result(fname, "ERR", str(e))
+
+    def audit(self, fname, path, scan):
+        scan.costs = self.costs
+        issues = []
+        for sheet in scan.sheets:
+            if sheet.part in scan.names: issues.extend(scan.scan_sheet(sheet))
+        for check in WORKBOOK_CHECKS: issues.extend(check(scan))
+        res = make_result(fname, size_label(path), f"[{scan.t_rows}R x {scan.t_cols}C]", issues)
+        if scan.links: res["links"] = [link.as_dict() for link in scan.links]
+        return res
+
+
+BACKENDS = {"ooxml": OOXMLBackend}
+
+
+def get_backend(name="com"):
+    if name == "com":
+        from forensic_com import ComBackend
+        return ComBackend()
+    return BACKENDS[name]()
+
+
+# --- BATCH INPUT ---
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xlsb", ".xls")
+
+
+def expand_paths(args):
+    """Files, globs and directories (walked recursively) -> de-duplicated Excel paths in input order."""
+    seen, out = set(), []
+    for arg in args:
+        if os.path.isdir(arg):
+            found = []
+            for folder, _, files in os.walk(arg):
+                found.extend(os.path.join(folder, f) for f in files if f.lower().endswith(EXCEL_EXTENSIONS) and not f.startswith("~$"))
+            found.sort()
+        elif any(ch in arg for ch in "*?["):
+            found = sorted(p for p in glob.glob(arg, recursive=True) if os.path.isfile(p))
+        else:
+            found = [arg]
+        for p in found:
+            key = os.path.normcase(os.path.abspath(p))
+            if key not in seen:
+                seen.add(key); out.append(p)
+    return out
@@ -0,0 +1,188 @@
+import re
+from collections import Counter
+
+# --- FORMULA TOKENIZER ---
+# One compiled alternation walks each formula once. String literals, quoted sheet names, error
+# literals and bracketed parts are consumed as whole tokens, so nothing inside them can match.
+# Function names are only recognized as complete identifiers directly followed by "(".
+TOKEN = re.compile(r"""
+     (?P<str>"(?:[^"]|"")*")
+    |(?P<err>\#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A|GETTING_DATA|SPILL!|CALC!))
+    |(?P<book>\[(?:[^\[\]]|\[[^\]]*\])*\])
+    |(?P<func>(?:_xlfn\.|_xlws\.)?[A-Za-z_\\][\w.]*)(?=\()
+    |(?P<ref>(?:(?:'(?:[^']|'')*'|[A-Za-z_\\][\w.]*(?::[A-Za-z_\\][\w.]*)?)!)?
+        (?:\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?|\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}|\$?\d+:\$?\d+)
+        (?![\w.(!]))
+    |(?P<name>[A-Za-z_\\][\w.]*)
+    |(?P<num>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+    |(?P<op>\S)
+    """, re.X)
+
+VOLATILE_FUNCTIONS = frozenset(("OFFSET", "INDIRECT", "TODAY", "NOW", "RAND", "RANDBETWEEN", "RANDARRAY", "CELL", "INFO"))
+LOOKUP_FUNCTIONS = frozenset(("VLOOKUP", "HLOOKUP", "LOOKUP", "MATCH", "XLOOKUP", "XMATCH"))
+WHOLE_SPAN = re.compile(r"^\$?(?:[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}|\d+:\$?\d+)$")
+CELL_PART = re.compile(r"^(\$?)([A-Za-z]{0,3})(\$?)(\d*)$")
+MAX_ROWS, MAX_COLS = 1048576, 16384
+
+
+def tokenize(formula):
+    """Yield (kind, text) pairs lazily; kinds are str/err/book/func/ref/name/num/op."""
+    for m in TOKEN.finditer(formula): yield m.lastgroup, m.group()
+
+
+def function_names(formula):
+    if "(" not in formula: return
+    for m in TOKEN.finditer(formula):
+        if m.lastgroup == "func":
+            name = m.group().upper()
+            yield name[6:] if name.startswith(("_XLFN.", "_XLWS.")) else name
+
+
+def has_whole_span(formula):
+    """True if any reference covers whole columns (A:A) or whole rows (1:1)."""
+    for kind, text in tokenize(formula):
+        if kind == "ref" and WHOLE_SPAN.match(text.rpartition("!")[2]): return True
+    return False
+
+
+def _shift_part(part, drow, dcol):
+    m = CELL_PART.match(part)
+    if not m: return part
+    cabs, letters, rabs, digits = m.groups()
+    if letters and not cabs:
+        idx = 0
+        for ch in letters.upper(): idx = idx * 26 + (ord(ch) - 64)
+        idx += dcol
+        if not 1 <= idx <= MAX_COLS: return None
+        letters = ""
+        while idx > 0:
+            idx, rem = divmod(idx - 1, 26)
+            letters = chr(65 + rem) + letters
+    if digits and not rabs:
+        row = int(digits) + drow
+        if not 1 <= row <= MAX_ROWS: return None
+        digits = str(row)
+    return cabs + letters + rabs + digits
+
+
+def _shift_ref(text, drow, dcol):
+    sheet, bang, area = text.rpartition("!")
+    parts = [_shift_part(p, drow, dcol) for p in area.split(":")]
+    if None in parts: return "#REF!"
+    return sheet + bang + ":".join(parts)
+
+
+def _cell(part):
+    m = CELL_PART.match(part)
+    if not m: return None
+    cabs, letters, rabs, digits = m.groups()
+    col = 0
+    for ch in letters.upper(): col = col * 26 + (ord(ch) - 64)
+    return (int(digits) if digits else 0), col, bool(rabs), bool(cabs)
+
+
+def _parse_ref(text):
+    sheet, _, area = text.rpartition("!")
+    first = last = None
+    if sheet:
+        if sheet.startswith("'"): sheet = sheet[1:-1].replace("''", "'")
+        if "[" in sheet: return None
+        first, _, last = sheet.partition(":")
+    parts = area.split(":")
+    a, b = _cell(parts[0]), _cell(parts[-1])
+    if not a or not b: return None
+    flags = a[2] | a[3] << 1 | b[2] << 2 | b[3] << 3
+    return first, last or None, a[0], a[1], b[0], b[1], flags
+
+
+def parse_refs(formula):
+    """References as (sheet, last sheet, r1, c1, r2, c2, absolute flags); rows/cols of 0 mean whole columns/rows.
+
+    sheet is None for same-sheet refs and last is set only for 3D spans. External-book refs are skipped.
+    """
+    refs, external = [], False
+    for kind, text in tokenize(formula):
+        if kind == "ref" and not external:
+            ref = _parse_ref(text)
+            if ref: refs.append(ref)
+        external = kind == "book"
+    return refs
+
+
+def call_profile(formula):
+    """(Counter of function calls, [(innermost enclosing function or None, parse_refs entry)])."""
+    calls, refs, stack, external = Counter(), [], [], False
+    pending = None
+    for kind, text in tokenize(formula):
+        if kind == "func":
+            name = text.upper()
+            pending = name[6:] if name.startswith(("_XLFN.", "_XLWS.")) else name
+            calls[pending] += 1
+        elif kind == "op" and text == "(":
+            stack.append(pending)
+            pending = None
+        elif kind == "op" and text == ")":
+            if stack: stack.pop()
+        elif kind == "ref" and not external:
+            ref = _parse_ref(text)
+            if ref: refs.append((next((f for f in reversed(stack) if f), None), ref))
+        external = kind == "book"
+    return calls, refs
+
+
+def shift_ref(ref, drow, dcol):
+    """parse_refs() entry re-anchored by (drow, dcol); None if it falls off the sheet (#REF!)."""
+    sheet, last, r1, c1, r2, c2, flags = ref
+    out = []
+    for v, bit, delta, limit in ((r1, 1, drow, MAX_ROWS), (c1, 2, dcol, MAX_COLS), (r2, 4, drow, MAX_ROWS), (c2, 8, dcol, MAX_COLS)):
+        if v and not flags & bit:
+            v += delta
+            if not 1 <= v <= limit: return None
+        out.append(v)
+    return (sheet, last, *out, flags)
+
+
+def shift_formula(formula, drow, dcol):
+    """Re-anchor relative references by (drow, dcol), as Excel does for each member of a shared formula."""
+    if not drow and not dcol: return formula
+    return TOKEN.sub(lambda m: _shift_ref(m.group(), drow, dcol) if m.lastgroup == "ref" else m.group(), formula)
+
+
+class FunctionCounter:
+    """Per-function hit counts plus the number of formula cells that hit any watched function."""
+    def __init__(self, watch=VOLATILE_FUNCTIONS):
+        self.watch, self.counts, self.cells = watch, Counter(), 0
+
+    def add(self, formula, weight=1):
+        hit = False
+        for name in function_names(formula):
+            if name in self.watch:
+                self.counts[name] += weight
+                hit = True
+        if hit: self.cells += weight
+        return hit
+
+    def summary(self):
+        return ", ".join(f"{name} x{n}" for name, n in self.counts.most_common())
+
+
+class LookupCounter(FunctionCounter):
+    """Lookup hits, plus how many of those cells search whole columns or rows."""
+    def __init__(self, watch=LOOKUP_FUNCTIONS):
+        super().__init__(watch)
+        self.whole = 0
+
+    def add(self, formula, weight=1):
+        hit = super().add(formula, weight)
+        if hit and has_whole_span(formula): self.whole += weight
+        return hit
+
+
+def iter_formulas(value):
+    """Flatten a COM Range.Formula value (a string or nested tuples) without building one big string."""
+    if isinstance(value, str):
+        if value.startswith("="): yield value
+        return
+    for row in value or ():
+        for f in (row if isinstance(row, tuple) else (row,)):
+            if isinstance(f, str) and f.startswith("="): yield f
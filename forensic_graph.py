@@ -0,0 +1,336 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from forensic_ooxml import col_letters, split_ref
+from forensic_formula import parse_refs, shift_ref, function_names, VOLATILE_FUNCTIONS, MAX_ROWS, MAX_COLS
+
+# --- FORMULA DEPENDENCY GRAPH ---
+# Nodes are formula cells only (constants cannot carry volatility), kept as packed integer keys in arrays.
+# A range reference does not fan out to every cell it covers: each (sheet, column) of formula cells gets an
+# implicit bottom-up segment tree and the range links to the O(log n) tree nodes that span it.
+# Edges are stored as CSR (offsets + targets), i.e. a few machine ints per cell and per edge.
+ROW_SHIFT, SHEET_SHIFT = 15, 36
+GRAPH_CELL_LIMIT = 5000000
+GRAPH_EDGE_LIMIT = 40000000
+PROBE_LIMIT = 32
+HOT_SPOTS = 3
+
+
+def pack(sheet, row, col): return sheet << SHEET_SHIFT | row << ROW_SHIFT | col
+
+
+def unpack(key): return key >> SHEET_SHIFT, (key >> ROW_SHIFT) & 0x1FFFFF, key & 0x7FFF
+
+
+class DependencyGraph:
+    """Precedent -> dependent graph over every formula cell of a workbook, built once all sheets are streamed."""
+    def __init__(self, sheet_names):
+        self.sheet_names = list(sheet_names)
+        self.sheet_index = {n.lower(): i for i, n in enumerate(self.sheet_names)}
+        self.keys, self.fids = array("q"), array("i")
+        self.texts, self.anchors, self.table = [], [], {}
+        self.truncated = self.built = False
+        self.offsets = self.targets = self.parent = None
+        self.total = 0
+
+    def add(self, sheet, row, col, text, si=None):
+        """Record one formula cell; shared-group members arrive with their si and no text."""
+        if len(self.keys) >= GRAPH_CELL_LIMIT:
+            self.truncated = True
+            return
+        tkey = (sheet, si) if si is not None else text
+        fid = self.table.get(tkey)
+        if fid is None:
+            fid = self.table[tkey] = len(self.texts)
+            self.texts.append(text or None)
+            self.anchors.append((row, col) if si is not None else None)
+        elif text and self.texts[fid] is None:  # master streamed after some members
+            self.texts[fid], self.anchors[fid] = text, (row, col)
+        self.keys.append(pack(sheet, row, col))
+        self.fids.append(fid)
+
+    def __len__(self): return len(self.keys)
+
+    def label(self, node):
+        s, r, c = unpack(self.keys[node])
+        return f"{self.sheet_names[s]}!{col_letters(c)}{r}"
+
+    # --- BUILD ---
+    def build(self):
+        if self.built: return self
+        self.built = True
+        keys, n = self.keys, len(self.keys)
+        if any(keys[i] > keys[i + 1] for i in range(n - 1)):
+            order = sorted(range(n), key=keys.__getitem__)
+            self.keys = keys = array("q", (keys[i] for i in order))
+            self.fids = array("i", (self.fids[i] for i in order))
+
+        self.columns = columns = {}  # (sheet, col) -> [rows, nodes, virtual id base]
+        for node, key in enumerate(keys):
+            s, r, c = unpack(key)
+            entry = columns.get((s, c))
+            if entry is None: entry = columns[s, c] = [array("i"), array("i"), 0]
+            entry[0].append(r)
+            entry[1].append(node)
+        self.sheet_cols = {}
+        next_id = n
+        src, dst = array("i"), array("i")
+        for (s, c), entry in columns.items():
+            self.sheet_cols.setdefault(s, []).append(c)
+            nodes, m = entry[1], len(entry[1])
+            entry[2] = base = next_id - 1  # internal tree node p (1 <= p < m) is virtual node base + p
+            next_id += max(m - 1, 0)
+            for p in range(2, 2 * m):
+                src.append(nodes[p - m] if p >= m else base + p)
+                dst.append(base + (p >> 1))
+        for cols in self.sheet_cols.values(): cols.sort()
+        self.total = next_id
+        self.parent = parent = array("i", [-1]) * next_id  # segment-tree parent of every cell and tree node
+        for v, t in zip(src, dst): parent[v] = t
+
+        parsed = {}
+        for d in range(n):
+            fid = self.fids[d]
+            text = self.texts[fid]
+            if text is None: continue
+            refs = parsed.get(fid)
+            if refs is None: refs = parsed[fid] = parse_refs(text)
+            if not refs: continue
+            s, r, c = unpack(keys[d])
+            anchor = self.anchors[fid]
+            dr, dc = (r - anchor[0], c - anchor[1]) if anchor else (0, 0)
+            for ref in refs:
+                if dr or dc:
+                    ref = shift_ref(ref, dr, dc)
+                    if ref is None: continue
+                for sheet in self._sheets(ref, s):
+                    for p in self._precedents(sheet, ref):
+                        src.append(p)
+                        dst.append(d)
+            if len(src) >= GRAPH_EDGE_LIMIT:
+                self.truncated = True
+                break
+
+        self.offsets = offsets = array("q", bytes(8 * (self.total + 1)))
+        for v in src: offsets[v + 1] += 1
+        for i in range(self.total): offsets[i + 1] += offsets[i]
+        fill = array("q", offsets)
+        self.targets = targets = array("i", bytes(4 * len(src)))
+        for v, t in zip(src, dst):
+            targets[fill[v]] = t
+            fill[v] += 1
+        return self
+
+    def _sheets(self, ref, here):
+        if ref[0] is None: return (here,)
+        first = self.sheet_index.get(ref[0].lower())
+        if first is None: return ()
+        if ref[1] is None: return (first,)
+        last = self.sheet_index.get(ref[1].lower(), first)
+        return range(min(first, last), max(first, last) + 1)
+
+    def _precedents(self, sheet, ref):
+        """Graph nodes whose change dirties `ref` on `sheet`: a cell node or the segment-tree nodes covering a range."""
+        _, _, r1, c1, r2, c2, _ = ref
+        if r1 and c1 and r1 == r2 and c1 == c2:
+            key = pack(sheet, r1, c1)
+            i = bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key: yield i
+            return
+        r1, r2 = (min(r1, r2), max(r1, r2)) if r1 else (1, MAX_ROWS)
+        c1, c2 = (min(c1, c2), max(c1, c2)) if c1 else (1, MAX_COLS)
+        cols = self.sheet_cols.get(sheet, ())
+        for ci in range(bisect_left(cols, c1), bisect_right(cols, c2)):
+            rows, nodes, base = self.columns[sheet, cols[ci]]
+            m = len(nodes)
+            lo, hi = bisect_left(rows, r1) + m, bisect_right(rows, r2) + m
+            while lo < hi:
+                if lo & 1:
+                    yield nodes[lo - m] if lo >= m else base + lo
+                    lo += 1
+                if hi & 1:
+                    hi -= 1
+                    yield nodes[hi - m] if hi >= m else base + hi
+                lo >>= 1
+                hi >>= 1
+
+    # --- QUERIES ---
+    def reached(self, sources):
+        """Yield each formula cell recalculated when `sources` are dirty, the sources included."""
+        offsets, targets, n = self.offsets, self.targets, len(self.keys)
+        seen = bytearray(self.total)
+        stack = []
+        for v in sources:
+            if not seen[v]:
+                seen[v] = 1
+                stack.append(v)
+        while stack:
+            v = stack.pop()
+            if v < n: yield v
+            for t in targets[offsets[v]:offsets[v + 1]]:
+                if not seen[t]:
+                    seen[t] = 1
+                    stack.append(t)
+
+    def reach(self, sources):
+        return sum(1 for _ in self.reached(sources))
+
+    def sheet_nodes(self, sheet):
+        return range(bisect_left(self.keys, pack(sheet, 0, 0)), bisect_left(self.keys, pack(sheet + 1, 0, 0)))
+
+    def sheet_of(self, node): return self.keys[node] >> SHEET_SHIFT
+
+    def node_at(self, sheet, row, col):
+        key = pack(sheet, row, col)
+        i = bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def all_volatile_nodes(self):
+        return [v for s in range(len(self.sheet_names)) for v in self.volatile_nodes(s)]
+
+    def volatile_nodes(self, sheet):
+        hot = getattr(self, "_volatile_fids", None)
+        if hot is None:
+            hot = self._volatile_fids = {fid for fid, t in enumerate(self.texts)
+                                         if t and any(f in VOLATILE_FUNCTIONS for f in function_names(t))}
+        return [v for v in self.sheet_nodes(sheet) if self.fids[v] in hot]
+
+    def blast_radius(self, sheet):
+        """(cells recalculated by the sheet's volatile cells together, heaviest single volatile cell, its count).
+
+        The single-cell figure probes one cell per distinct volatile formula, up to PROBE_LIMIT cells.
+        """
+        sources = self.volatile_nodes(sheet)
+        if not sources: return 0, None, 0
+        probes, seen = [], set()
+        for v in sources:
+            if self.fids[v] not in seen:
+                seen.add(self.fids[v])
+                probes.append(v)
+                if len(probes) >= PROBE_LIMIT: break
+        total = self.reach(sources)
+        if len(sources) == 1: return total, sources[0], total
+        worst, worst_n = None, 0
+        for v in probes:
+            k = self.reach((v,))
+            if k > worst_n: worst, worst_n = v, k
+        return total, worst, worst_n
+
+    # --- STRUCTURE ---
+    def structure(self):
+        """One iterative Tarjan pass: circular references and the longest serial dependency chain.
+
+        Returns {"cycles": [[cell nodes] per loop], "chain": (cells, first node, last node)}. Tarjan emits
+        components sinks-first, so each component's depth is final as soon as it is popped.
+        """
+        offsets, targets, total, n = self.offsets, self.targets, self.total, len(self.keys)
+        index, low, comp = array("i", [-1]) * total, array("i", [0]) * total, array("i", [-1]) * total
+        depth, nxt, rep = array("i"), array("i"), array("i")
+        on_stack = bytearray(total)
+        stack, cycles, counter = [], [], 0
+        for root in range(total):
+            if index[root] != -1: continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [[root, offsets[root]]]
+            while work:
+                frame = work[-1]
+                v, i = frame
+                if i < offsets[v + 1]:
+                    frame[1] = i + 1
+                    t = targets[i]
+                    if index[t] == -1:
+                        index[t] = low[t] = counter
+                        counter += 1
+                        stack.append(t)
+                        on_stack[t] = 1
+                        work.append([t, offsets[t]])
+                    elif on_stack[t] and index[t] < low[v]: low[v] = index[t]
+                    continue
+                work.pop()
+                if work and low[v] < low[work[-1][0]]: low[work[-1][0]] = low[v]
+                if low[v] != index[v]: continue
+                c, popped = len(depth), []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    comp[w] = c
+                    popped.append(w)
+                    if w == v: break
+                members = [w for w in popped if w < n]
+                best, best_c = 0, -1
+                looped = len(popped) > 1
+                for w in popped:
+                    for t in targets[offsets[w]:offsets[w + 1]]:
+                        tc = comp[t]
+                        if tc == c: looped = True
+                        elif depth[tc] > best: best, best_c = depth[tc], tc
+                depth.append(len(members) + best)
+                nxt.append(best_c)
+                rep.append(members[0] if members else (rep[best_c] if best_c >= 0 else -1))
+                if looped and members: cycles.append(members)
+        if not depth: return {"cycles": cycles, "chain": (0, -1, -1)}
+        top = max(range(len(depth)), key=depth.__getitem__)
+        end = top
+        while nxt[end] >= 0: end = nxt[end]
+        return {"cycles": cycles, "chain": (depth[top], rep[top], rep[end] if rep[end] >= 0 else rep[top])}
+
+    def hot_spots(self, k=HOT_SPOTS):
+        """(top fan-in, top fan-out) as [(formula cells, node)]; ranges count every formula cell they cover."""
+        offsets, targets, parent, total, n = self.offsets, self.targets, self.parent, self.total, len(self.keys)
+        leaves, reach_out = array("q", [1]) * n + array("q", [0]) * (total - n), array("q", [0]) * total
+        for v in range(n):
+            if parent[v] >= 0: leaves[parent[v]] += 1
+        for v in range(total - 1, n - 1, -1):  # children always carry larger ids than their parent
+            if parent[v] >= 0: leaves[parent[v]] += leaves[v]
+        fan_in = array("q", [0]) * n
+        for v in range(total):
+            for t in targets[offsets[v]:offsets[v + 1]]:
+                if t < n:
+                    fan_in[t] += leaves[v]
+                    reach_out[v] += 1
+        for v in range(n, total):  # dependents inherited from every enclosing range, top-down
+            if parent[v] >= 0: reach_out[v] += reach_out[parent[v]]
+        fan_out = [reach_out[v] + (reach_out[parent[v]] if parent[v] >= 0 else 0) for v in range(n)]
+        return (heapq.nlargest(k, ((fan_in[v], v) for v in range(n))),
+                heapq.nlargest(k, ((fan_out[v], v) for v in range(n))))
+
+    def chain_drift(self, positions):
+        """Formula cells that xl/calcChain.xml orders ahead of one of their precedents (positions: node -> slot or -1)."""
+        offsets, targets, parent, total, n = self.offsets, self.targets, self.parent, self.total, len(self.keys)
+        latest = array("q", positions) + array("q", [-1]) * (total - n)
+        for v in range(n):
+            if parent[v] >= 0 and latest[v] > latest[parent[v]]: latest[parent[v]] = latest[v]
+        for v in range(total - 1, n - 1, -1):
+            if parent[v] >= 0 and latest[v] > latest[parent[v]]: latest[parent[v]] = latest[v]
+        early = bytearray(n)
+        for v in range(total):
+            if latest[v] < 0: continue
+            for t in targets[offsets[v]:offsets[v + 1]]:
+                if t < n and t != v and 0 <= positions[t] < latest[v]: early[t] = 1
+        return sum(early)
+
+
+class CalcChainReader:
+    """Streams xl/calcChain.xml into per-node positions; `i` (sheetId) carries over until the next entry sets it."""
+    tags = ("c",)
+
+    def __init__(self, graph, sheet_ids):
+        self.graph, self.sheet_ids = graph, sheet_ids
+        self.positions = array("q", [-1]) * len(graph)
+        self.sheet, self.seq, self.stale = None, 0, 0
+
+    def start(self, tag, attrs):
+        if "i" in attrs: self.sheet = self.sheet_ids.get(attrs["i"])
+        row, col = split_ref(attrs.get("r", ""))
+        node = self.graph.node_at(self.sheet, row, col) if self.sheet is not None else -1
+        if node < 0: self.stale += 1
+        elif self.positions[node] < 0:
+            self.positions[node] = self.seq
+            self.seq += 1
+
+    def end(self, tag, text): pass
+
+    def missing(self): return sum(1 for p in self.positions if p < 0)
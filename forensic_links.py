@@ -0,0 +1,107 @@
+import re
+from forensic_ooxml import PartStream, local_name, read_rels
+
+# --- EXTERNAL LINK INVENTORY ---
+# Every xl/externalLinks/externalLinkN part is one linked source: a workbook (externalBook), a DDE
+# channel or an OLE object. Its rels hold the target path; the part itself holds the cached sheet
+# names and a sheetDataSet of cached values that is saved, and loaded, with every copy of the file.
+LINK_KINDS = {"externalBook": "book", "ddeLink": "dde", "oleLink": "ole"}
+SHARE = re.compile(r"^(\\\\[^\\]+\\[^\\]+|[A-Za-z]:|[a-z][\w+.-]*://[^/]+)", re.I)
+
+
+class ExternalLink:
+    def __init__(self, part, kind, target, sheets=(), cached_bytes=0, cached_cells=0):
+        self.part, self.kind, self.target = part, kind, target
+        self.sheets, self.cached_bytes, self.cached_cells = list(sheets), cached_bytes, cached_cells
+
+    def as_dict(self):
+        return {"target": self.target, "kind": self.kind, "sheets": self.sheets,
+                "cached_bytes": self.cached_bytes, "cached_cells": self.cached_cells}
+
+
+def normalize_target(target):
+    """Comparable form of a link target: file:// URLs become paths, one slash style, case-folded."""
+    t = target.strip()
+    if t.lower().startswith("file:///"): t = t[8:]
+    elif t.lower().startswith("file://"): t = "\\\\" + t[7:]
+    if not re.match(r"^[a-z][\w+.-]*://", t, re.I): t = t.replace("/", "\\")
+    return t.lower()
+
+
+def link_share(target):
+    """UNC share, drive or URL host a target lives on ('' for relative paths)."""
+    m = SHARE.match(normalize_target(target))
+    return m.group(1) if m else ""
+
+
+class ExternalLinkReader:
+    """Streams one externalLink part: link kind and r:id, cached sheet names, cached cell count and bytes."""
+    tags = ("externalBook", "ddeLink", "oleLink", "sheetName", "sheetDataSet", "cell")
+
+    def __init__(self):
+        self.kind, self.rid, self.target = "book", None, ""
+        self.sheets, self.cells, self.cached_bytes = [], 0, 0
+        self.stream, self._mark = None, None
+
+    def bind(self, stream): self.stream = stream
+
+    def start(self, tag, attrs):
+        if tag == "cell": self.cells += 1
+        elif tag == "sheetName": self.sheets.append(attrs.get("val", ""))
+        elif tag == "sheetDataSet": self._mark = self.stream.parser.CurrentByteIndex
+        else:
+            self.kind = LINK_KINDS[tag]
+            self.rid = next((v for k, v in attrs.items() if local_name(k) == "id"), None)
+            if tag == "ddeLink": self.target = f"{attrs.get('ddeService', '')}|{attrs.get('ddeTopic', '')}"
+            elif tag == "oleLink": self.target = attrs.get("progId", "")
+
+    def end(self, tag, text):
+        if tag == "sheetDataSet" and self._mark is not None:
+            self.cached_bytes += self.stream.parser.CurrentByteIndex - self._mark
+            self._mark = None
+
+
+def read_external_links(zf, wb_part):
+    """ExternalLink per externalLink part the workbook references (xlsb parts report target and part size only)."""
+    parts = [t for t, kind, _ in read_rels(zf, wb_part).values() if kind == "/externalLink" and t in zf.NameToInfo]
+    if not parts: parts = sorted(n for n in zf.NameToInfo if "/externalLinks/" in n and "/_rels/" not in n)
+    links = []
+    for part in parts:
+        rels = read_rels(zf, part)
+        if part.endswith(".bin"):
+            target = next((t for t, kind, _ in rels.values() if kind in ("/externalLinkPath", "/oleObject")), "")
+            links.append(ExternalLink(part, "book", target, cached_bytes=zf.getinfo(part).file_size))
+            continue
+        reader = ExternalLinkReader()
+        with zf.open(part) as fh: PartStream([reader]).run(fh)
+        target = rels.get(reader.rid, (reader.target,))[0] if reader.rid else reader.target
+        links.append(ExternalLink(part, reader.kind, target, reader.sheets, reader.cached_bytes, reader.cells))
+    return links
+
+
+class LinkInventory:
+    """Batch-wide view of link targets: which workbooks depend on each target and share, and the cache they carry."""
+    def __init__(self):
+        self.targets = {}  # normalized target -> [display target, {paths}, cached bytes, {sheets}]
+
+    def add(self, path, links):
+        """`links` as carried in a result's "links" list (ExternalLink.as_dict())."""
+        for link in links:
+            if not link["target"]: continue
+            entry = self.targets.setdefault(normalize_target(link["target"]), [link["target"], set(), 0, set()])
+            entry[1].add(path)
+            entry[2] += link["cached_bytes"]
+            entry[3].update(link["sheets"])
+
+    def rows(self):
+        """[(target, share, workbook count, cached bytes, sheet names)], most depended-on first."""
+        out = [(t, link_share(t), len(paths), size, sorted(sheets)) for t, paths, size, sheets in self.targets.values()]
+        out.sort(key=lambda r: (-r[2], -r[3], r[0].lower()))
+        return out
+
+    def shares(self):
+        """{share: number of distinct workbooks that depend on something on it}."""
+        found = {}
+        for t, paths, _, _ in self.targets.values():
+            found.setdefault(link_share(t), set()).update(paths)
+        return {share: len(paths) for share, paths in sorted(found.items(), key=lambda kv: -len(kv[1]))}
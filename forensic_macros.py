@@ -0,0 +1,50 @@
+from xml.parsers import expat
+from forensic_ooxml import read_content_types
+
+# --- MACRO PRESENCE ---
+# Decided from the zip directory plus [Content_Types].xml, or from the OLE storage tree; no VBA
+# module, sheet or control is decompressed, so this costs microseconds per file. Triage goes further
+# and reads part names only, so not even [Content_Types].xml is inflated.
+CT_VBA = "application/vnd.ms-office.vbaproject"
+CT_MACROSHEETS = frozenset(("application/vnd.ms-excel.macrosheet+xml", "application/vnd.ms-excel.macrosheet",
+                            "application/vnd.ms-excel.intlmacrosheet+xml", "application/vnd.ms-excel.intlmacrosheet"))
+CT_ACTIVEX_BIN = "application/vnd.ms-office.activex"
+OLE_VBA, OLE_CONTROLS = "_VBA_PROJECT_CUR", "Ctls"
+
+
+def zip_macros(zf):
+    """{"vba", "macrosheets", "activex"} -> part names, typed by [Content_Types].xml with folder names as fallback."""
+    defaults, overrides = {}, {}
+    if "[Content_Types].xml" in zf.NameToInfo:
+        try: defaults, overrides = read_content_types(zf)
+        except expat.ExpatError: pass
+    return name_macros(zf.namelist(), lambda low: overrides.get("/" + low) or defaults.get(low.rpartition(".")[2], ""))
+
+
+def name_macros(names, content_type=lambda low: ""):
+    """Same shape from part names alone (folder and extension) unless `content_type` maps a lowercased name to its type."""
+    found = {"vba": [], "macrosheets": [], "activex": []}
+    for name in names:
+        low = name.lower()
+        if "/_rels/" in low: continue
+        ctype = content_type(low)
+        if ctype == CT_VBA or low.endswith("vbaproject.bin"): found["vba"].append(name)
+        elif ctype in CT_MACROSHEETS or "/macrosheets/" in low: found["macrosheets"].append(name)
+        elif ctype == CT_ACTIVEX_BIN or ("/activex/" in low and low.endswith(".bin")): found["activex"].append(name)
+    return found
+
+
+def ole_macros(cf):
+    """Same shape for a legacy .xls, from its directory entries; XLM macro sheets need the BOUNDSHEET records instead."""
+    return {"vba": [OLE_VBA] if cf.exists(OLE_VBA) else [], "macrosheets": [],
+            "activex": [OLE_CONTROLS] if cf.exists(OLE_CONTROLS) else []}
+
+
+def macro_issues(found):
+    issues = []
+    if found["vba"]: issues.append("VBA Metadata: Script-based security risk.")
+    if found["macrosheets"]:
+        issues.append(f"Excel 4.0 Macros: {len(found['macrosheets'])} macro sheet(s) run XLM code outside the VBA project "
+                      f"({', '.join(found['macrosheets'][:3])}).")
+    if found["activex"]: issues.append(f"ActiveX Controls: {len(found['activex'])} embedded control binaries.")
+    return issues
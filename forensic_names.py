@@ -0,0 +1,106 @@
+import re
+import struct
+from forensic_ooxml import PartStream
+from forensic_formula import tokenize
+from forensic_xlsb import BIFF12, decompile
+
+# --- DEFINED NAMES ANALYZER ---
+# workbook.xml <definedNames> is streamed once (binary workbooks decompile their name records), so
+# 100k legacy names cost one pass instead of one COM round trip each. Names are classified by their
+# formula tokens, and "unused" is decided against the name tokens of every cell, rule and name formula
+# and of every pivot cache source.
+NAME_COUNT_LIMIT = 5000
+UNUSED_NAME_LIMIT = 100
+BUILTIN_PREFIX = "_XLNM."
+EXTERNAL_BOOK = re.compile(r"^'?\[\d+\]")  # [1]Sheet1!A1 or '[1]My Sheet'!A1; Table1[Col] is not a book
+
+
+class DefinedName:
+    def __init__(self, name, scope, hidden, formula):
+        self.name, self.scope, self.hidden, self.formula = name, scope, hidden, formula
+
+    def builtin(self): return self.name.upper().startswith(BUILTIN_PREFIX)
+
+    def broken(self): return "#REF!" in self.formula.upper() and any(t == "#REF!" for k, t in tokenize(self.formula) if k == "err")
+
+    def external(self):
+        return "[" in self.formula and any(k in ("book", "ref") and EXTERNAL_BOOK.match(t) for k, t in tokenize(self.formula))
+
+
+class DefinedNamesReader:
+    """<definedName name localSheetId hidden>formula</definedName> entries of workbook.xml."""
+    tags = text_tags = ("definedName",)
+
+    def __init__(self):
+        self.names, self.attrs = [], None
+
+    def start(self, tag, attrs): self.attrs = attrs
+
+    def end(self, tag, text):
+        a = self.attrs
+        scope = int(a["localSheetId"]) if a.get("localSheetId", "").isdigit() else None
+        self.names.append(DefinedName(a.get("name", ""), scope, a.get("hidden") in ("1", "true"), text))
+
+
+def read_defined_names(zf, wb_part):
+    reader = DefinedNamesReader()
+    with zf.open(wb_part) as fh: PartStream([reader]).run(fh)
+    return reader.names
+
+
+def binary_names(book, lay=BIFF12):
+    """DefinedName per (name, itab, flags, rgce) record of an XlsbWorkbook / XlsWorkbook; bit 0 is fHidden in both."""
+    names = []
+    for name, itab, flags, rgce in book.names:
+        try: text = decompile(rgce, book, 0, 0, lay)
+        except (ValueError, IndexError, struct.error):
+            book.unparsed += 1
+            text = ""
+        names.append(DefinedName(name, None if itab == 0xFFFFFFFF else itab, bool(flags & 1), text))
+    return names
+
+
+def name_tokens(formula, into):
+    """Add the upper-cased identifiers of a formula (plain names and called names, e.g. LAMBDAs) to `into`."""
+    for kind, text in tokenize(formula):
+        if kind in ("name", "func"): into.add(text.upper())
+    return into
+
+
+class NameUsageDetector:
+    """Identifiers used by the sheet's cell formulas and its conditional-format / validation rules."""
+    tags = text_tags = ("formula", "formula1", "formula2", "f")
+
+    def __init__(self, scan, sheet):
+        self.scan = scan
+        self.stream = None
+        self.used = scan.data.setdefault("names_used", set())
+
+    def bind(self, stream): self.stream = stream
+
+    def start(self, tag, attrs): pass
+
+    def end(self, tag, text):
+        # cell <f> texts are read once per distinct formula in finish(); rule formulas are few and read here
+        if text and (tag != "f" or self.stream.qname.startswith("xm:")): name_tokens(text, self.used)
+
+    def finish(self):
+        for text, _ in self.scan.formulas.distinct(): name_tokens(text, self.used)
+        return []
+
+
+def name_issues(names, used):
+    """Broken (#REF!), hidden, external and unused names; built-ins (_xlnm.*) are never hidden or unused findings."""
+    if not names: return []
+    by_names = set()
+    for n in names:
+        if n.formula: by_names.update(name_tokens(n.formula, set()) - {n.name.upper()})
+    broken = [n.name for n in names if n.broken()]
+    external = [n.name for n in names if n.external()]
+    user = [n for n in names if not n.builtin()]
+    hidden = [n.name for n in user if n.hidden]
+    unused = [n.name for n in user if n.name.upper() not in used and n.name.upper() not in by_names]
+    if not broken and not external and not hidden and len(unused) <= UNUSED_NAME_LIMIT and len(names) <= NAME_COUNT_LIMIT: return []
+    parts = [f"{len(found)} {label} (e.g. {', '.join(found[:3])})" for label, found in
+             (("broken #REF!", broken), ("hidden", hidden), ("external", external), ("unused", unused)) if found]
+    return [f"Defined Names: {len(names)} names; {'; '.join(parts) or 'none broken, hidden, external or unused'}."]
@@ -0,0 +1,214 @@
+import posixpath
+from xml.parsers import expat
+
+# --- PACKAGE CONSTANTS ---
+CHUNK = 1 << 16
+MAX_ROWS, MAX_COLS = 1048576, 16384
+REL_OFFICE_DOC = "/officeDocument"
+REL_WORKSHEET = "/worksheet"
+
+
+def local_name(name):
+    return name.rpartition(":")[2] if ":" in name else name
+
+
+def col_index(letters):
+    idx = 0
+    for ch in letters.upper(): idx = idx * 26 + (ord(ch) - 64)
+    return idx
+
+
+def col_letters(idx):
+    out = ""
+    while idx > 0:
+        idx, rem = divmod(idx - 1, 26)
+        out = chr(65 + rem) + out
+    return out
+
+
+def split_ref(ref):
+    """'AB12' -> (12, 28). Missing parts come back as 0."""
+    ref = ref.replace("$", "")
+    i = 0
+    while i < len(ref) and ref[i].isalpha(): i += 1
+    col = col_index(ref[:i]) if i else 0
+    row = int(ref[i:]) if ref[i:].isdigit() else 0
+    return row, col
+
+
+def parse_area(area):
+    """'B3:F20' -> (3, 2, 20, 6); whole columns/rows are expanded to sheet limits."""
+    first, _, last = area.partition(":")
+    r1, c1 = split_ref(first)
+    r2, c2 = split_ref(last) if last else (r1, c1)
+    if not r1 and not r2: r1, r2 = 1, MAX_ROWS
+    if not c1 and not c2: c1, c2 = 1, MAX_COLS
+    return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+
+def resolve_target(base_part, target):
+    if target.startswith("/"): return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base_part), target))
+
+
+class PartStream:
+    """Incremental expat driver: feeds one zip part in chunks and dispatches to handlers by local tag name.
+
+    Handlers expose `tags` (and optionally `text_tags` and bind(stream)) plus start(tag, attrs) / end(tag, text).
+    The stream tracks the current row/column cursor so sheet handlers never re-parse cell refs.
+    """
+    def __init__(self, handlers):
+        self.starts, self.ends, self.text_tags = {}, {}, set()
+        for h in handlers:
+            for tag in h.tags:
+                self.starts.setdefault(tag, []).append(h.start)
+                self.ends.setdefault(tag, []).append(h.end)
+            self.text_tags.update(getattr(h, "text_tags", ()))
+            if hasattr(h, "bind"): h.bind(self)
+        self.row = self.col = 0
+        self.qname = ""
+        self.parser = None
+        self._text = None
+
+    def start(self, name, attrs):
+        self.qname = name
+        tag = local_name(name)
+        if tag == "c":
+            ref = attrs.get("r")
+            if ref: self.row, self.col = split_ref(ref)
+            else: self.col += 1
+        elif tag == "row":
+            r = attrs.get("r")
+            self.row = int(r) if r else self.row + 1
+            self.col = 0
+        if tag in self.text_tags: self._text = []
+        for cb in self.starts.get(tag, ()): cb(tag, attrs)
+
+    def end(self, name):
+        self.qname = name
+        tag = local_name(name)
+        text = ""
+        if self._text is not None and tag in self.text_tags:
+            text, self._text = "".join(self._text), None
+        for cb in self.ends.get(tag, ()): cb(tag, text)
+
+    def chars(self, data):
+        if self._text is not None: self._text.append(data)
+
+    def run(self, fileobj):
+        self.parser = p = expat.ParserCreate()
+        p.buffer_text = True
+        p.StartElementHandler, p.EndElementHandler, p.CharacterDataHandler = self.start, self.end, self.chars
+        while True:
+            chunk = fileobj.read(CHUNK)
+            if not chunk: break
+            p.Parse(chunk, False)
+        p.Parse(b"", True)
+
+
+def stream_part(zf, part, handlers):
+    with zf.open(part) as fh: PartStream(handlers).run(fh)
+
+
+class _Collector:
+    """Generic handler that records attrs of the listed tags, in document order."""
+    def __init__(self, *tags):
+        self.tags, self.items = tags, []
+
+    def start(self, tag, attrs): self.items.append((tag, attrs))
+    def end(self, tag, text): pass
+
+
+class FormulaExtractor:
+    """Formula cells of one sheet pass, folded into distinct formulas weighted by how many cells use them.
+
+    A shared group (<f t="shared" si=..>) is kept as its master text and member count; members carry no
+    text, so a group costs one entry however many cells it spans.
+    An optional sink(row, col, text, si) sees every formula cell, e.g. to feed the dependency graph.
+    """
+    tags = ("f",)
+    text_tags = ("f",)
+
+    def __init__(self, sink=None):
+        self.stream, self.attrs, self.sink = None, None, sink
+        self.plain = {}   # formula text -> cells
+        self.shared = {}  # si -> [master text, cells]
+
+    def bind(self, stream): self.stream = stream
+
+    def start(self, tag, attrs):
+        # <xm:f> holds x14 conditional-format and validation formulas, not cell formulas
+        self.attrs = None if self.stream.qname.startswith("xm:") else attrs
+
+    def end(self, tag, text):
+        a = self.attrs
+        if a is None: return
+        if a.get("t") == "shared" and "si" in a:
+            group = self.shared.get(a["si"])
+            if group is None: group = self.shared[a["si"]] = [None, 0]
+            if text: group[0] = text
+            group[1] += 1
+            if self.sink: self.sink(self.stream.row, self.stream.col, text, a["si"])
+        elif text:
+            self.plain[text] = self.plain.get(text, 0) + 1
+            if self.sink: self.sink(self.stream.row, self.stream.col, text, None)
+
+    def distinct(self):
+        """(formula, cells) once per distinct formula text; shared groups count every member."""
+        totals = dict(self.plain)
+        for text, n in self.shared.values():
+            if text: totals[text] = totals.get(text, 0) + n
+        return totals.items()
+
+
+def read_rels(zf, part):
+    """Relationships of `part` as {rId: (absolute target, type suffix, mode)}."""
+    folder, base = posixpath.split(part)
+    rels_part = posixpath.join(folder, "_rels", base + ".rels")
+    if rels_part not in zf.NameToInfo: return {}
+    col = _Collector("Relationship")
+    stream_part(zf, rels_part, [col])
+    rels = {}
+    for _, a in col.items:
+        mode = a.get("TargetMode", "Internal")
+        target = a.get("Target", "")
+        if mode != "External": target = resolve_target(part, target)
+        rels[a.get("Id")] = (target, "/" + a.get("Type", "").rpartition("/")[2], mode)
+    return rels
+
+
+def read_content_types(zf):
+    """[Content_Types].xml as ({extension: type}, {part name: type}), all lower-cased."""
+    col = _Collector("Default", "Override")
+    stream_part(zf, "[Content_Types].xml", [col])
+    defaults, overrides = {}, {}
+    for tag, attrs in col.items:
+        ctype = attrs.get("ContentType", "").lower()
+        if tag == "Default": defaults[attrs.get("Extension", "").lower()] = ctype
+        else: overrides[attrs.get("PartName", "").lower()] = ctype
+    return defaults, overrides
+
+
+def find_workbook_part(zf):
+    for target, kind, _ in read_rels(zf, "").values():
+        if kind == REL_OFFICE_DOC: return target
+    return "xl/workbook.xml"
+
+
+class SheetInfo:
+    def __init__(self, index, name, part, sheet_id, state):
+        self.index, self.name, self.part, self.sheet_id, self.state = index, name, part, sheet_id, state
+
+
+def read_workbook(zf, wb_part):
+    """Sheets listed in workbook.xml, in tab order, with their resolved part names."""
+    col = _Collector("sheet")
+    stream_part(zf, wb_part, [col])
+    rels = read_rels(zf, wb_part)
+    sheets = []
+    for _, a in col.items:
+        rid = next((v for k, v in a.items() if local_name(k) == "id"), None)
+        target, kind, _ = rels.get(rid, ("", "", ""))
+        if kind != REL_WORKSHEET: continue
+        sheets.append(SheetInfo(len(sheets), a.get("name", ""), target, a.get("sheetId"), a.get("state", "visible")))
+    return sheets
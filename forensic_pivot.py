@@ -0,0 +1,128 @@
+import re
+import struct
+from forensic_ooxml import PartStream, local_name, read_rels
+from forensic_xls import iter_biff
+
+# --- PIVOT CACHE ANALYZER ---
+# A pivot cache is a definition part (source, saveData, refreshOnLoad, recordCount) plus an optional
+# pivotCacheRecords part holding a copy of every source row. Only the definition is parsed, and only
+# up to its cacheSource; the records part is measured from the zip directory and never decompressed.
+# A legacy .xls cache is one stream whose SXDB header carries the saveData flag and the record count;
+# its size (field definitions included) stands in for the records, so those bytes are an estimate.
+PIVOT_RECOVERABLE_LIMIT = 1024 * 1024
+OLE_PIVOT_STORAGE = "_SX_DB_CUR"
+SXDB = 0x00C6
+
+
+class PivotCache:
+    def __init__(self, part, label):
+        self.part, self.label = part, label
+        self.save_data, self.refresh_on_load, self.record_count = True, False, 0
+        self.source, self.source_text = None, "unknown source"
+        self.definition_bytes = self.records_bytes = self.records_disk = 0
+        self.estimated = False  # records_bytes is the whole cache stream, not a measured records part
+        self.duplicate_of = None
+
+    def recoverable(self):
+        """Uncompressed bytes that go away if this cache stops saving records (or is merged into its twin)."""
+        if self.duplicate_of is not None: return self.records_bytes + self.definition_bytes
+        return self.records_bytes if self.save_data else 0
+
+    def reason(self):
+        if self.duplicate_of is not None: return f"duplicate of cache {self.duplicate_of.label}"
+        if self.refresh_on_load: return "rebuilt on open anyway"
+        return "saved source data"
+
+    def size_text(self):
+        mb = self.recoverable() / (1024 * 1024)
+        if self.estimated: return f"~{mb:.2f} MB (estimated from the cache stream)"
+        if self.records_disk: return f"{mb:.2f} MB, {self.records_disk / (1024 * 1024):.2f} MB compressed"
+        return f"{mb:.2f} MB"
+
+
+class _SourceFound(Exception): pass
+
+
+class PivotDefinitionReader:
+    """pivotCacheDefinition attributes and cacheSource; stops the parse before the cacheFields."""
+    tags = ("pivotCacheDefinition", "cacheSource", "worksheetSource", "consolidation")
+
+    def __init__(self, cache):
+        self.cache, self.kind, self.connection, self.rid = cache, "worksheet", None, None
+
+    def start(self, tag, attrs):
+        c = self.cache
+        if tag == "pivotCacheDefinition":
+            c.save_data = attrs.get("saveData", "1") not in ("0", "false")
+            c.refresh_on_load = attrs.get("refreshOnLoad", "0") in ("1", "true")
+            c.record_count = int(attrs.get("recordCount") or 0)
+        elif tag == "cacheSource":
+            self.kind, self.connection = attrs.get("type", "worksheet"), attrs.get("connectionId")
+            if self.kind == "external": c.source, c.source_text = ("connection", self.connection), f"connection {self.connection}"
+        elif tag == "worksheetSource":
+            sheet, ref, name = attrs.get("sheet", ""), attrs.get("ref", ""), attrs.get("name", "")
+            self.rid = next((v for k, v in attrs.items() if local_name(k) == "id"), None)
+            c.source = ("range", self.rid, sheet.lower(), ref.replace("$", "").upper(), name.lower())
+            c.source_text = name or (f"{sheet}!{ref}" if sheet else ref)
+        elif tag == "consolidation": c.source_text = "consolidation ranges"
+
+    def end(self, tag, text):
+        if tag == "cacheSource": raise _SourceFound()
+
+
+def read_pivot_caches(zf, wb_part):
+    """PivotCache per definition part; duplicates point at the first cache built over the same source."""
+    parts = [t for t, kind, _ in read_rels(zf, wb_part).values() if kind == "/pivotCacheDefinition" and t in zf.NameToInfo]
+    caches, seen = [], {}
+    for part in parts:
+        num = re.search(r"(\d+)\.\w+$", part)
+        cache = PivotCache(part, num.group(1) if num else str(len(caches) + 1))
+        cache.definition_bytes = zf.getinfo(part).file_size
+        rels = read_rels(zf, part)
+        if part.endswith(".xml"):
+            reader = PivotDefinitionReader(cache)
+            try:
+                with zf.open(part) as fh: PartStream([reader]).run(fh)
+            except _SourceFound: pass
+            if reader.rid in rels and cache.source: cache.source = cache.source[:1] + (rels[reader.rid][0].lower(),) + cache.source[2:]
+        records = next((t for t, kind, _ in rels.values() if kind == "/pivotCacheRecords" and t in zf.NameToInfo), None)
+        if records:
+            info = zf.getinfo(records)
+            cache.records_bytes, cache.records_disk = info.file_size, info.compress_size
+        else: cache.save_data = False
+        if cache.source is not None:
+            cache.duplicate_of = seen.get(cache.source)
+            seen.setdefault(cache.source, cache)
+        caches.append(cache)
+    return caches
+
+
+def ole_pivot_caches(cf):
+    """Legacy .xls keep every cache as a stream under _SX_DB_CUR; sources live in the Workbook stream.
+
+    Only the SXDB header is read: crdbdb (record count), then fSaveData and fRefreshOnLoad in its flags.
+    A stream without one is reported as not saving data, so nothing unverified is claimed.
+    """
+    caches = []
+    for path in sorted(cf.names()):
+        folder, _, name = path.rpartition("/")
+        if folder.upper() != OLE_PIVOT_STORAGE: continue
+        cache = PivotCache(path, name)
+        cache.save_data, cache.estimated = False, True
+        for _, rt, data in iter_biff(cf.iter_stream(path)):  # SXDB opens the stream
+            if rt == SXDB and len(data) >= 8:
+                count, _, flags = struct.unpack_from("<iHH", data, 0)
+                cache.record_count, cache.save_data, cache.refresh_on_load = max(count, 0), bool(flags & 1), bool(flags & 4)
+            break
+        if cache.save_data: cache.records_bytes = cf.entries[path.lower()].size
+        caches.append(cache)
+    return caches
+
+
+def pivot_issues(caches, limit=PIVOT_RECOVERABLE_LIMIT):
+    total = sum(c.recoverable() for c in caches)
+    if total < limit and not any(c.duplicate_of for c in caches): return []
+    worst = sorted((c for c in caches if c.recoverable()), key=lambda c: -c.recoverable())
+    detail = "; ".join(f"cache {c.label} {c.source_text}, {c.record_count} records, {c.size_text()}: {c.reason()}" for c in worst[:3])
+    approx = "~" if any(c.estimated for c in worst) else ""
+    return [f"Pivot Cache Bloat: {approx}{total / (1024 * 1024):.2f} MB recoverable from {len(worst)} of {len(caches)} pivot caches ({detail})."]
@@ -0,0 +1,224 @@
+import os, time, queue, threading, collections
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from forensic_engine import get_backend, make_result, failure_result, partition_encrypted
+
+
+class _Worker(threading.Thread):
+    """One automation worker: its own thread, backend instance (and so its own COM apartment) and inbox."""
+    def __init__(self, backend_factory, done, scan_kw):
+        super().__init__(daemon=True)
+        self.backend_factory, self.done, self.scan_kw = backend_factory, done, scan_kw
+        self.inbox = queue.Queue()
+        self.backend = None
+        self.current = None  # (index, path, monotonic start) of the file being scanned
+        self.retired = False
+
+    def run(self):
+        self.backend, start_error = self.backend_factory(), None
+        try: self.backend.start()
+        except Exception as e: start_error = f"Engine Start Failed: {e}"
+        try:
+            while True:
+                item = self.inbox.get()
+                if item is None: break
+                idx, path = item
+                self.current = (idx, path, time.monotonic())
+                if start_error: res = failure_result(os.path.basename(path), "ERR", start_error)
+                else:
+                    try: res = self.backend.scan(path, **self.scan_kw)
+                    except Exception as e: res = failure_result(os.path.basename(path), "ERR", str(e))
+                self.current = None
+                self.done.put((self, idx, res))
+        finally:
+            try: self.backend.stop()
+            except: pass
+
+    def kill(self):
+        """Called from the dispatcher thread: terminate this worker's own Excel process only."""
+        self.retired = True
+        kill = getattr(self.backend, "kill", None)
+        if kill:
+            try: kill()
+            except: pass
+
+
+def timeout_result(path, timeout):
+    return make_result(os.path.basename(path), "N/A", "TIMEOUT",
+                       [f"Timeout: no response within {timeout:g}s; the stuck Excel worker was killed and respawned."], "Critical")
+
+
+def cancelled_result(path):
+    return failure_result(os.path.basename(path), "ERR", "Cancelled: the worker pool was closed before this file was scanned.")
+
+
+CLOSE_TIMEOUT = 5.0
+
+
+class ExcelWorkerPool:
+    """Runs batches over N backend workers and returns results in input order.
+
+    Workers (and so their warm Excel instances) persist across map() calls until close().
+    With `timeout` set, a watchdog gives every file a deadline: a worker that overruns it has its
+    own Excel process killed, the file is recorded as a Timeout and a fresh worker takes its place.
+    close() may be called from any thread while a batch runs: it cancels the batch instead of waiting for it.
+    """
+    def __init__(self, workers=1, backend_factory=None, timeout=None):
+        self.size = max(1, int(workers))
+        self.backend_factory = backend_factory or (lambda: get_backend("com"))
+        self.timeout = timeout
+        self.workers, self.retired = [], []
+        self.done = queue.Queue()
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+
+    def _spawn(self, scan_kw):
+        w = _Worker(self.backend_factory, self.done, scan_kw)
+        w.start()
+        self.workers.append(w)
+        return w
+
+    def map(self, paths, on_result=None, **scan_kw):
+        """Extra keyword arguments (e.g. passwords) are passed through to backend.scan()."""
+        paths = list(paths)
+        results = [None] * len(paths)
+        if not paths: return results
+        todo = collections.deque(enumerate(paths))
+
+        def record(idx, res):
+            results[idx] = res
+            if on_result: on_result(idx, res)
+
+        with self.lock:
+            if self.cancelled.is_set(): todo.clear()
+            while todo and len(self.workers) < min(self.size, len(paths)): self._spawn(scan_kw)
+            for w in self.workers:
+                w.scan_kw = scan_kw
+                if todo: w.inbox.put(todo.popleft())
+            remaining = len(paths)
+            poll = min(self.timeout / 4, 1.0) if self.timeout else 0.5  # bounded so a close() is noticed
+            while remaining and not self.cancelled.is_set():
+                try: w, idx, res = self.done.get(timeout=poll)
+                except queue.Empty: w = None
+                if w is not None and not w.retired:
+                    record(idx, res)
+                    remaining -= 1
+                    if todo: w.inbox.put(todo.popleft())
+                if not self.timeout: continue
+                # WATCHDOG: kill and replace only the worker that overran its deadline
+                now = time.monotonic()
+                for stuck in [x for x in self.workers if x.current and now - x.current[2] > self.timeout]:
+                    idx, path, _ = stuck.current
+                    stuck.kill()
+                    stuck.inbox.put(None)
+                    self.workers.remove(stuck); self.retired.append(stuck)
+                    record(idx, timeout_result(path, self.timeout))
+                    remaining -= 1
+                    if todo: self._spawn(scan_kw).inbox.put(todo.popleft())
+        for idx, res in enumerate(results):
+            if res is None: record(idx, cancelled_result(paths[idx]))
+        return results
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Quit every warm instance; call once when the application or job exits.
+
+        Never takes the batch lock while a map() runs: the batch is cancelled, queued files are dropped
+        and workers still busy after `timeout` seconds are killed through the watchdog's kill path.
+        """
+        self.cancelled.set()
+        workers = list(self.workers)
+        for w in workers:
+            try:
+                while True: w.inbox.get_nowait()
+            except queue.Empty: pass
+            w.inbox.put(None)
+        deadline = time.monotonic() + timeout
+        for w in workers: w.join(max(0, deadline - time.monotonic()))
+        for w in workers:
+            if w.is_alive(): w.kill()
+        # map() leaves within one poll of the cancel; a worker it spawned meanwhile is told to quit too
+        if self.lock.acquire(timeout=2.0):
+            for w in self.workers:
+                if w not in workers: w.inbox.put(None)
+            self.workers, self.retired = [], []
+            self.lock.release()
+
+
+# --- PROCESS POOL (COM-free backends) ---
+_process_backend = None
+
+
+def _init_process(backend_name):
+    global _process_backend
+    _process_backend = get_backend(backend_name)
+    _process_backend.start()
+
+
+def _scan_in_process(path, scan_kw):
+    try: return _process_backend.scan(path, **scan_kw)
+    except Exception as e: return failure_result(os.path.basename(path), "ERR", str(e))
+
+
+class ProcessWorkerPool:
+    """Same map() contract as ExcelWorkerPool, but one process per worker so pure-Python parsing uses every core."""
+    def __init__(self, workers=None, backend_name="ooxml"):
+        self.size = max(1, int(workers or os.cpu_count() or 1))
+        self.backend_name = backend_name
+
+    def map(self, paths, on_result=None, **scan_kw):
+        paths = list(paths)
+        results = [None] * len(paths)
+        if not paths: return results
+        scan_kw.pop("password_prompt", None)  # callbacks cannot cross process boundaries
+        with ProcessPoolExecutor(min(self.size, len(paths)), initializer=_init_process, initargs=(self.backend_name,)) as ex:
+            futures = {ex.submit(_scan_in_process, p, scan_kw): i for i, p in enumerate(paths)}
+            for fut in as_completed(futures):
+                idx = futures[fut]
+                try: res = fut.result()
+                except Exception as e: res = failure_result(os.path.basename(paths[idx]), "ERR", str(e))
+                results[idx] = res
+                if on_result: on_result(idx, res)
+        return results
+
+    def close(self): pass
+
+
+# --- BATCH WITH DEFERRED ENCRYPTED FILES ---
+class BatchAudit:
+    """Audits the plain files first; encrypted ones wait in a deferred queue.
+
+    Encryption is spotted up front from EncryptionInfo or an .xls FILEPASS record; a file the plain pass
+    still reports as LOCKED (e.g. a protection the container does not show) joins the deferred queue too.
+
+    The deferred files are tried against a password list at the end of the batch, so one protected
+    workbook never stalls the others. Whatever stays locked can be retried later with retry().
+    on_deferred(indexes) hears of every file as it is deferred, so ordered output can move past it.
+    """
+    def __init__(self, pool, paths, on_result=None, cache=None, ruleset=None, on_deferred=None):
+        self.pool, self.paths, self.on_result, self.on_deferred = pool, list(paths), on_result, on_deferred
+        self.cache, self.ruleset = cache, ruleset
+        self.results = [None] * len(self.paths)
+
+    def _audit(self, idxs, report_locked=True, **scan_kw):
+        def on_sub(j, res):
+            i = idxs[j]
+            self.results[i] = res
+            if report_locked or res.get("dims") != "LOCKED":
+                if self.on_result: self.on_result(i, res)
+            elif self.on_deferred: self.on_deferred([i])
+        sub = [self.paths[i] for i in idxs]
+        if self.cache:
+            from forensic_cache import cached_map
+            cached_map(self.pool, self.cache, self.ruleset, sub, on_result=on_sub, **scan_kw)
+        else:
+            self.pool.map(sub, on_result=on_sub, **scan_kw)
+        return [i for i in idxs if self.results[i].get("dims") == "LOCKED"]
+
+    def run(self, passwords=()):
+        """Returns the indexes that are still locked after trying `passwords`."""
+        plain, deferred = partition_encrypted(self.paths)
+        if self.on_deferred and deferred: self.on_deferred(deferred)
+        deferred = sorted(deferred + self._audit(plain, report_locked=False))
+        return self._audit(deferred, report_locked=False, passwords=list(passwords)) if deferred else []
+
+    def retry(self, idxs, passwords):
+        return self._audit(list(idxs), passwords=list(passwords)) if idxs else []
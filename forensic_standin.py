@@ -0,0 +1,93 @@
+import threading
+
+# --- LOCAL STAND-IN FOR THE EXCEL OBJECT MODEL ---
+# Fakes just the surface ComBackend touches (Workbooks.Open / Sheets / UsedRange / SpecialCells)
+# so the worker pool can be exercised without Excel. Books are described as plain dicts:
+#   {"sheets": [{"name": "Data", "rows": 10, "cols": 3, "last_row": 9000, "formulas": ["=OFFSET(A1,1,1)"]}],
+#    "vba": False, "links": (), "password": "", "delay": 0, "error": ""}
+# A long "delay" emulates a workbook that hangs Workbooks.Open; terminate() plays the watchdog kill.
+# "error" makes LinkSources raise it, i.e. a book that fails mid-scan. Workbooks.Count tracks open books.
+
+
+class _Count:
+    def __init__(self, n): self.Count = n
+
+
+class _Cell:
+    def __init__(self, row): self.Row = row
+
+
+class _Range:
+    def __init__(self, spec):
+        self.spec = spec
+        self.Rows, self.Columns = _Count(spec.get("rows", 1)), _Count(spec.get("cols", 1))
+
+    def SpecialCells(self, kind):
+        formulas = self.spec.get("formulas")
+        if kind == -4123 and formulas: return _Formulas(formulas)
+        raise Exception("No cells were found.")
+
+
+class _Formulas:
+    def __init__(self, formulas):
+        self.Formula = tuple((f,) for f in formulas)
+        self.Areas = [self]
+
+
+class _Cells:
+    def __init__(self, spec): self.spec = spec
+
+    def SpecialCells(self, kind):
+        return _Cell(self.spec.get("last_row", self.spec.get("rows", 1)))
+
+
+class StandInSheet:
+    def __init__(self, spec):
+        self.Name = spec.get("name", "Sheet1")
+        self.UsedRange, self.Cells = _Range(spec), _Cells(spec)
+
+
+class StandInWorkbook:
+    def __init__(self, spec, books):
+        self.spec, self.books = spec, books
+        self.Sheets = [StandInSheet(s) for s in spec.get("sheets", [{}])]
+        self.HasVBProject = spec.get("vba", False)
+        self.closed = False
+
+    def LinkSources(self, kind):
+        if self.spec.get("error"): raise Exception(self.spec["error"])
+        return tuple(self.spec.get("links", ())) or None
+
+    def Close(self, save=False):
+        if not self.closed: self.books.Count -= 1
+        self.closed = True
+
+
+class StandInWorkbooks:
+    def __init__(self, app):
+        self.app = app
+        self.Count = 0
+
+    def Open(self, path, UpdateLinks=0, ReadOnly=True, Password=""):
+        spec = self.app.library.get(path)
+        if spec is None: raise Exception(f"Sorry, we couldn't find {path}.")
+        if self.app.killed.wait(spec.get("delay", 0)): raise Exception("The remote procedure call failed.")
+        if spec.get("password") and Password != spec["password"]:
+            raise Exception("The password you supplied is not correct.")
+        self.app.opened.append(path)
+        self.Count += 1
+        return StandInWorkbook(spec, self)
+
+
+class StandInExcel:
+    """Drop-in for win32com.client.DispatchEx('Excel.Application'); pass `lambda: StandInExcel(library)` as app_factory."""
+    def __init__(self, library):
+        self.library, self.opened = library, []
+        self.DisplayAlerts = self.Visible = True
+        self.AutomationSecurity = 1
+        self.Workbooks = StandInWorkbooks(self)
+        self.quit = False
+        self.killed = threading.Event()
+
+    def Quit(self): self.quit = True
+    def terminate(self): self.killed.set()
@@ -0,0 +1,148 @@
+import struct
+from forensic_ooxml import PartStream
+from forensic_xlsb import iter_records, wide_string
+
+# --- STYLE TABLE ANALYZER ---
+# Corrupt-growth workbooks carry tens of thousands of cell formats and custom named styles, and every
+# open and save pays for them. The style table is streamed once: each collection is counted, items are
+# keyed by their full content to find duplicates, and the `s` indices the sheet pass saw decide what is unused.
+XF_LIMIT, CUSTOM_STYLE_LIMIT, UNUSED_XF_LIMIT = 4000, 500, 2000
+COLLECTIONS = {"numFmts": "numFmt", "fonts": "font", "fills": "fill", "borders": "border",
+               "cellStyleXfs": "xf", "cellXfs": "xf", "cellStyles": "cellStyle", "dxfs": "dxf"}
+ITEM_CHILDREN = ("b", "i", "u", "strike", "condense", "extend", "outline", "shadow", "sz", "color", "name", "family",
+                 "charset", "scheme", "vertAlign", "patternFill", "fgColor", "bgColor", "gradientFill", "stop", "left",
+                 "right", "top", "bottom", "diagonal", "start", "end", "vertical", "horizontal", "alignment", "protection")
+XF_REFS = (("fontId", "fonts"), ("fillId", "fills"), ("borderId", "borders"))
+
+# styles.bin record types (MS-XLSB 2.3)
+BRT_FONT, BRT_FMT, BRT_FILL, BRT_BORDER, BRT_XF, BRT_STYLE = 43, 44, 45, 46, 47, 48
+BRT_BEGIN_CELL_XFS, BRT_BEGIN_CELL_STYLE_XFS = 617, 626
+BIN_SECTIONS = {BRT_FONT: "fonts", BRT_FMT: "numFmts", BRT_FILL: "fills", BRT_BORDER: "borders"}
+
+
+class StyleSummary:
+    """Counts, duplicate counts and cross-references of one workbook's style table.
+
+    `cell_xfs[s]` is the parent named-style xf of the cell format a sheet's `s` points at (None when
+    that index is itself a style xf, as in BIFF8's shared XF table); `styles` lists (name, xf, builtin).
+    """
+    def __init__(self):
+        self.counts = dict.fromkeys(COLLECTIONS, 0)
+        self.duplicates = dict.fromkeys(COLLECTIONS, 0)
+        self.seen = {name: {} for name in COLLECTIONS}
+        self.cell_xfs, self.styles = [], []
+        self.default_xf = 0
+
+    def add(self, section, key):
+        """Count one item; returns the index of the first identical item (its own index if new)."""
+        idx = self.counts[section]
+        self.counts[section] += 1
+        first = self.seen[section].setdefault(key, idx)
+        if first != idx: self.duplicates[section] += 1
+        return first
+
+
+class StylesReader:
+    """Streams styles.xml into a StyleSummary; xf keys use canonical font/fill/border/numFmt ids."""
+    tags = tuple(COLLECTIONS) + tuple(dict.fromkeys(COLLECTIONS.values())) + ITEM_CHILDREN
+
+    def __init__(self, summary):
+        self.summary = summary
+        self.section, self.item, self.depth, self.attrs = None, None, 0, None
+        self.canon = {"fonts": [], "fills": [], "borders": [], "numFmts": {}}
+        self.fmt_ids = {}  # first numFmt index with a given formatCode -> its numFmtId
+
+    def start(self, tag, attrs):
+        if self.item is not None:
+            self.item.append((tag, tuple(sorted(attrs.items()))))
+            self.depth += 1
+        elif tag in COLLECTIONS: self.section = tag
+        elif self.section and tag == COLLECTIONS[self.section]:
+            self.item, self.depth, self.attrs = [], 1, attrs
+
+    def end(self, tag, text):
+        if self.item is None:
+            if tag == self.section: self.section = None
+            return
+        self.depth -= 1
+        if not self.depth:
+            self._item(self.section, self.attrs, tuple(self.item))
+            self.item = None
+
+    def _item(self, section, attrs, children):
+        s = self.summary
+        if section == "numFmts":
+            first = s.add(section, attrs.get("formatCode", ""))
+            fid = attrs.get("numFmtId")
+            self.canon["numFmts"][fid] = self.fmt_ids.setdefault(first, fid)
+            return
+        if section in ("cellXfs", "cellStyleXfs"):
+            a = dict(attrs)
+            for ref, coll in XF_REFS:
+                ids = self.canon[coll]
+                if a.get(ref, "").isdigit() and int(a[ref]) < len(ids): a[ref] = ids[int(a[ref])]
+            if "numFmtId" in a: a["numFmtId"] = self.canon["numFmts"].get(a["numFmtId"], a["numFmtId"])
+            s.add(section, (tuple(sorted(a.items())), children))
+            if section == "cellXfs": s.cell_xfs.append(int(attrs.get("xfId") or 0))
+            return
+        if section == "cellStyles":
+            s.add(section, attrs.get("name", ""))
+            s.styles.append((attrs.get("name", ""), int(attrs.get("xfId") or 0), "builtinId" in attrs))
+            return
+        first = s.add(section, (tuple(sorted(attrs.items())), children))
+        if section in self.canon: self.canon[section].append(first)
+
+
+def read_styles(zf, part):
+    """StyleSummary of a styles.xml or styles.bin part."""
+    summary = StyleSummary()
+    with zf.open(part) as fh:
+        if not part.endswith(".bin"):
+            PartStream([StylesReader(summary)]).run(fh)
+            return summary
+        xf_section = "cellXfs"
+        for rt, data in iter_records(fh):
+            if rt in BIN_SECTIONS: summary.add(BIN_SECTIONS[rt], data)
+            elif rt == BRT_BEGIN_CELL_XFS: xf_section = "cellXfs"
+            elif rt == BRT_BEGIN_CELL_STYLE_XFS: xf_section = "cellStyleXfs"
+            elif rt == BRT_XF:
+                summary.add(xf_section, data)
+                if xf_section == "cellXfs": summary.cell_xfs.append(struct.unpack_from("<H", data, 0)[0])
+            elif rt == BRT_STYLE:
+                xf, flags = struct.unpack_from("<IH", data, 0)
+                name, _ = wide_string(data, 8)
+                summary.add("cellStyles", name)
+                summary.styles.append((name or "", xf, bool(flags & 1)))
+    return summary
+
+
+class StyleUsageDetector:
+    """Cell format indices (`s`) used by cells, formatted rows and column defaults, for check_styles."""
+    tags = ("c", "row", "col")
+
+    def __init__(self, scan, sheet):
+        self.used = scan.data.setdefault("styles_used", set())
+
+    def start(self, tag, attrs):
+        s = attrs.get("style" if tag == "col" else "s")
+        if s and (tag != "row" or attrs.get("customFormat") in ("1", "true")): self.used.add(s)
+
+    def end(self, tag, text): pass
+
+    def finish(self): return []
+
+
+def style_issues(summary, used):
+    used = {int(s) for s in used if s.isdigit()}
+    used.add(summary.default_xf)
+    cell = [i for i, parent in enumerate(summary.cell_xfs) if parent is not None]
+    unused = sum(1 for i in cell if i not in used)
+    parents = {summary.cell_xfs[i] for i in used if i < len(summary.cell_xfs) and summary.cell_xfs[i] is not None}
+    custom = [xf for _, xf, builtin in summary.styles if not builtin]
+    unused_custom = sum(1 for xf in custom if xf not in parents)
+    if len(cell) <= XF_LIMIT and len(custom) <= CUSTOM_STYLE_LIMIT and unused <= UNUSED_XF_LIMIT: return []
+    c = summary.counts
+    tables = ", ".join(f"{label} {c[k]} ({summary.duplicates[k]} dup)" for k, label in
+                       (("fonts", "fonts"), ("fills", "fills"), ("borders", "borders"), ("numFmts", "number formats")) if c[k])
+    return [f"Style Bloat: {len(cell)} cell formats ({unused} unused, {summary.duplicates['cellXfs']} duplicates), "
+            f"{len(custom)} custom cell styles ({unused_custom} unused); {tables}."]
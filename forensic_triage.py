@@ -0,0 +1,98 @@
+import os, sys, zipfile, argparse
+from forensic_cfb import CompoundFile, is_cfb, is_encrypted_package
+from forensic_macros import name_macros, ole_macros, macro_issues
+
+# --- TRIAGE THRESHOLDS (uncompressed bytes) ---
+MB = 1024 * 1024
+MEDIA_LIMIT = 5 * MB
+PIVOT_LIMIT = 5 * MB
+SHEET_LIMIT = 50 * MB
+LINK_LIMIT = 1 * MB
+
+
+def classify_part(name):
+    low = name.lower()
+    if "/media/" in low: return "media"
+    if "/pivotcache/pivotcacherecords" in low: return "pivot_records"
+    if low.endswith("vbaproject.bin"): return "vba"
+    if "/externallinks/" in low and "/_rels/" not in low: return "external_links"
+    if "/worksheets/sheet" in low: return "sheet"
+    return "other"
+
+
+def triage(path, detail=False):
+    """Bloat and macro profile of one workbook from the zip central directory only; no part is inflated.
+
+    With `detail`, prof["parts"] lists every part as (name, compressed bytes, uncompressed bytes).
+    """
+    prof = {"path": path, "name": os.path.basename(path), "bytes": os.path.getsize(path), "container": "zip",
+            "compressed": 0, "uncompressed": 0, "media": 0, "pivot_records": 0, "vba": 0, "external_links": 0,
+            "largest_sheet": ("", 0), "flags": [], "score": 0}
+    if not zipfile.is_zipfile(path):
+        prof["container"] = "ole"
+        prof["flags"].append("Not a zip package (legacy .xls or encrypted): needs the full audit.")
+        if is_cfb(path) and not is_encrypted_package(path):
+            with CompoundFile(path) as cf: prof["macros"] = ole_macros(cf)
+            prof["flags"].extend(macro_issues(prof["macros"]))
+        prof["score"] = prof["bytes"]
+        return prof
+    with zipfile.ZipFile(path) as zf: infos = zf.infolist()
+    prof["macros"] = name_macros(i.filename for i in infos)
+    if detail: prof["parts"] = [(i.filename, i.compress_size, i.file_size) for i in infos]
+    for i in infos:
+        prof["compressed"] += i.compress_size
+        prof["uncompressed"] += i.file_size
+        kind = classify_part(i.filename)
+        if kind == "sheet":
+            if i.file_size > prof["largest_sheet"][1]: prof["largest_sheet"] = (i.filename, i.file_size)
+        elif kind != "other":
+            prof[kind] += i.file_size
+
+    flags = prof["flags"]
+    if prof["media"] > MEDIA_LIMIT: flags.append(f"Media Bloat: {prof['media'] / MB:.1f} MB of embedded images.")
+    if prof["pivot_records"] > PIVOT_LIMIT: flags.append(f"Pivot Cache Bloat: {prof['pivot_records'] / MB:.1f} MB of cached records.")
+    if prof["largest_sheet"][1] > SHEET_LIMIT: flags.append(f"Oversized Sheet: {prof['largest_sheet'][0]} expands to {prof['largest_sheet'][1] / MB:.1f} MB.")
+    if prof["external_links"] > LINK_LIMIT: flags.append(f"External Link Cache: {prof['external_links'] / MB:.1f} MB of cached link data.")
+    flags.extend(macro_issues(prof["macros"]))
+    prof["score"] = prof["media"] + prof["pivot_records"] + prof["external_links"] + prof["largest_sheet"][1]
+    return prof
+
+
+def rank(paths, detail=False):
+    """Triage every path and return profiles, most bloated first."""
+    profiles = []
+    for p in paths:
+        try: profiles.append(triage(p, detail))
+        except Exception as e:
+            profiles.append({"path": p, "name": os.path.basename(p), "bytes": 0, "container": "err", "flags": [f"Unreadable: {e}"], "score": 0})
+    profiles.sort(key=lambda prof: prof["score"], reverse=True)
+    return profiles
+
+
+def split_batch(paths, detail=False):
+    """(suspicious paths for the full run_forensics audit, ranked profiles)."""
+    profiles = rank(paths, detail)
+    return [prof["path"] for prof in profiles if prof["flags"]], profiles
+
+
+if __name__ == "__main__":
+    from forensic_engine import expand_paths
+    ap = argparse.ArgumentParser(description="Central-directory bloat triage for Excel batches.")
+    ap.add_argument("paths", nargs="+", help="files, globs or directories")
+    ap.add_argument("--suspicious-only", action="store_true", help="print only the paths that need the full audit")
+    ap.add_argument("--macros-only", action="store_true", help="print only the paths carrying VBA, XLM macro sheets or ActiveX")
+    ap.add_argument("--parts", action="store_true", help="list every part's compressed and uncompressed size under its file")
+    args = ap.parse_args()
+    suspicious, profiles = split_batch(expand_paths(args.paths), args.parts)
+    if args.macros_only:
+        for prof in profiles:
+            if any(prof.get("macros", {}).values()): print(prof["path"])
+        sys.exit(0)
+    if args.suspicious_only:
+        for p in suspicious: print(p)
+        sys.exit(0)
+    for prof in profiles:
+        print(f"{prof['score'] / MB:10.2f} MB  {prof['path']}")
+        for flag in prof["flags"]: print(f"{'':15}- {flag}")
+        for name, packed, size in sorted(prof.get("parts", ()), key=lambda p: -p[2]):
+            print(f"{'':15}  {packed / 1024:10.1f} KB -> {size / 1024:10.1f} KB  {name}")
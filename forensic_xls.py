@@ -0,0 +1,342 @@
+import struct
+from forensic_ooxml import SheetInfo, col_letters
+from forensic_xlsb import ExternTables, RgceLayout, decompile
+from forensic_links import ExternalLink
+from forensic_styles import StyleSummary
+
+# --- BIFF8 (.xls) RECORD READER ---
+# A legacy workbook is one "Workbook" stream inside an OLE compound file: a globals substream
+# (sheet directory, extern-sheet table, defined names) followed by one substream per sheet at the
+# offset its BOUNDSHEET record gives. Only the globals and the sheet substreams being scanned are
+# read, and sheets are replayed as the dimension/row/c/v/f (and conditionalFormatting, dataValidations,
+# hyperlinks) events the XML path produces.
+WORKBOOK_STREAM = "Workbook"
+MAX_ROWS, MAX_COLS = 65536, 256
+BIFF8 = RgceLayout("<HH", "<HHHH", 8, MAX_ROWS, MAX_COLS, "<H", 7, False)
+
+# record types (MS-XLS 2.3)
+FORMULA, EOF, EXTERNSHEET, NAME, FILEPASS, CONTINUE, XCT, CRN = 0x0006, 0x000A, 0x0017, 0x0018, 0x002F, 0x003C, 0x0059, 0x005A
+BOUNDSHEET, MULRK, MULBLANK, DBCELL, SUPBOOK, DIMENSIONS, BLANK, ROW = 0x0085, 0x00BD, 0x00BE, 0x00D7, 0x01AE, 0x0200, 0x0201, 0x0208
+ARRAY, SHRFMLA, BOF = 0x0221, 0x04BC, 0x0809
+FONT, XF, STYLE, FORMAT = 0x0031, 0x00E0, 0x0293, 0x041E
+CONDFMT, CF, DVAL, HLINK, DV, HLINKTOOLTIP = 0x01B0, 0x01B1, 0x01B2, 0x01B8, 0x01BE, 0x0800
+SPANNING = frozenset((NAME, SUPBOOK, EXTERNSHEET))  # globals records long enough to run on into CONTINUE records
+CF_TYPES = {1: "cellIs", 2: "expression"}
+DEFAULT_XF = 15  # XFs 0-14 are the built-in style XFs; 15 is the default cell format
+VALUE_CELLS = frozenset((0x00D6, 0x00FD, 0x0203, 0x0204, 0x0205, 0x027E))  # RSTRING LABELSST NUMBER LABEL BOOLERR RK
+BUILTIN_NAMES = ("Consolidate_Area", "Auto_Open", "Auto_Close", "Extract", "Database", "Criteria", "Print_Area",
+                 "Print_Titles", "Recorder", "Data_Form", "Auto_Activate", "Auto_Deactivate", "Sheet_Title", "_FilterDatabase")
+SHEET_KINDS = {0: "worksheet", 1: "macrosheet", 2: "chart", 6: "vbamodule"}
+VIRT_PATH = {"\x01": "", "\x02": "\\", "\x03": "\\", "\x04": "..\\", "\x05": "", "\x06": "", "\x08": ""}
+
+
+def iter_biff(chunks, offset=0, join=()):
+    """Yield (stream offset, record type, payload) from an iterable of stream chunks.
+
+    A record whose type is in `join` is yielded with the payloads of the CONTINUE records after it
+    appended, since records longer than 8224 bytes are split that way.
+    """
+    held = None
+    for rec in _records(chunks, offset):
+        if held:
+            if rec[1] == CONTINUE:
+                held[2] += rec[2]
+                continue
+            yield tuple(held)
+            held = None
+        if rec[1] in join: held = list(rec)
+        else: yield rec
+    if held: yield tuple(held)
+
+
+def _records(chunks, offset):
+    chunks = iter(chunks)
+    buf, pos = b"", 0
+    while True:
+        while len(buf) - pos < 4:
+            more = next(chunks, b"")
+            if not more: return
+            buf, pos = buf[pos:] + more, 0
+        rt, size = struct.unpack_from("<HH", buf, pos)
+        while len(buf) - pos < 4 + size:
+            more = next(chunks, b"")
+            if not more: return
+            buf, pos = buf[pos:] + more, 0
+        yield offset, rt, buf[pos + 4:pos + 4 + size]
+        pos += 4 + size
+        offset += 4 + size
+
+
+def unicode_string(data, off, cch):
+    """XLUnicodeStringNoCch at `off`: (text, next offset); fHighByte picks 1- or 2-byte characters."""
+    wide = data[off] & 1
+    end = off + 1 + (cch << wide)
+    return data[off + 1:end].decode("utf-16-le" if wide else "latin-1", "replace"), end
+
+
+def sqref(data, off):
+    """SqRefU at `off` (count, then rwFirst/rwLast/colFirst/colLast ranges) as an A1 sqref string."""
+    (cref,) = struct.unpack_from("<H", data, off)
+    return " ".join(f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2 + 1)}{r2 + 1}"
+                    for r1, r2, c1, c2 in struct.iter_unpack("<HHHH", data[off + 2:off + 2 + 8 * cref]))
+
+
+def has_filepass(cf):
+    """True when the globals substream opens with FILEPASS: the .xls is RC4/XOR-encrypted behind a password."""
+    for _, rt, _ in iter_biff(cf.iter_stream(WORKBOOK_STREAM)):
+        if rt == FILEPASS: return True
+        if rt in (EOF, BOUNDSHEET): return False  # FILEPASS directly follows the globals BOF
+    return False
+
+
+def virt_path(raw):
+    """SUPBOOK virtPath with its encoded volume/directory markers spelled out."""
+    if raw[:1] == "\x01" and len(raw) > 1:
+        raw = ("\\\\" if raw[1] == "@" else raw[1] + ":\\") + raw[2:]
+    return "".join(VIRT_PATH.get(ch, ch) for ch in raw)
+
+
+class XlsWorkbook(ExternTables):
+    """Globals substream: sheets in tab order, sheet offsets, extern-sheet table, defined names and links."""
+    def __init__(self, cf):
+        self.tab_names, self.sheets, self.names, self.xti = [], [], [], []
+        self.kinds, self.offsets, self.links = [], {}, []
+        self.encrypted = False
+        self.styles = StyleSummary()
+        self.styles.default_xf = DEFAULT_XF
+        books, link = [], None
+        for _, rt, data in iter_biff(cf.iter_stream(WORKBOOK_STREAM), join=SPANNING):
+            if rt == EOF: break
+            if rt == FILEPASS:  # everything after this record is encrypted
+                self.encrypted = True
+                break
+            if rt == BOUNDSHEET:
+                pos, state, kind = struct.unpack_from("<IBB", data, 0)
+                name, _ = unicode_string(data, 7, data[6])
+                self.tab_names.append(name)
+                self.kinds.append((name, SHEET_KINDS.get(kind, "unknown")))
+                if kind == 0:
+                    self.offsets[len(self.sheets)] = pos
+                    self.sheets.append(SheetInfo(len(self.sheets), name, WORKBOOK_STREAM, str(len(self.tab_names)),
+                                                 ("visible", "hidden", "veryHidden")[min(state & 3, 2)]))
+            elif rt == NAME:
+                flags, _, cch, cce, _, itab = struct.unpack_from("<HBBHHH", data, 0)
+                name, off = unicode_string(data, 14, cch)
+                if flags & 0x20 and name and ord(name[0]) < len(BUILTIN_NAMES): name = "_xlnm." + BUILTIN_NAMES[ord(name[0])]
+                self.names.append((name, itab - 1 if itab else 0xFFFFFFFF, flags, data[off:off + cce]))
+            elif rt == SUPBOOK:
+                ctab, cch = struct.unpack_from("<HH", data, 0)
+                link = None
+                if cch == 0x0401: books.append(None)
+                elif cch == 0x3A01: books.append("")
+                else:
+                    target, off = unicode_string(data, 4, cch)
+                    sheets = []
+                    for _ in range(ctab):
+                        name, off = unicode_string(data, off + 2, struct.unpack_from("<H", data, off)[0])
+                        sheets.append(name)
+                    link = ExternalLink(WORKBOOK_STREAM, "book", virt_path(target), sheets)
+                    self.links.append(link)
+                    books.append(f"[{len(books)}]")
+            elif rt in (FONT, FORMAT, XF, STYLE): self._style(rt, data)
+            elif rt in (XCT, CRN) and link:  # cached values of the external sheets
+                link.cached_bytes += 4 + len(data)
+                if rt == CRN: link.cached_cells += data[0] - data[1] + 1
+            elif rt == EXTERNSHEET:
+                (count,) = struct.unpack_from("<H", data, 0)
+                for i in range(min(count, (len(data) - 2) // 6)):
+                    book, first, last = struct.unpack_from("<Hhh", data, 2 + 6 * i)
+                    self.xti.append(self._prefix(books[book] if book < len(books) else "", first, last))
+
+    def _style(self, rt, data):
+        s = self.styles
+        if rt == FONT: s.add("fonts", data)
+        elif rt == FORMAT: s.add("numFmts", data[2:])
+        elif rt == XF:
+            (flags,) = struct.unpack_from("<H", data, 4)
+            if flags & 0x04:
+                s.add("cellStyleXfs", data)
+                s.cell_xfs.append(None)
+            else:
+                s.add("cellXfs", data)
+                s.cell_xfs.append(flags >> 4)
+        else:
+            (ixfe,) = struct.unpack_from("<H", data, 0)
+            builtin = bool(ixfe & 0x8000)
+            name = f"builtin{data[2]}" if builtin else unicode_string(data, 4, struct.unpack_from("<H", data, 2)[0])[0]
+            s.add("cellStyles", name)
+            s.styles.append((name, ixfe & 0xFFF, builtin))
+
+    def sheets_of(self, kind):
+        """Tab names of one BOUNDSHEET kind, e.g. "macrosheet" (Excel 4.0) or "vbamodule" (a VBA module sheet)."""
+        return [name for name, k in self.kinds if k == kind]
+
+
+# --- SHEET REPLAY ---
+class XlsSheetReader:
+    """Replays one BIFF8 sheet substream as dimension/row/c/v/f events into a PartStream.
+
+    BIFF8 writes ROW records for a block of up to 32 rows ahead of that block's cells, so rows and
+    cells are buffered per block (closed by DBCELL) and emitted nested the way the XML path nests them.
+    """
+    def __init__(self, stream, book):
+        self.stream, self.book = stream, book
+        self.memo = {}
+        self.groups = {}  # master cell (row, col) -> si
+        self.rows, self.cells = {}, {}
+        self.pending = None
+        self.si = 0
+        self.cf_left = self.dv_left = 0  # CF / DV records still owed to the open CONDFMT / DVAL block
+        self.in_links = False
+
+    def run(self, chunks):
+        depth = 0
+        for _, rt, data in iter_biff(chunks):
+            if self.in_links and rt not in (HLINK, HLINKTOOLTIP):
+                self.stream.end("hyperlinks")
+                self.in_links = False
+            if self.pending:
+                if rt in (SHRFMLA, ARRAY):
+                    self._group(rt, data)
+                    continue
+                self._flush_member()
+            if rt == BOF: depth += 1
+            elif rt == EOF:
+                depth -= 1
+                if depth <= 0: break
+            elif depth > 1: continue  # embedded chart substream
+            elif rt == ROW:
+                (r,) = struct.unpack_from("<H", data, 0)
+                flags, ixfe = struct.unpack_from("<HH", data, 12)
+                attrs = {"r": str(r + 1)}
+                if flags & 0x80: attrs["s"], attrs["customFormat"] = str(ixfe & 0xFFF), "1"
+                if flags & 0x20: attrs["hidden"] = "1"
+                if flags & 0x40: attrs["customHeight"] = "1"
+                self.rows[r] = attrs
+            elif rt in VALUE_CELLS or rt == BLANK:
+                r, c, ixfe = struct.unpack_from("<HHH", data, 0)
+                self._add(r, c, ixfe, rt != BLANK)
+            elif rt in (MULRK, MULBLANK):
+                r, c = struct.unpack_from("<HH", data, 0)
+                step = 6 if rt == MULRK else 2
+                for i in range((len(data) - 6) // step):
+                    self._add(r, c + i, struct.unpack_from("<H", data, 4 + step * i)[0], rt == MULRK)
+            elif rt == FORMULA:
+                self._formula_cell(data)
+            elif rt == DIMENSIONS:
+                r1, r2, c1, c2 = struct.unpack_from("<IIHH", data, 0)
+                if r2 > r1 and c2 > c1:
+                    self.stream.start("dimension", {"ref": f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2)}{r2}"})
+                    self.stream.end("dimension")
+            elif rt == DBCELL:
+                self._flush_block()
+            elif rt == CONDFMT:
+                self._condfmt(data)
+            elif rt == CF and self.cf_left:
+                # formulas are stored relative to the block, so identical bytes mean one rule pasted twice
+                self.stream.start("cfRule", {"type": CF_TYPES.get(data[0], str(data[0])), "rule": data[1:].hex()})
+                self.stream.end("cfRule")
+                self.cf_left -= 1
+                if not self.cf_left: self.stream.end("conditionalFormatting")
+            elif rt == HLINK:
+                if not self.in_links: self.stream.start("hyperlinks", {})
+                self.in_links = True
+                r1, r2, c1, c2 = struct.unpack_from("<HHHH", data, 0)
+                self.stream.start("hyperlink", {"ref": f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2 + 1)}{r2 + 1}",
+                                                "target": data[8:].hex()})
+                self.stream.end("hyperlink")
+            elif rt == DVAL:
+                (self.dv_left,) = struct.unpack_from("<I", data, 14)
+                self.stream.start("dataValidations", {})
+                if not self.dv_left: self.stream.end("dataValidations")
+            elif rt == DV and self.dv_left:
+                self._dv(data)
+        if self.pending: self._flush_member()
+        self._flush_block()
+        if self.cf_left: self.stream.end("conditionalFormatting")
+        if self.dv_left: self.stream.end("dataValidations")
+        if self.in_links: self.stream.end("hyperlinks")
+
+    def _add(self, r, c, ixfe, has_value, text=None, fattrs=None):
+        self.cells.setdefault(r, []).append((c, ixfe, has_value, text, fattrs))
+
+    def _flush_block(self):
+        st = self.stream
+        for r in sorted(self.rows.keys() | self.cells.keys()):
+            st.start("row", self.rows.get(r) or {"r": str(r + 1)})
+            for c, ixfe, has_value, text, fattrs in self.cells.get(r, ()):
+                st.start("c", {"r": f"{col_letters(c + 1)}{r + 1}", "s": str(ixfe)})
+                if fattrs is not None:
+                    st.start("f", fattrs)
+                    if text: st.chars(text)
+                    st.end("f")
+                if has_value:
+                    st.start("v", {})
+                    st.end("v")
+                st.end("c")
+            st.end("row")
+        self.rows, self.cells = {}, {}
+
+    def _condfmt(self, data):
+        if self.cf_left: self.stream.end("conditionalFormatting")
+        (ccf,) = struct.unpack_from("<H", data, 0)
+        self.stream.start("conditionalFormatting", {"sqref": sqref(data, 12)})
+        self.cf_left = ccf
+        if not ccf: self.stream.end("conditionalFormatting")
+
+    def _dv(self, data):
+        """DV: flags, four prompt/error strings, two formulas, then the ranges; the body key skips the strings."""
+        off = 4
+        for _ in range(4):
+            (cch,) = struct.unpack_from("<H", data, off)
+            _, off = unicode_string(data, off + 2, cch)
+        formulas = off
+        for _ in range(2):
+            (cce,) = struct.unpack_from("<H", data, off)
+            off += 4 + cce
+        self.stream.start("dataValidation", {"type": str(data[0] & 0x0F), "rule": data[:4].hex() + data[formulas:off].hex(),
+                                             "sqref": sqref(data, off)})
+        self.stream.end("dataValidation")
+        self.dv_left -= 1
+        if not self.dv_left: self.stream.end("dataValidations")
+
+    def _decompile(self, rgce, row=0, col=0):
+        try: return decompile(rgce, self.book, row, col, BIFF8)
+        except (ValueError, IndexError, struct.error):
+            self.book.unparsed += 1
+            return ""
+
+    def _formula_cell(self, data):
+        r, c, ixfe = struct.unpack_from("<HHH", data, 0)
+        (cce,) = struct.unpack_from("<H", data, 20)
+        rgce = data[22:22 + cce]
+        if rgce[:1] == b"\x01":  # PtgExp: member of a shared/array group; its master record may follow
+            self.pending = (r, c, ixfe, struct.unpack_from("<HH", rgce, 1))
+            return
+        text = self.memo.get(rgce)
+        if text is None:
+            text = self._decompile(rgce)
+            if len(self.memo) > 100000: self.memo.clear()
+            self.memo[rgce] = text
+        self._add(r, c, ixfe, True, text, {})
+
+    def _group(self, rt, data):
+        r, c, ixfe, _ = self.pending
+        self.pending = None
+        r1, r2, c1, c2 = struct.unpack_from("<HHBB", data, 0)
+        off = 8 if rt == SHRFMLA else 12
+        (cce,) = struct.unpack_from("<H", data, off)
+        text = self._decompile(data[off + 2:off + 2 + cce], r1, c1)
+        ref = f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2 + 1)}{r2 + 1}"
+        if rt == ARRAY:
+            self._add(r, c, ixfe, True, text, {"t": "array", "ref": ref})
+            return
+        si = str(self.si)
+        self.si += 1
+        self.groups[(r, c)] = si
+        self._add(r, c, ixfe, True, text, {"t": "shared", "ref": ref, "si": si})
+
+    def _flush_member(self):
+        r, c, ixfe, anchor = self.pending
+        self.pending = None
+        self._add(r, c, ixfe, True, None, {"t": "shared", "si": self.groups.get(anchor, f"r{anchor[0]}c{anchor[1]}")})
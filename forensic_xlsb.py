@@ -0,0 +1,503 @@
+import re
+import struct
+from forensic_ooxml import CHUNK, MAX_ROWS, MAX_COLS, SheetInfo, col_letters, read_rels, REL_WORKSHEET
+
+# --- BIFF12 (.xlsb) RECORD READER ---
+# Parts are read record by record from the zip stream; sheet parts are replayed as the same
+# dimension/row/c/v/f (and conditionalFormatting, dataValidations, hyperlinks) events the XML path produces,
+# so every PartStream handler works unchanged.
+# Formulas are decompiled from their rgce token stream back to A1 text for the formula tokenizer.
+
+# record types (MS-XLSB 2.3)
+BRT_ROW_HDR, BRT_CELL_BLANK, BRT_FMLA_STRING, BRT_FMLA_NUM, BRT_FMLA_BOOL, BRT_FMLA_ERROR = 0, 1, 8, 9, 10, 11
+BRT_NAME, BRT_CELL_RSTRING = 39, 62
+BRT_BEGIN_LIST, BRT_END_LIST, BRT_BEGIN_LIST_COL = 343, 344, 347
+BRT_END_SHEET_DATA, BRT_WS_DIM, BRT_BUNDLE_SH = 146, 148, 156
+BRT_SUP_BOOK_SRC, BRT_SUP_SELF, BRT_SUP_SAME, BRT_EXTERN_SHEET, BRT_SUP_ADDIN = 355, 357, 358, 362, 666
+BRT_ARR_FMLA, BRT_SHR_FMLA = 427, 428
+BRT_DVAL, BRT_BEGIN_CF, BRT_END_CF, BRT_BEGIN_CF_RULE, BRT_HLINK, BRT_BEGIN_DVALS, BRT_END_DVALS = 64, 461, 462, 463, 494, 573, 574
+VALUE_CELLS = frozenset((2, 3, 4, 5, 6, 7, BRT_CELL_RSTRING))
+FORMULA_CELLS = {BRT_FMLA_STRING: None, BRT_FMLA_NUM: 8, BRT_FMLA_BOOL: 1, BRT_FMLA_ERROR: 1}
+
+ERRORS = {0x00: "#NULL!", 0x07: "#DIV/0!", 0x0F: "#VALUE!", 0x17: "#REF!", 0x1D: "#NAME?", 0x24: "#NUM!", 0x2A: "#N/A", 0x2B: "#GETTING_DATA"}
+BINARY_OPS = {0x03: "+", 0x04: "-", 0x05: "*", 0x06: "/", 0x07: "^", 0x08: "&", 0x09: "<", 0x0A: "<=", 0x0B: "=",
+              0x0C: ">=", 0x0D: ">", 0x0E: "<>", 0x0F: " ", 0x10: ",", 0x11: ":"}
+LIST_ROWS = {0x01: "#All", 0x02: "#Headers", 0x04: "#Data", 0x06: "#Headers],[#Data", 0x08: "#Totals",
+             0x0C: "#Data],[#Totals", 0x10: "#This Row"}  # PtgList rowType
+SIMPLE_NAME = re.compile(r"^[A-Za-z_][\w.]*$")
+
+# built-in function table (iftab -> name); ids missing here decompile as _FN<id>
+FTAB = dict(enumerate("""COUNT IF ISNA ISERROR SUM AVERAGE MIN MAX ROW COLUMN NA NPV STDEV DOLLAR FIXED SIN COS TAN ATAN PI
+SQRT EXP LN LOG10 ABS INT SIGN ROUND LOOKUP INDEX REPT MID LEN VALUE TRUE FALSE AND OR NOT MOD DCOUNT DSUM DAVERAGE
+DMIN DMAX DSTDEV VAR DVAR TEXT LINEST TREND LOGEST GROWTH GOTO HALT RETURN PV FV NPER PMT RATE MIRR IRR RAND MATCH
+DATE TIME DAY MONTH YEAR WEEKDAY HOUR MINUTE SECOND NOW AREAS ROWS COLUMNS OFFSET ABSREF RELREF ARGUMENT SEARCH
+TRANSPOSE ERROR STEP TYPE ECHO SET.NAME CALLER DEREF WINDOWS SERIES DOCUMENTS ACTIVE.CELL SELECTION RESULT ATAN2
+ASIN ACOS CHOOSE HLOOKUP VLOOKUP LINKS INPUT ISREF GET.FORMULA GET.NAME SET.VALUE LOG EXEC CHAR LOWER UPPER PROPER
+LEFT RIGHT EXACT TRIM REPLACE SUBSTITUTE CODE NAMES DIRECTORY FIND CELL ISERR ISTEXT ISNUMBER ISBLANK T N FOPEN
+FCLOSE FSIZE FREADLN FREAD FWRITELN FWRITE FPOS DATEVALUE TIMEVALUE SLN SYD DDB GET.DEF REFTEXT TEXTREF INDIRECT
+REGISTER CALL ADD.BAR ADD.MENU ADD.COMMAND ENABLE.COMMAND CHECK.COMMAND RENAME.COMMAND SHOW.BAR DELETE.MENU
+DELETE.COMMAND GET.CHART.ITEM DIALOG.BOX CLEAN MDETERM MINVERSE MMULT FILES IPMT PPMT COUNTA CANCEL.KEY FOR WHILE
+BREAK NEXT INITIATE REQUEST POKE EXECUTE TERMINATE RESTART HELP GET.BAR PRODUCT FACT GET.CELL GET.WORKSPACE
+GET.WINDOW GET.DOCUMENT DPRODUCT ISNONTEXT GET.NOTE NOTE STDEVP VARP DSTDEVP DVARP TRUNC ISLOGICAL DCOUNTA
+DELETE.BAR UNREGISTER""".split()))
+FTAB.update(enumerate("""USDOLLAR FINDB SEARCHB REPLACEB LEFTB RIGHTB MIDB LENB ROUNDUP ROUNDDOWN ASC DBCS RANK""".split(), 204))
+FTAB.update({219: "ADDRESS", 220: "DAYS360", 221: "TODAY", 222: "VDB", 227: "MEDIAN", 228: "SUMPRODUCT", 229: "SINH",
+             230: "COSH", 231: "TANH", 232: "ASINH", 233: "ACOSH", 234: "ATANH", 235: "DGET", 244: "INFO", 247: "DB",
+             252: "FREQUENCY", 257: "EVALUATE", 261: "ERROR.TYPE"})
+FTAB.update(enumerate("""AVEDEV BETADIST GAMMALN BETAINV BINOMDIST CHIDIST CHIINV COMBIN CONFIDENCE CRITBINOM EVEN
+EXPONDIST FDIST FINV FISHER FISHERINV FLOOR GAMMADIST GAMMAINV CEILING HYPGEOMDIST LOGNORMDIST LOGINV NEGBINOMDIST
+NORMDIST NORMSDIST NORMINV NORMSINV STANDARDIZE ODD PERMUT POISSON TDIST WEIBULL SUMXMY2 SUMX2MY2 SUMX2PY2 CHITEST
+CORREL COVAR FORECAST FTEST INTERCEPT PEARSON RSQ STEYX SLOPE TTEST PROB DEVSQ GEOMEAN HARMEAN SUMSQ KURT SKEW ZTEST
+LARGE SMALL QUARTILE PERCENTILE PERCENTRANK MODE TRIMMEAN TINV""".split(), 269))
+FTAB.update(enumerate("""CONCATENATE POWER PIVOT.ADD.DATA GET.PIVOT.TABLE GET.PIVOT.FIELD GET.PIVOT.ITEM RADIANS DEGREES
+SUBTOTAL SUMIF COUNTIF COUNTBLANK SCENARIO.GET OPTIONS.LISTS.GET ISPMT DATEDIF DATESTRING NUMBERSTRING ROMAN
+OPEN.DIALOG SAVE.DIALOG VIEW.GET GETPIVOTDATA HYPERLINK PHONETIC AVERAGEA MAXA MINA STDEVPA VARPA STDEVA VARA
+BAHTTEXT""".split(), 336))
+FTAB.update({480: "IFERROR", 481: "COUNTIFS", 482: "SUMIFS", 483: "AVERAGEIF", 484: "AVERAGEIFS"})
+
+# argument counts of fixed-arity functions (PtgFunc carries no count); anything unlisted takes one
+FIXED_ARGS = {10: 0, 19: 0, 34: 0, 35: 0, 63: 0, 74: 0, 221: 0,
+              27: 2, 30: 2, 39: 2, 48: 2, 97: 2, 117: 2, 165: 2, 212: 2, 213: 2, 252: 2, 274: 2, 275: 2, 276: 2,
+              285: 2, 288: 2, 299: 2, 303: 2, 304: 2, 305: 2, 306: 2, 307: 2, 308: 2, 310: 2, 311: 2, 312: 2,
+              313: 2, 314: 2, 315: 2, 325: 2, 326: 2, 327: 2, 328: 2, 331: 2, 332: 2, 337: 2, 346: 2, 353: 2,
+              31: 3, 40: 3, 41: 3, 42: 3, 43: 3, 44: 3, 45: 3, 47: 3, 61: 3, 65: 3, 66: 3, 142: 3, 189: 3, 195: 3,
+              196: 3, 199: 3, 210: 3, 235: 3, 277: 3, 278: 3, 280: 3, 281: 3, 282: 3, 287: 3, 290: 3, 291: 3,
+              292: 3, 295: 3, 297: 3, 300: 3, 301: 3, 309: 3, 351: 3,
+              119: 4, 143: 4, 207: 4, 273: 4, 286: 4, 289: 4, 293: 4, 302: 4, 316: 4, 350: 4}
+
+
+def iter_records(fh, chunk=CHUNK):
+    """Yield (record type, payload) from a BIFF12 part, holding at most one chunk or one record in memory."""
+    buf, pos = b"", 0
+    while True:
+        if len(buf) - pos < 8:
+            buf, pos = buf[pos:] + fh.read(chunk), 0
+            if not buf: return
+        try:
+            rt = buf[pos]
+            pos += 1
+            if rt & 0x80:
+                rt = (rt & 0x7F) | (buf[pos] & 0x7F) << 7
+                pos += 1
+            size = shift = 0
+            while True:
+                b = buf[pos]
+                pos += 1
+                size |= (b & 0x7F) << shift
+                shift += 7
+                if not b & 0x80 or shift >= 28: break
+        except IndexError: return  # truncated header at end of part
+        while len(buf) - pos < size:
+            more = fh.read(max(chunk, size - (len(buf) - pos)))
+            if not more: return
+            buf, pos = buf[pos:] + more, 0
+        yield rt, buf[pos:pos + size]
+        pos += size
+
+
+def wide_string(data, off):
+    """XLWideString at `off`: (text, next offset); a 0xFFFFFFFF length is the nullable form's null."""
+    (cch,) = struct.unpack_from("<I", data, off)
+    if cch == 0xFFFFFFFF: return None, off + 4
+    end = off + 4 + 2 * cch
+    return data[off + 4:end].decode("utf-16-le", "replace"), end
+
+
+def quote_sheet(name):
+    return name if SIMPLE_NAME.match(name) and not re.match(r"^[A-Za-z]{1,3}\d+$", name) else "'" + name.replace("'", "''") + "'"
+
+
+class ExternTables:
+    """Sheet-prefix and name lookups shared by the BIFF12 and BIFF8 workbook globals."""
+    tables = {}
+    unparsed = 0  # distinct formulas the decompiler could not read; they reach the detectors as ""
+
+    def _prefix(self, book, first, last):
+        if book is None:  # this workbook
+            if first < 0 or first >= len(self.tab_names): return "#REF!" if first == -1 else ""
+            names = self.tab_names[first] if first == last or last >= len(self.tab_names) else f"{self.tab_names[first]}:{self.tab_names[last]}"
+            return quote_sheet(names) + "!"
+        return f"{book}Sheet{first + 1}!" if first >= 0 else book
+
+    def name_text(self, index):
+        return self.names[index - 1][0] if 0 < index <= len(self.names) else f"_NAME{index}"
+
+
+class XlsbWorkbook(ExternTables):
+    """workbook.bin: sheets in tab order, defined names and the extern-sheet table formulas point into."""
+    def __init__(self, zf, wb_part):
+        rels = read_rels(zf, wb_part)
+        self.tab_names, self.sheets, self.names, self.xti = [], [], [], []
+        self.tables = read_tables(zf)
+        books = []
+        with zf.open(wb_part) as fh:
+            for rt, data in iter_records(fh):
+                if rt == BRT_BUNDLE_SH:
+                    state, _ = struct.unpack_from("<II", data, 0)
+                    rid, off = wide_string(data, 8)
+                    name, _ = wide_string(data, off)
+                    self.tab_names.append(name)
+                    target, kind, _ = rels.get(rid, ("", "", ""))
+                    if kind == REL_WORKSHEET:
+                        self.sheets.append(SheetInfo(len(self.sheets), name, target, str(struct.unpack_from("<I", data, 4)[0]),
+                                                     ("visible", "hidden", "veryHidden")[min(state, 2)]))
+                elif rt == BRT_NAME:
+                    flags, _, itab = struct.unpack_from("<IBI", data, 0)
+                    name, off = wide_string(data, 9)
+                    (cce,) = struct.unpack_from("<I", data, off)
+                    self.names.append((name, itab, flags, data[off + 4:off + 4 + cce]))
+                elif rt in (BRT_SUP_SELF, BRT_SUP_SAME): books.append(None)
+                elif rt == BRT_SUP_ADDIN: books.append("")
+                elif rt == BRT_SUP_BOOK_SRC: books.append(f"[{len(books)}]")
+                elif rt == BRT_EXTERN_SHEET:
+                    (count,) = struct.unpack_from("<I", data, 0)
+                    for i in range(count):
+                        book, first, last = struct.unpack_from("<Iii", data, 4 + 12 * i)
+                        self.xti.append(self._prefix(books[book] if book < len(books) else "", first, last))
+
+
+def read_tables(zf):
+    """{idList: (display name, [column names])} from the xl/tables/*.bin parts that PtgList tokens point into."""
+    tables = {}
+    for part in zf.namelist():
+        if not (part.startswith("xl/tables/") and part.endswith(".bin")): continue
+        with zf.open(part) as fh:
+            for rt, data in iter_records(fh):
+                if rt == BRT_BEGIN_LIST:  # rfxList, lt, idList, ... 12 dwords, then stName, stDisplayName
+                    (list_id,) = struct.unpack_from("<I", data, 20)
+                    name, off = wide_string(data, 64)
+                    columns = []
+                    tables[list_id] = (wide_string(data, off)[0] or name or f"_TABLE{list_id}", columns)
+                elif rt == BRT_BEGIN_LIST_COL: columns.append(wide_string(data, 24)[0] or "")
+                elif rt == BRT_END_LIST: break
+    return tables
+
+
+# --- FORMULA DECOMPILER ---
+class RgceLayout:
+    """Operand sizes of an rgce token stream; BIFF12 (.xlsb) and BIFF8 (.xls) share every opcode but not the widths."""
+    def __init__(self, ref, area, col_bits, max_rows, max_cols, name, array, wide_str):
+        self.ref, self.area, self.name = struct.Struct(ref), struct.Struct(area), struct.Struct(name)
+        self.col_mask, self.col_sign = (1 << col_bits) - 1, 1 << (col_bits - 1)
+        self.row_span = 1 << 8 * (self.ref.size - 2)
+        self.max_rows, self.max_cols, self.array, self.wide_str = max_rows, max_cols, array, wide_str
+
+
+BIFF12 = RgceLayout("<IH", "<IIHH", 14, MAX_ROWS, MAX_COLS, "<I", 14, True)
+
+
+def _col(field, base, relative_n, lay):
+    col, rel = field & lay.col_mask, bool(field & 0x8000)
+    if relative_n and rel:
+        if col & lay.col_sign: col -= lay.col_mask + 1
+        col = (base + col) % lay.max_cols
+    return col + 1, rel
+
+
+def _row(row, rel, base, relative_n, lay):
+    if relative_n and rel:
+        if row & lay.row_span >> 1: row -= lay.row_span
+        row = (base + row) % lay.max_rows
+    return row + 1
+
+
+def _cell(row, rrel, col, crel):
+    return f"{'' if crel else '$'}{col_letters(col)}{'' if rrel else '$'}{row}"
+
+
+def _area(r1, r2, c1f, c2f, row, col, relative_n, lay):
+    c1, c1rel = _col(c1f, col, relative_n, lay)
+    c2, c2rel = _col(c2f, col, relative_n, lay)
+    r1rel, r2rel = bool(c1f & 0x4000), bool(c2f & 0x4000)
+    a, b = _row(r1, r1rel, row, relative_n, lay), _row(r2, r2rel, row, relative_n, lay)
+    if r1 == 0 and r2 == lay.max_rows - 1 and not (relative_n and (r1rel or r2rel)):
+        return f"{'' if c1rel else '$'}{col_letters(c1)}:{'' if c2rel else '$'}{col_letters(c2)}"
+    if c1f & lay.col_mask == 0 and c2f & lay.col_mask == lay.max_cols - 1 and not (relative_n and (c1rel or c2rel)):
+        return f"{'' if r1rel else '$'}{a}:{'' if r2rel else '$'}{b}"
+    return _cell(a, r1rel, c1, c1rel) + ":" + _cell(b, r2rel, c2, c2rel)
+
+
+def table_ref(book, ixti, flags, list_id, c1, c2):
+    """PtgList as structured-reference text, e.g. Sales[Amount] or Sales[[#Headers],[Q1]:[Q4]]."""
+    name, columns = book.tables.get(list_id, (f"_TABLE{list_id}", []))
+    column = lambda c: columns[c] if c < len(columns) else f"Column{c + 1}"
+    items = [LIST_ROWS[(flags >> 2) & 0x1F]] if (flags >> 2) & 0x1F in LIST_ROWS else []
+    if flags & 3 == 1: items.append(column(c1))
+    elif flags & 3 == 2: items.append(f"{column(c1)}]:[{column(c2)}")
+    if flags & 0x2000 and ixti < len(book.xti): name = book.xti[ixti] + name  # nonresident: another workbook's table
+    if len(items) == 1 and "]" not in items[0]: return f"{name}[{items[0]}]"
+    return name + "[" + ",".join(f"[{item}]" for item in items) + "]"
+
+
+def decompile(rgce, book, row=0, col=0, lay=BIFF12):
+    """rgce token stream -> formula text without '=' (row/col: 0-based cell the relative N-refs hang off)."""
+    stack, i, n = [], 0, len(rgce)
+    u16 = struct.Struct("<H")
+    ref, area = lay.ref, lay.area
+    while i < n:
+        ptg = rgce[i]
+        i += 1
+        if ptg in BINARY_OPS:
+            b, a = stack.pop(), stack.pop()
+            stack.append(a + BINARY_OPS[ptg] + b)
+            continue
+        if ptg < 0x20:
+            if ptg == 0x01: raise ValueError("shared formula reference")
+            elif ptg == 0x12: stack.append("+" + stack.pop())
+            elif ptg == 0x13: stack.append("-" + stack.pop())
+            elif ptg == 0x14: stack.append(stack.pop() + "%")
+            elif ptg == 0x15: stack.append("(" + stack.pop() + ")")
+            elif ptg == 0x16: stack.append("")
+            elif ptg == 0x17:
+                if lay.wide_str:
+                    (cch,) = u16.unpack_from(rgce, i)
+                    text = rgce[i + 2:i + 2 + 2 * cch].decode("utf-16-le", "replace")
+                    i += 2 + 2 * cch
+                else:  # BIFF8 ShortXLUnicodeString: cch, fHighByte, then 1- or 2-byte chars
+                    cch, wide = rgce[i], rgce[i + 1] & 1
+                    raw = rgce[i + 2:i + 2 + (cch << wide)]
+                    text = raw.decode("utf-16-le" if wide else "latin-1", "replace")
+                    i += 2 + (cch << wide)
+                stack.append('"' + text.replace('"', '""') + '"')
+            elif ptg == 0x18 and lay.wide_str and rgce[i] == 0x19:  # PtgList (eptg 0x19): a table reference
+                stack.append(table_ref(book, *struct.unpack_from("<HHIHH", rgce, i + 1)))
+                i += 13
+            elif ptg == 0x19:
+                kind = rgce[i]
+                if kind & 0x04: i += 3 + 2 * (u16.unpack_from(rgce, i + 1)[0] + 1)  # choose jump table
+                else:
+                    if kind & 0x10: stack.append("SUM(" + stack.pop() + ")")
+                    i += 3
+            elif ptg == 0x1C:
+                stack.append(ERRORS.get(rgce[i], "#N/A"))
+                i += 1
+            elif ptg == 0x1D:
+                stack.append("TRUE" if rgce[i] else "FALSE")
+                i += 1
+            elif ptg == 0x1E:
+                stack.append(str(u16.unpack_from(rgce, i)[0]))
+                i += 2
+            elif ptg == 0x1F:
+                num = repr(struct.unpack_from("<d", rgce, i)[0])
+                stack.append(num[:-2] if num.endswith(".0") else num)
+                i += 8
+            else: raise ValueError(f"unsupported ptg 0x{ptg:02X}")
+            continue
+        ptg = (ptg & 0x1F) | 0x20
+        if ptg == 0x20:
+            stack.append("{0}")
+            i += lay.array
+        elif ptg == 0x21:
+            (tab,) = u16.unpack_from(rgce, i)
+            i += 2
+            argc = FIXED_ARGS.get(tab, 1)
+            args = stack[len(stack) - argc:] if argc else []
+            del stack[len(stack) - argc:]
+            stack.append(f"{FTAB.get(tab, f'_FN{tab}')}({','.join(args)})")
+        elif ptg == 0x22:
+            argc, tab = rgce[i], u16.unpack_from(rgce, i + 1)[0] & 0x7FFF
+            i += 3
+            args = stack[len(stack) - argc:] if argc else []
+            del stack[len(stack) - argc:]
+            if tab == 255 and args: stack.append(f"{args[0]}({','.join(args[1:])})")
+            else: stack.append(f"{FTAB.get(tab, f'_FN{tab}')}({','.join(args)})")
+        elif ptg == 0x23:
+            stack.append(book.name_text(lay.name.unpack_from(rgce, i)[0]))
+            i += 4
+        elif ptg in (0x24, 0x2C):
+            r, cf = ref.unpack_from(rgce, i)
+            c, crel = _col(cf, col, ptg == 0x2C, lay)
+            stack.append(_cell(_row(r, bool(cf & 0x4000), row, ptg == 0x2C, lay), bool(cf & 0x4000), c, crel))
+            i += ref.size
+        elif ptg in (0x25, 0x2D):
+            r1, r2, c1, c2 = area.unpack_from(rgce, i)
+            stack.append(_area(r1, r2, c1, c2, row, col, ptg == 0x2D, lay))
+            i += area.size
+        elif ptg in (0x26, 0x27, 0x28): i += 6  # mem tokens: the subexpression follows as ordinary tokens
+        elif ptg == 0x29: i += 2
+        elif ptg == 0x2A:
+            stack.append("#REF!")
+            i += ref.size
+        elif ptg == 0x2B:
+            stack.append("#REF!")
+            i += area.size
+        elif ptg == 0x39:
+            ixti, idx = struct.unpack_from("<HI", rgce, i)
+            stack.append(f"_xll.NAMEX{ixti}_{idx}")
+            i += 6
+        elif ptg in (0x3A, 0x3B, 0x3C, 0x3D):
+            (ixti,) = u16.unpack_from(rgce, i)
+            prefix = book.xti[ixti] if ixti < len(book.xti) else "#REF!"
+            if ptg == 0x3A:
+                r, cf = ref.unpack_from(rgce, i + 2)
+                c, crel = _col(cf, col, False, lay)
+                body = _cell(r + 1, bool(cf & 0x4000), c, crel)
+            elif ptg == 0x3B: body = _area(*area.unpack_from(rgce, i + 2), row, col, False, lay)
+            else: body = "#REF!"
+            stack.append("#REF!" if prefix == "#REF!" else prefix + body)
+            i += 2 + (ref.size if ptg in (0x3A, 0x3C) else area.size)
+        else: raise ValueError(f"unsupported ptg 0x{ptg:02X}")
+    return stack[-1] if stack else ""
+
+
+def parsed_formula(data, off):
+    """CellParsedFormula at `off`: (rgce bytes, next offset past rgcb)."""
+    (cce,) = struct.unpack_from("<I", data, off)
+    rgce = data[off + 4:off + 4 + cce]
+    (cb,) = struct.unpack_from("<I", data, off + 4 + cce)
+    return rgce, off + 8 + cce + cb
+
+
+def sqrfx(data, off):
+    """UncheckedSqRfX at `off` (count, then rwFirst/rwLast/colFirst/colLast): (A1 sqref string, next offset)."""
+    (crfx,) = struct.unpack_from("<I", data, off)
+    end = off + 4 + 16 * crfx
+    return " ".join(f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2 + 1)}{r2 + 1}"
+                    for r1, r2, c1, c2 in struct.iter_unpack("<IIII", data[off + 4:end])), end
+
+
+# --- SHEET REPLAY ---
+class XlsbSheetReader:
+    """Replays a BIFF12 sheet part as dimension/row/c/v/f events into a PartStream, plus the
+    conditionalFormatting, dataValidations and hyperlinks blocks that follow the sheet data."""
+    def __init__(self, stream, book):
+        self.stream, self.book = stream, book
+        self.memo = {}
+        self.groups = {}  # anchor row -> [(first col, last col, si)]
+        self.pending = None
+        self.row_open = self.in_links = False
+        self.si = 0
+
+    def run(self, fh):
+        st = self.stream
+        for rt, data in iter_records(fh):
+            if self.pending:
+                if rt in (BRT_SHR_FMLA, BRT_ARR_FMLA):
+                    self._group(rt, data)
+                    continue
+                self._flush_member()
+            if self.in_links and rt != BRT_HLINK:
+                st.end("hyperlinks")
+                self.in_links = False
+            if rt == BRT_ROW_HDR:
+                self._close_row()
+                r, ixfe = struct.unpack_from("<II", data, 0)
+                attrs = {"r": str(r + 1)}
+                flags = data[11] if len(data) > 11 else 0
+                if ixfe and flags & 0x40: attrs["s"], attrs["customFormat"] = str(ixfe), "1"
+                if flags & 0x10: attrs["hidden"] = "1"
+                if flags & 0x20: attrs["customHeight"] = "1"
+                st.start("row", attrs)
+                self.row_open = True
+            elif rt == BRT_CELL_BLANK or rt in VALUE_CELLS:
+                self._cell(data, rt != BRT_CELL_BLANK)
+            elif rt in FORMULA_CELLS:
+                self._formula_cell(rt, data)
+            elif rt == BRT_WS_DIM:
+                r1, r2, c1, c2 = struct.unpack_from("<IIII", data, 0)
+                st.start("dimension", {"ref": f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2 + 1)}{r2 + 1}"})
+                st.end("dimension")
+            elif rt == BRT_END_SHEET_DATA:
+                self._close_row()
+            elif rt == BRT_BEGIN_CF:
+                st.start("conditionalFormatting", {"sqref": sqrfx(data, 8)[0]})
+            elif rt == BRT_BEGIN_CF_RULE:
+                # rule formulas are relative to the range, so identical bytes (iPri aside) mean one rule pasted twice
+                st.start("cfRule", {"type": str(struct.unpack_from("<I", data, 0)[0]), "rule": (data[:12] + data[16:]).hex()})
+                st.end("cfRule")
+            elif rt == BRT_END_CF:
+                st.end("conditionalFormatting")
+            elif rt == BRT_BEGIN_DVALS:
+                st.start("dataValidations", {})
+            elif rt == BRT_DVAL:
+                self._dval(data)
+            elif rt == BRT_END_DVALS:
+                st.end("dataValidations")
+            elif rt == BRT_HLINK:
+                if not self.in_links: st.start("hyperlinks", {})
+                self.in_links = True
+                r1, r2, c1, c2 = struct.unpack_from("<IIII", data, 0)
+                rid, off = wide_string(data, 16)
+                location, _ = wide_string(data, off)
+                st.start("hyperlink", {"ref": f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2 + 1)}{r2 + 1}",
+                                       "r:id": rid or "", "location": location or ""})
+                st.end("hyperlink")
+        if self.pending: self._flush_member()
+        self._close_row()
+        if self.in_links: self.stream.end("hyperlinks")
+
+    def _close_row(self):
+        if self.row_open:
+            self.stream.end("row")
+            self.row_open = False
+
+    def _dval(self, data):
+        """BrtDVal: flags, ranges, four prompt/error strings, two formulas; the body key skips the strings."""
+        ref, off = sqrfx(data, 4)
+        for _ in range(4): off = wide_string(data, off)[1]
+        formulas = off
+        for _ in range(2): off = parsed_formula(data, off)[1]
+        self.stream.start("dataValidation", {"type": str(data[0] & 0x0F), "rule": data[:4].hex() + data[formulas:off].hex(), "sqref": ref})
+        self.stream.end("dataValidation")
+
+    def _cell_attrs(self, data):
+        col, style = struct.unpack_from("<II", data, 0)
+        attrs = {"r": f"{col_letters(col + 1)}{self.stream.row}"}
+        if style & 0xFFFFFF: attrs["s"] = str(style & 0xFFFFFF)
+        return col, attrs
+
+    def _cell(self, data, has_value, formula=None, fattrs=None):
+        st = self.stream
+        _, attrs = self._cell_attrs(data)
+        st.start("c", attrs)
+        if fattrs is not None:
+            st.start("f", fattrs)
+            if formula: st.chars(formula)
+            st.end("f")
+        if has_value:
+            st.start("v", {})
+            st.end("v")
+        st.end("c")
+
+    def _decompile(self, rgce, row=0, col=0):
+        try: return decompile(rgce, self.book, row, col)
+        except (ValueError, IndexError, struct.error):
+            self.book.unparsed += 1
+            return ""
+
+    def _formula_cell(self, rt, data):
+        size = FORMULA_CELLS[rt]
+        off = 8 + size if size is not None else wide_string(data, 8)[1]
+        rgce, _ = parsed_formula(data, off + 2)
+        if rgce[:1] == b"\x01":  # PtgExp: member of a shared/array group; its master record may follow
+            self.pending = (data, struct.unpack_from("<I", rgce, 1)[0])
+            return
+        text = self.memo.get(rgce)
+        if text is None:
+            text = self._decompile(rgce)
+            if len(self.memo) > 100000: self.memo.clear()
+            self.memo[rgce] = text
+        self._cell(data, True, text, {})
+
+    def _group(self, rt, data):
+        cell, _ = self.pending
+        self.pending = None
+        r1, r2, c1, c2 = struct.unpack_from("<IIII", data, 0)
+        rgce, _ = parsed_formula(data, 16 if rt == BRT_SHR_FMLA else 17)
+        text = self._decompile(rgce, r1, c1)
+        ref = f"{col_letters(c1 + 1)}{r1 + 1}:{col_letters(c2 + 1)}{r2 + 1}"
+        if rt == BRT_ARR_FMLA:
+            self._cell(cell, True, text, {"t": "array", "ref": ref})
+            return
+        si = str(self.si)
+        self.si += 1
+        self.groups.setdefault(r1, []).append((c1, c2, si))
+        self._cell(cell, True, text, {"t": "shared", "ref": ref, "si": si})
+
+    def _flush_member(self):
+        cell, anchor_row = self.pending
+        self.pending = None
+        (col,) = struct.unpack_from("<I", cell, 0)
+        si = next((s for c1, c2, s in self.groups.get(anchor_row, ()) if c1 <= col <= c2), f"r{anchor_row}")
+        self._cell(cell, True, None, {"t": "shared", "si": si})
+
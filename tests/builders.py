@@ -0,0 +1,241 @@
+import struct, zipfile
+
+# --- IN-MEMORY WORKBOOK BUILDERS ---
+# Just enough of each container for the COM-free readers: an .xlsx/.xlsb zip, a BIFF8 Workbook
+# stream and the v3 compound file that wraps it (or an encrypted OOXML package).
+NS = ('xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+      'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"')
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+
+
+def _rels(items):
+    """{rid: (target, kind)}, or (target, kind, "External") for targets outside the package."""
+    body = ""
+    for rid, (target, kind, *mode) in items.items():
+        extra = f' TargetMode="{mode[0]}"' if mode else ""
+        body += f'<Relationship Id="{rid}" Type="{REL}{kind}" Target="{target}"{extra}/>'
+    return f'<?xml version="1.0"?><Relationships xmlns="{REL_NS}">{body}</Relationships>'
+
+
+def xlsx(path, sheets, defined_names="", parts=None, wb_rels=None, sheet_rels=None, content_types=None):
+    """sheets: [(name, xml inside <worksheet>)]; parts: extra {part: data}; sheet_rels: {sheet number: {rid: (target, kind)}};
+    content_types: {part: content type} overrides."""
+    overrides = "".join(f'<Override PartName="/{part}" ContentType="{ctype}"/>' for part, ctype in (content_types or {}).items())
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", '<?xml version="1.0"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                   f'<Default Extension="xml" ContentType="application/xml"/>{overrides}</Types>')
+        z.writestr("_rels/.rels", _rels({"rId1": ("xl/workbook.xml", "officeDocument")}))
+        rels = {f"rId{i}": (f"worksheets/sheet{i}.xml", "worksheet") for i in range(1, len(sheets) + 1)}
+        rels.update(wb_rels or {})
+        entries = "".join(f'<sheet name="{name}" sheetId="{i}" r:id="rId{i}"/>' for i, (name, _) in enumerate(sheets, 1))
+        names = f"<definedNames>{defined_names}</definedNames>" if defined_names else ""
+        z.writestr("xl/workbook.xml", f'<?xml version="1.0"?><workbook {NS}><sheets>{entries}</sheets>{names}</workbook>')
+        z.writestr("xl/_rels/workbook.xml.rels", _rels(rels))
+        for i, (_, body) in enumerate(sheets, 1):
+            z.writestr(f"xl/worksheets/sheet{i}.xml", f'<?xml version="1.0"?><worksheet {NS}>{body}</worksheet>')
+            if sheet_rels and i in sheet_rels: z.writestr(f"xl/worksheets/_rels/sheet{i}.xml.rels", _rels(sheet_rels[i]))
+        for name, data in (parts or {}).items(): z.writestr(name, data)
+    return str(path)
+
+
+def external_link(n, target, sheets=(), cells=0):
+    """Parts of xl/externalLinks/externalLink<n>.xml: an externalBook over `target` caching `cells` values of its first sheet."""
+    names = "".join(f'<sheetName val="{s}"/>' for s in sheets)
+    values = "".join(f'<cell r="A{i}"><v>{i}</v></cell>' for i in range(1, cells + 1))
+    rels = (f'<?xml version="1.0"?><Relationships xmlns="{REL_NS}"><Relationship Id="rId1" Type="{REL}externalLinkPath" '
+            f'Target="{target}" TargetMode="External"/></Relationships>')
+    return {f"xl/externalLinks/externalLink{n}.xml":
+            f'<?xml version="1.0"?><externalLink {NS}><externalBook r:id="rId1"><sheetNames>{names}</sheetNames>'
+            f'<sheetDataSet><sheetData sheetId="0"><row r="1">{values}</row></sheetData></sheetDataSet></externalBook></externalLink>',
+            f"xl/externalLinks/_rels/externalLink{n}.xml.rels": rels}
+
+
+def pivot_cache(n, source, records=None, attrs=""):
+    """Parts of xl/pivotCache/pivotCacheDefinition<n>.xml over <worksheetSource {source}/>, plus its records part if given."""
+    parts = {f"xl/pivotCache/pivotCacheDefinition{n}.xml":
+             f'<?xml version="1.0"?><pivotCacheDefinition {NS} {attrs}><cacheSource type="worksheet"><worksheetSource {source}/>'
+             f'</cacheSource><cacheFields count="0"/></pivotCacheDefinition>'}
+    if records is not None:
+        parts[f"xl/pivotCache/pivotCacheRecords{n}.xml"] = records
+        parts[f"xl/pivotCache/_rels/pivotCacheDefinition{n}.xml.rels"] = _rels({"rId1": (f"pivotCacheRecords{n}.xml", "pivotCacheRecords")})
+    return parts
+
+
+# --- BIFF12 (.xlsb) ---
+def brt(rt, data=b""):
+    """One BIFF12 record: 1-2 byte type, 7-bit varint size."""
+    head = bytearray(bytes([(rt & 0x7F) | 0x80, rt >> 7]) if rt >= 0x80 else bytes([rt]))
+    n = len(data)
+    while True:
+        head.append((n & 0x7F) | (0x80 if n > 0x7F else 0))
+        n >>= 7
+        if not n: break
+    return bytes(head) + data
+
+
+def wide(text): return struct.pack("<I", len(text)) + text.encode("utf-16-le")
+
+
+def brt_ref(row, col, rrel=True, crel=True):
+    return struct.pack("<IH", row, col | (0x4000 if rrel else 0) | (0x8000 if crel else 0))
+
+
+def brt_row(row): return brt(0, struct.pack("<IIH", row, 0, 0x12C) + b"\0" * 16)
+
+
+def brt_num(col, value, style=0): return brt(5, struct.pack("<IId", col, style, value))
+
+
+def brt_formula(col, rgce, style=0):
+    """BrtFmlaNum with the formula's rgce and no extra data."""
+    return brt(9, struct.pack("<IId", col, style, 0.0) + b"\0\0" + struct.pack("<I", len(rgce)) + rgce + struct.pack("<I", 0))
+
+
+def brt_dimension(r1, r2, c1, c2): return brt(148, struct.pack("<IIII", r1, r2, c1, c2))
+
+
+def brt_rfx(r1, r2, c1, c2): return struct.pack("<IIII", r1, r2, c1, c2)
+
+
+def brt_table(list_id, name, columns):
+    """A table part: BrtBeginList (rfx, 12 dwords incl. idList, stName, stDisplayName) and one BrtBeginListCol per column."""
+    head = brt(343, brt_rfx(0, 10, 0, len(columns) - 1) + struct.pack("<12I", 0, list_id, *[0] * 10) + wide(name + "_1") + wide(name))
+    return head + b"".join(brt(347, struct.pack("<6I", i + 1, 0, 0, 0, 0, 0) + wide(c)) for i, c in enumerate(columns)) + brt(344)
+
+
+def xlsb(path, sheets, names=(), tails=None, parts=None):
+    """sheets: [(name, sheet records between BrtBeginSheetData/BrtEndSheetData)]; names: [(name, rgce)];
+    tails: {sheet number: records after BrtEndSheetData (conditional formats, validations, hyperlinks)}; parts: extra {part: data}."""
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("[Content_Types].xml", "<Types/>")
+        z.writestr("_rels/.rels", _rels({"rId1": ("xl/workbook.bin", "officeDocument")}))
+        wb = brt(131)
+        for i, (name, body) in enumerate(sheets, 1):
+            wb += brt(156, struct.pack("<II", 0, i) + wide(f"rId{i}") + wide(name))
+            z.writestr(f"xl/worksheets/sheet{i}.bin", brt(129) + brt(145) + body + brt(146) + (tails or {}).get(i, b"") + brt(130))
+        wb += brt(353) + brt(357) + brt(362, struct.pack("<I", len(sheets)) + b"".join(struct.pack("<Iii", 0, i, i) for i in range(len(sheets))))
+        wb += brt(354)
+        for name, rgce in names: wb += brt(39, struct.pack("<IBI", 0, 0, 0xFFFFFFFF) + wide(name) + struct.pack("<I", len(rgce)) + rgce + struct.pack("<I", 0))
+        z.writestr("xl/workbook.bin", wb + brt(132))
+        z.writestr("xl/_rels/workbook.bin.rels", _rels({f"rId{i}": (f"worksheets/sheet{i}.bin", "worksheet") for i in range(1, len(sheets) + 1)}))
+        for name, data in (parts or {}).items(): z.writestr(name, data)
+    return str(path)
+
+
+# --- BIFF8 (.xls) ---
+def biff(rt, data=b""): return struct.pack("<HH", rt, len(data)) + data
+
+
+def bof(kind): return biff(0x0809, struct.pack("<HHHHII", 0x0600, kind, 0, 0, 0, 0))
+
+
+def short_string(text): return bytes([len(text), 0]) + text.encode("latin-1")
+
+
+def biff_ref(row, col, rrel=True, crel=True):
+    return struct.pack("<HH", row, col | (0x4000 if rrel else 0) | (0x8000 if crel else 0))
+
+
+def biff_number(row, col, xf=15): return biff(0x0203, struct.pack("<HHH", row, col, xf) + b"\0" * 8)
+
+
+def biff_formula(row, col, rgce, xf=15):
+    return biff(0x0006, struct.pack("<HHH", row, col, xf) + b"\0" * 8 + struct.pack("<HI", 0, 0) + struct.pack("<H", len(rgce)) + rgce)
+
+
+def biff_shrfmla(r1, r2, c1, c2, rgce):
+    return biff(0x04BC, struct.pack("<HHBB", r1, r2, c1, c2) + b"\0\0" + struct.pack("<H", len(rgce)) + rgce)
+
+
+def biff_dimensions(r1, r2, c1, c2): return biff(0x0200, struct.pack("<IIHHH", r1, r2, c1, c2, 0))
+
+
+def biff_name(name, rgce, hidden=False):
+    return biff(0x0018, struct.pack("<HBBHHH", 1 if hidden else 0, 0, len(name), len(rgce), 0, 0) + b"\0" * 4
+                + b"\0" + name.encode("latin-1") + rgce)
+
+
+def workbook_stream(sheets, globals_extra=b"", encrypted=False):
+    """Globals substream (BOUNDSHEET per sheet) followed by each sheet substream, offsets patched in."""
+    g = bof(5) + (biff(0x002F, b"\1\0" + b"\0" * 52) if encrypted else b"")
+    slots = []
+    for name, _ in sheets:
+        slots.append(len(g))
+        g += biff(0x0085, struct.pack("<IBB", 0, 0, 0) + short_string(name))
+    out = bytearray(g + globals_extra + biff(0x000A))
+    for slot, (_, body) in zip(slots, sheets):
+        struct.pack_into("<I", out, slot + 4, len(out))
+        out += bof(0x10) + body + biff(0x000A)
+    return bytes(out)
+
+
+def xls(path, sheets, globals_extra=b"", encrypted=False, storages=None):
+    compound_file(path, dict({"Workbook": workbook_stream(sheets, globals_extra, encrypted)}, **(storages or {})))
+    return str(path)
+
+
+# --- COMPOUND FILE (v3, 512-byte sectors) ---
+def compound_file(path, tree):
+    """tree: {name: bytes | {name: ...}}; streams under 4096 bytes go to the mini stream, as the format requires."""
+    entries = [["Root Entry", 5, b"", []]]
+
+    def add(name, node):
+        idx = len(entries)
+        entries.append([name, 1 if isinstance(node, dict) else 2, b"" if isinstance(node, dict) else node, []])
+        for k, v in (node.items() if isinstance(node, dict) else ()): entries[idx][3].append(add(k, v))
+        return idx
+
+    for k, v in tree.items(): entries[0][3].append(add(k, v))
+    sectors, fat = [], {}
+
+    def alloc(data):
+        if not data: return 0xFFFFFFFE
+        start, n = len(sectors), (len(data) + 511) // 512
+        for i in range(n):
+            sectors.append(data[i * 512:(i + 1) * 512].ljust(512, b"\0"))
+            fat[start + i] = start + i + 1 if i < n - 1 else 0xFFFFFFFE
+        return start
+
+    mini, minifat, placed = b"", [], {}
+    for i, (_, kind, data, _) in enumerate(entries):
+        if kind != 2: continue
+        if not data: placed[i] = (0xFFFFFFFE, 0)
+        elif len(data) < 4096:
+            start, n = len(mini) // 64, (len(data) + 63) // 64
+            mini += data.ljust(n * 64, b"\0")
+            minifat += [start + k + 1 if k < n - 1 else 0xFFFFFFFE for k in range(n)]
+            placed[i] = (start, len(data))
+        else: placed[i] = (alloc(data), len(data))
+    placed[0] = (alloc(mini), len(mini))
+    minifat_data = b"".join(struct.pack("<I", x) for x in minifat)
+    minifat_start = alloc(minifat_data) if minifat else 0xFFFFFFFE
+
+    directory = [bytearray(128) for _ in entries]
+    for i, (name, kind, _, kids) in enumerate(entries):
+        raw = name.encode("utf-16-le") + b"\0\0"
+        d = directory[i]
+        d[:len(raw)] = raw
+        struct.pack_into("<HBBIII", d, 64, len(raw), kind, 1, 0xFFFFFFFF, 0xFFFFFFFF, kids[0] if kids else 0xFFFFFFFF)
+        struct.pack_into("<IQ", d, 116, *placed.get(i, (0, 0)))
+    for *_, kids in entries:  # siblings hang off each other's right pointer, a degenerate but valid red-black tree
+        for a, b in zip(kids, kids[1:]): struct.pack_into("<I", directory[a], 72, b)
+    dir_start = alloc(b"".join(bytes(d) for d in directory))
+
+    nfat = 1
+    while nfat * 128 < len(sectors) + nfat: nfat += 1
+    fat_start = len(sectors)
+    for i in range(nfat): fat[fat_start + i] = 0xFFFFFFFD
+    table = b"".join(struct.pack("<I", fat.get(i, 0xFFFFFFFF)) for i in range(nfat * 128))
+    sectors += [table[i * 512:(i + 1) * 512] for i in range(nfat)]
+    header = (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\0" * 16 + struct.pack("<HHHHH", 0x3E, 3, 0xFFFE, 9, 6) + b"\0" * 6
+              + struct.pack("<IIIIIIIII", 0, nfat, dir_start, 0, 4096, minifat_start, (len(minifat_data) + 511) // 512,
+                            0xFFFFFFFE, 0)
+              + b"".join(struct.pack("<I", fat_start + i if i < nfat else 0xFFFFFFFF) for i in range(109)))
+    with open(path, "wb") as fh: fh.write(header + b"".join(sectors))
+    return str(path)
+
+
+def encrypted_package(path):
+    """What Excel writes for a password-protected .xlsx: a compound file with EncryptionInfo + EncryptedPackage."""
+    return compound_file(path, {"EncryptionInfo": b"\4\0\4\0" + b"\0" * 60, "EncryptedPackage": b"\0" * 100})
@@ -0,0 +1,91 @@
+import os, hashlib, itertools
+import pytest
+import forensic_cache
+from forensic_cache import ResultCache
+
+RESULT = {"name": "a.xlsx", "dims": "[1R x 1C]", "issues": [], "health": "Fully Compliant"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time(), so LRU order never depends on the timer's resolution."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(forensic_cache.time, "time", lambda: float(next(ticks)))
+
+
+def book(tmp_path, name, data=b"workbook bytes"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_hit_miss_and_invalidation(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    path = book(tmp_path, "a.xlsx")
+    digest, res = cache.lookup(path, "ooxml:1:default")
+    assert res is None and digest == hashlib.sha256(b"workbook bytes").hexdigest()
+    cache.store(digest, "ooxml:1:default", RESULT)
+    copy = book(tmp_path, "copy.xlsx")  # same content under another name is a hit, reported under its own name
+    assert cache.lookup(copy, "ooxml:1:default") == (digest, dict(RESULT, name="copy.xlsx"))
+    assert cache.lookup(path, "ooxml:2:default")[1] is None
+    assert cache.lookup(path, "com:1:default")[1] is None
+    monkeypatch.setattr(forensic_cache, "SCANNER_VERSION", "next")
+    assert cache.lookup(path, "ooxml:1:default")[1] is None
+
+
+def test_critical_results_are_not_stored(tmp_path):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    digest, _ = cache.lookup(book(tmp_path, "locked.xlsx"), "r")
+    cache.store(digest, "r", dict(RESULT, health="Critical"))
+    assert cache.lookup(book(tmp_path, "locked.xlsx"), "r")[1] is None
+
+
+def test_unchanged_files_skip_hashing(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    path = book(tmp_path, "a.xlsx")
+    digest = cache.content_hash(path)
+    def refuse(): raise AssertionError("hashed an unchanged file")
+    monkeypatch.setattr(forensic_cache.hashlib, "sha256", refuse)
+    assert cache.content_hash(path) == digest
+    monkeypatch.undo()
+    st = os.stat(path)
+    with open(path, "wb") as fh: fh.write(b"edited bytes!!")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache.content_hash(path) == hashlib.sha256(b"edited bytes!!").hexdigest()
+
+
+def test_file_written_while_hashing_gets_no_fast_path_entry(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    path = book(tmp_path, "a.xlsx")
+    real = hashlib.sha256
+
+    class Racing:
+        def __init__(self): self.h, self.saved = real(), False
+        def update(self, chunk):
+            self.h.update(chunk)
+            if not self.saved:  # Excel saves the file mid-read
+                with open(path, "ab") as fh: fh.write(b"more")
+                self.saved = True
+        def hexdigest(self): return self.h.hexdigest()
+    monkeypatch.setattr(forensic_cache.hashlib, "sha256", Racing)
+    cache.content_hash(path)
+    assert cache.db.execute("SELECT COUNT(*) FROM files").fetchone() == (0,)
+
+
+def test_eviction_drops_least_recently_used_first(tmp_path, clock):
+    cache = ResultCache(str(tmp_path / "c.sqlite"), max_entries=2)
+    for h in ("h1", "h2", "h3"): cache.store(h, "r", RESULT)
+    path = book(tmp_path, "a.xlsx")
+    cache.store(cache.content_hash(path), "r", RESULT)
+    cache.lookup(path, "r")  # touching an entry makes it the most recent
+    cache.store("h4", "r", RESULT)
+    cache.evict()
+    assert sorted(h for (h,) in cache.db.execute("SELECT hash FROM results")) == sorted([cache.content_hash(path), "h4"])
+
+
+def test_eviction_honours_the_byte_cap(tmp_path, clock):
+    blob = len(forensic_cache.json.dumps(RESULT))
+    cache = ResultCache(str(tmp_path / "c.sqlite"), max_bytes=2 * blob)
+    for h in ("h1", "h2", "h3"): cache.store(h, "r", RESULT)
+    cache.evict()
+    assert sorted(h for (h,) in cache.db.execute("SELECT hash FROM results")) == ["h2", "h3"]
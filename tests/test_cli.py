@@ -0,0 +1,65 @@
+import io, json
+from forensic_cli import OrderedEmitter, main
+from builders import encrypted_package, external_link, xlsx
+
+CLEAN = '<dimension ref="A1:B1"/><sheetData><row r="1"><c r="A1"><v>1</v></c><c r="B1"><f>A1*2</f><v>2</v></c></row></sheetData>'
+VOLATILE = '<dimension ref="A1:B1"/><sheetData><row r="1"><c r="A1"><v>1</v></c><c r="B1"><f>OFFSET(A1,0,0)</f><v>1</v></c></row></sheetData>'
+
+
+def test_deferred_files_do_not_hold_back_the_stream():
+    out = io.StringIO()
+    emit = OrderedEmitter(["a.xlsx", "b.xlsx", "c.xlsx"], out, jsonl=True)
+    emit.defer([0])
+    emit(2, {"name": "c"})
+    emit(1, {"name": "b"})
+    assert [json.loads(line)["index"] for line in out.getvalue().splitlines()] == [1, 2]
+    emit(0, {"name": "a"})
+    assert json.loads(out.getvalue().splitlines()[-1]) == {"name": "a", "path": "a.xlsx", "index": 0}
+
+
+def test_encrypted_file_first_in_the_batch_is_written_last(tmp_path):
+    secret = encrypted_package(tmp_path / "a_secret.xlsx")
+    clean = xlsx(tmp_path / "b_clean.xlsx", [("Data", CLEAN)])
+    out = tmp_path / "out.jsonl"
+    code = main([secret, clean, "--jsonl", "-o", str(out), "--no-cache", "-j", "1"])
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [(r["index"], r["dims"]) for r in records] == [(1, "[1R x 2C]"), (0, "LOCKED")]
+    assert code == 3
+
+
+def run(tmp_path, paths, *extra):
+    out = tmp_path / "out.jsonl"
+    code = main([str(p) for p in paths] + ["--jsonl", "-o", str(out), "--no-cache"] + list(extra))
+    return code, [json.loads(line) for line in out.read_text().splitlines()]
+
+
+def test_exit_codes_follow_the_worst_health(tmp_path):
+    clean = xlsx(tmp_path / "clean.xlsx", [("Data", CLEAN)])
+    slow = xlsx(tmp_path / "slow.xlsx", [("Data", VOLATILE)])
+    assert run(tmp_path, [clean], "-j", "1")[0] == 0
+    assert run(tmp_path, [clean, slow], "-j", "1")[0] == 1
+    assert run(tmp_path, [clean, slow, encrypted_package(tmp_path / "secret.xlsx")], "-j", "1")[0] == 3
+
+
+def test_jsonl_records_keep_input_order_across_processes(tmp_path):
+    paths = [xlsx(tmp_path / f"book{i}.xlsx", [("Data", VOLATILE if i % 2 else CLEAN)]) for i in range(6)]
+    code, records = run(tmp_path, paths, "-j", "3")
+    assert code == 1
+    assert [r["index"] for r in records] == list(range(6))
+    assert [r["path"] for r in records] == paths
+    assert set(records[0]) >= {"name", "size", "dims", "issues", "health", "path", "index"}
+    assert records[1]["health"] == "Needs Optimization" and records[0]["issues"] == []
+
+
+def test_link_inventory_merges_targets_across_the_batch(tmp_path):
+    a = xlsx(tmp_path / "a.xlsx", [("Data", CLEAN)], parts=external_link(1, "file:///C:/Data/Rates.xlsx", ["FX"], cells=2))
+    b = xlsx(tmp_path / "b.xlsx", [("Data", CLEAN)], parts=dict(external_link(1, "c:\\data\\RATES.xlsx", ["Rates"], cells=1),
+                                                                **external_link(2, "\\\\fin\\models\\Plan.xlsx")))
+    inventory = tmp_path / "links.json"
+    run(tmp_path, [a, b], "-j", "1", "--link-inventory", str(inventory))
+    inv = json.loads(inventory.read_text())
+    assert inv["shares"] == {"c:": 2, "\\\\fin\\models": 1}
+    rates, plan = inv["targets"]
+    assert (rates["target"], rates["workbooks"], rates["sheets"]) == ("file:///C:/Data/Rates.xlsx", 2, ["FX", "Rates"])
+    assert rates["cached_bytes"] > 0
+    assert (plan["target"], plan["share"], plan["workbooks"]) == ("\\\\fin\\models\\Plan.xlsx", "\\\\fin\\models", 1)
@@ -0,0 +1,56 @@
+import json, os, subprocess, sys
+import pytest
+import forensic_com
+
+psutil = pytest.importorskip("psutil")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    path = str(tmp_path / "pids.json")
+    monkeypatch.setattr(forensic_com, "PID_REGISTRY", path)
+    return path
+
+
+def sleeper():
+    return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+
+
+def test_reset_only_kills_own_and_orphaned_instances(registry, monkeypatch):
+    other, gone = sleeper(), subprocess.Popen([sys.executable, "-c", "pass"])
+    gone.wait()
+    try:
+        me = os.getpid()
+        with forensic_com._registry() as reg:
+            reg[101] = [me, forensic_com._started(me), 1.0]
+            reg[102] = [other.pid, forensic_com._started(other.pid), 2.0]  # a CLI batch that is still running
+            reg[103] = [gone.pid, 12345.0, 3.0]                            # its owner has exited
+        with open(registry) as fh: raw = json.load(fh)
+        raw["104"] = 4.0                                                   # pre-owner format
+        with open(registry, "w") as fh: json.dump(raw, fh)
+        killed = []
+        monkeypatch.setattr(forensic_com, "kill_pid", lambda pid, created=None: killed.append((pid, created)))
+        forensic_com.kill_tracked()
+        assert sorted(killed) == [(101, 1.0), (103, 3.0), (104, 4.0)]
+    finally: other.kill()
+
+
+def test_track_and_untrack_record_the_owner(registry):
+    child = sleeper()
+    try:
+        forensic_com.track_pid(child.pid)
+        entry = forensic_com._load_registry()[child.pid]
+        assert entry[0] == os.getpid() and abs(entry[2] - psutil.Process(child.pid).create_time()) < 1
+        assert not forensic_com.kill_pid(child.pid)  # not an EXCEL.EXE: refused, but no longer tracked
+        assert forensic_com._load_registry() == {}
+    finally: child.kill()
+
+
+def test_concurrent_processes_do_not_lose_entries(registry):
+    script = ("import sys, forensic_com; forensic_com.PID_REGISTRY = sys.argv[1]\n"
+              "for i in range(40):\n"
+              "    with forensic_com._registry() as reg: reg[int(sys.argv[2]) * 1000 + i] = [0, 0, 0.0]\n")
+    procs = [subprocess.Popen([sys.executable, "-c", script, registry, str(n)], cwd=ROOT) for n in range(4)]
+    assert all(p.wait(60) == 0 for p in procs)
+    assert len(forensic_com._load_registry()) == 160
@@ -0,0 +1,49 @@
+import json
+import pytest
+from forensic_cost import DEFAULT_COSTS, calibrate, feature_cost, nnls, workbook_features
+from builders import xlsx
+
+
+def lookup_book(path, rows):
+    cells = "".join(f'<row r="{r}"><c r="A{r}"><f>VLOOKUP(B{r},C1:D100,2,0)</f></c></row>' for r in range(1, rows + 1))
+    return str(xlsx(path, [("Data", f'<dimension ref="A1:D100"/><sheetData>{cells}</sheetData>')]))
+
+
+def test_nnls_recovers_non_negative_weights():
+    rows = [[1, 0, 2], [0, 1, 1], [3, 1, 0], [1, 1, 1]]
+    true = [0.5, 2.0, 1.0]
+    x = nnls(rows, [sum(r * w for r, w in zip(row, true)) for row in rows], ridge=0)
+    assert x == pytest.approx(true, abs=1e-6)
+
+
+def test_nnls_clamps_at_zero_and_keeps_unconstrained_features_at_the_prior():
+    x = nnls([[1, 0], [2, 0]], [-1, -2], prior=[0.3, 0.7])
+    assert x[0] == 0.0
+    assert x[1] == 0.7  # never seen in the samples, so nothing moves it
+
+
+def test_workbook_features_clip_to_the_sheet_extent(tmp_path):
+    feats = workbook_features(lookup_book(tmp_path / "a.xlsx", 3), DEFAULT_COSTS)
+    assert feats == {"_cell": 3, "VLOOKUP": 3, "VLOOKUP@cells": 3 * (1 + 200)}
+
+
+def test_calibrate_refits_only_the_sampled_features(tmp_path, capsys):
+    timings, out = tmp_path / "timings.jsonl", tmp_path / "cost_table.json"
+    samples = [(lookup_book(tmp_path / "small.xlsx", 10), 0.01), (lookup_book(tmp_path / "big.xlsx", 40), 0.04),
+               (str(tmp_path / "missing.xlsx"), 1.0)]
+    timings.write_text("".join(json.dumps({"path": p, "seconds": s}) + "\n" for p, s in samples) + "\n")
+    costs, n = calibrate(str(timings), str(out))
+    assert n == 2 and "skipped" in capsys.readouterr().err
+    assert json.loads(out.read_text()) == pytest.approx(costs)
+    assert {k: v for k, v in costs.items() if k not in ("_cell", "VLOOKUP", "VLOOKUP@cells")} == \
+        {k: v for k, v in DEFAULT_COSTS.items() if k not in ("_cell", "VLOOKUP", "VLOOKUP@cells")}
+    for path, seconds in samples[:2]:
+        assert feature_cost(workbook_features(path, costs), costs) / 1e6 == pytest.approx(seconds, rel=0.05)
+
+
+def test_calibrate_without_usable_samples_fails(tmp_path):
+    timings = tmp_path / "timings.jsonl"
+    timings.write_text(json.dumps({"path": str(tmp_path / "gone.xlsx"), "seconds": 1.0}) + "\n")
+    with pytest.raises(ValueError):
+        calibrate(str(timings), str(tmp_path / "cost_table.json"))
+    assert not (tmp_path / "cost_table.json").exists()
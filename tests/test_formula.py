@@ -0,0 +1,28 @@
+from forensic_formula import FunctionCounter, function_names, iter_formulas, parse_refs, tokenize
+
+
+def test_function_names_ignore_strings_and_longer_identifiers():
+    assert list(function_names('=IF(A1="OFFSET(",MYOFFSET(B1),NOW())')) == ["IF", "MYOFFSET", "NOW"]
+    assert list(function_names('="call INDIRECT(""x"") later"')) == []
+    assert list(function_names("=_xlfn.XLOOKUP(A1,B:B,C:C)+Table1[OFFSET]")) == ["XLOOKUP"]
+    assert list(function_names("=OFFSET.Sheet+1")) == []
+
+
+def test_quoted_sheet_names_are_single_ref_tokens():
+    tokens = list(tokenize("='Now (old)'!A1+'O''Brien''s'!B2:C3+Data!D4"))
+    assert [t for t in tokens if t[0] == "ref"] == [("ref", "'Now (old)'!A1"), ("ref", "'O''Brien''s'!B2:C3"), ("ref", "Data!D4")]
+    assert not any(kind == "func" for kind, _ in tokens)
+    assert parse_refs("='O''Brien''s'!B2:C3") == [("O'Brien's", None, 2, 2, 3, 3, 0)]
+
+
+def test_function_counter_counts_each_call():
+    fc = FunctionCounter()
+    assert fc.add('=OFFSET(A1,0,0)+NOW()+OFFSET(B1,1,1)', weight=3)
+    assert not fc.add('="OFFSET(" & MYOFFSET(A1) & \'NOW()\'!A1')
+    assert fc.cells == 3 and fc.counts == {"OFFSET": 6, "NOW": 3}
+    assert fc.summary() == "OFFSET x6, NOW x3"
+
+
+def test_iter_formulas_flattens_com_values():
+    assert list(iter_formulas(((1, "=A1"), ("x", None), ("=NOW()",)))) == ["=A1", "=NOW()"]
+    assert list(iter_formulas("=B2")) == ["=B2"] and list(iter_formulas("text")) == []
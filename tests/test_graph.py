@@ -0,0 +1,67 @@
+from forensic_graph import DependencyGraph
+
+
+def graph(cells, sheets=("Data", "Report")):
+    """cells: [(sheet, row, col, text, si)] in any order."""
+    g = DependencyGraph(sheets)
+    for sheet, row, col, text, si in cells: g.add(sheet, row, col, text, si)
+    return g.build()
+
+
+def labels(g, nodes): return sorted(g.label(v) for v in nodes)
+
+
+def volatile_fan():
+    """Data!A1 = NOW(); B1:B5 share $A$1*2; C1 sums them; Report!A1 reads Data!C1; D1 is unrelated."""
+    cells = [(0, 1, 1, "NOW()", None), (0, 1, 2, "$A$1*2", "0")] + [(0, r, 2, "", "0") for r in range(2, 6)]
+    cells += [(0, 1, 3, "SUM(B1:B5)", None), (1, 1, 1, "Data!C1+1", None), (0, 1, 4, "1+1", None)]
+    return graph(cells)
+
+
+def test_blast_radius_follows_ranges_and_sheets():
+    g = volatile_fan()
+    assert len(g) == 9
+    total, worst, n = g.blast_radius(0)
+    assert (total, g.label(worst), n) == (8, "Data!A1", 8)
+    assert labels(g, g.reached([g.node_at(0, 3, 2)])) == ["Data!B3", "Data!C1", "Report!A1"]
+    assert g.blast_radius(1) == (0, None, 0)
+
+
+def test_shared_members_shift_relative_references():
+    # A1:A4 share B1*2 anchored at A1, so A3 reads B3 and nothing else
+    cells = [(0, 1, 1, "B1*2", "0")] + [(0, r, 1, "", "0") for r in (2, 3, 4)] + [(0, r, 2, "RAND()", None) for r in (1, 2, 3, 4)]
+    g = graph(cells)
+    assert labels(g, g.reached([g.node_at(0, 3, 2)])) == ["Data!A3", "Data!B3"]
+
+
+def test_structure_finds_cycles_and_the_serial_chain():
+    cells = [(0, 1, 1, "B1+1", None), (0, 1, 2, "A1+1", None)]             # A1 <-> B1
+    cells += [(0, 1, 5, "1", None)] + [(0, r, 5, f"E{r - 1}+1", None) for r in range(2, 31)]  # E1 -> ... -> E30
+    g = graph(cells)
+    found = g.structure()
+    assert [labels(g, c) for c in found["cycles"]] == [["Data!A1", "Data!B1"]]
+    length, first, last = found["chain"]
+    assert (length, g.label(first), g.label(last)) == (30, "Data!E1", "Data!E30")
+
+
+def test_hot_spots_count_cells_behind_ranges():
+    cells = [(0, r, 1, "1", None) for r in range(1, 11)]                    # A1:A10
+    cells += [(0, 1, 2, "SUM($A$1:$A$10)+$C$1", None)]                       # B1 reads the block and C1
+    cells += [(0, r, 2, "SUM($A$1:$A$10)", None) for r in range(2, 6)]      # B2:B5 read the block
+    cells += [(0, 1, 3, "2", None)]
+    g = graph(cells)
+    fan_in, fan_out = g.hot_spots(k=1)
+    assert [(k, g.label(v)) for k, v in fan_in] == [(11, "Data!B1")]
+    (k, v), = fan_out
+    assert k == 5 and g.label(v).startswith("Data!A")  # every A cell feeds all five sums
+
+
+def test_chain_drift_counts_dependents_ordered_before_precedents():
+    g = graph([(0, 1, 1, "1", None), (0, 2, 1, "A1+1", None), (0, 3, 1, "A2+1", None)])
+    a1, a2, a3 = (g.node_at(0, r, 1) for r in (1, 2, 3))
+    in_order = [0] * len(g)
+    in_order[a1], in_order[a2], in_order[a3] = 0, 1, 2
+    assert g.chain_drift(in_order) == 0
+    reversed_ = [0] * len(g)
+    reversed_[a1], reversed_[a2], reversed_[a3] = 2, 1, 0
+    assert g.chain_drift(reversed_) == 2
@@ -0,0 +1,200 @@
+import io, zipfile
+import forensic_detectors, forensic_styles
+from forensic_engine import get_backend
+from forensic_detectors import RangeListDetector
+from forensic_ooxml import FormulaExtractor, PartStream, parse_area, split_ref
+from forensic_macros import name_macros, zip_macros
+from forensic_links import read_external_links
+from forensic_pivot import read_pivot_caches
+from builders import NS, encrypted_package, external_link, pivot_cache, xlsx
+
+
+def scan(path): return get_backend("ooxml").scan(str(path))
+
+
+def test_refs_and_areas():
+    assert split_ref("$AB$12") == (12, 28)
+    assert parse_area("B3:F20") == (3, 2, 20, 6)
+    assert parse_area("F20:B3") == (3, 2, 20, 6)
+    assert parse_area("C:C") == (1, 3, 1048576, 3)
+
+
+def test_shared_formulas_fold_into_their_master():
+    xml = (b'<worksheet><sheetData><row r="2"><c r="A2"><f t="shared" ref="A2:A4" si="0">B2*2</f></c>'
+           b'<c r="C2"><f>SUM(A:A)</f></c></row><row r="3"><c r="A3"><f t="shared" si="0"/></c></row>'
+           b'<row r="4"><c r="A4"><f t="shared" si="0"/></c><c r="C4"><f>SUM(A:A)</f></c></row></sheetData></worksheet>')
+    seen = []
+    fx = FormulaExtractor(sink=lambda r, c, text, si: seen.append((r, c, text, si)))
+    PartStream([fx]).run(io.BytesIO(xml))
+    assert dict(fx.distinct()) == {"B2*2": 3, "SUM(A:A)": 2}
+    assert seen[0] == (2, 1, "B2*2", "0") and seen[2] == (3, 1, "", "0")
+
+
+def test_clean_workbook_is_compliant(tmp_path):
+    body = '<dimension ref="A1:B2"/><sheetData><row r="1"><c r="A1"><v>1</v></c><c r="B1"><f>A1*2</f><v>2</v></c></row></sheetData>'
+    res = scan(xlsx(tmp_path / "clean.xlsx", [("Data", body)]))
+    assert res["dims"] == "[2R x 2C]"
+    assert res["issues"] == [] and res["health"] == "Fully Compliant"
+
+
+def test_phantom_rows_and_volatile_formulas(tmp_path):
+    styled = "".join(f'<row r="{r}" s="1" customFormat="1"/>' for r in range(10, 9000, 10))
+    body = (f'<dimension ref="A1:C9000"/><sheetData><row r="1"><c r="A1"><v>1</v></c>'
+            f'<c r="B1"><f>OFFSET(A1,0,0)+NOW()</f><v>1</v></c><c r="C1"><f>B1+1</f><v>2</v></c></row>{styled}</sheetData>')
+    res = scan(xlsx(tmp_path / "bloat.xlsx", [("Data", body)]))
+    text = " | ".join(res["issues"])
+    assert "Phantom Data (Data): 9000 rows detected vs 1 filled" in text
+    assert "Volatile Lag (Data): OFFSET x1, NOW x1 in 1 cells; every edit recalculates 2 cells" in text
+    assert res["health"] == "Needs Optimization"
+
+
+def test_calc_structure_is_reported_unchecked_on_large_graphs(tmp_path, monkeypatch):
+    body = ('<sheetData><row r="1"><c r="A1"><f>B1+1</f><v>0</v></c><c r="B1"><f>A1+1</f><v>0</v></c></row></sheetData>')
+    path = xlsx(tmp_path / "loop.xlsx", [("Data", body)])
+    assert any(p.startswith("Circular References: 1 loops") for p in scan(path)["issues"])
+    monkeypatch.setattr(forensic_detectors, "CALC_STRUCTURE_CELL_LIMIT", 1)
+    issues = scan(path)["issues"]
+    assert not any(p.startswith("Circular References") for p in issues)
+    assert "Calc Structure Not Checked: 2 formula cells exceed the 1 the COM-free pass analyzes" in " | ".join(issues)
+
+
+def test_encrypted_and_unsupported_files(tmp_path):
+    locked = scan(encrypted_package(tmp_path / "secret.xlsx"))
+    assert locked["dims"] == "LOCKED" and locked["health"] == "Critical"
+    (tmp_path / "notes.xlsx").write_text("not a workbook")
+    assert scan(tmp_path / "notes.xlsx")["issues"][0].startswith("Unsupported Format")
+
+
+def test_pivot_cache_sources_keep_their_names_in_use(tmp_path):
+    names = ('<definedName name="SalesData">Data!$A$1:$B$9</definedName><definedName name="Orphan">Data!$C$1</definedName>'
+             '<definedName name="Bad">#REF!</definedName>')
+    cache = ('<pivotCacheDefinition xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" saveData="0">'
+             '<cacheSource type="worksheet"><worksheetSource name="SalesData"/></cacheSource></pivotCacheDefinition>')
+    res = scan(xlsx(tmp_path / "pivot_names.xlsx", [("Data", "<sheetData/>")], defined_names=names,
+                    parts={"xl/pivotCache/pivotCacheDefinition1.xml": cache},
+                    wb_rels={"rId9": ("pivotCache/pivotCacheDefinition1.xml", "pivotCacheDefinition")}))
+    assert [i for i in res["issues"] if i.startswith("Defined Names")] == \
+        ["Defined Names: 3 names; 1 broken #REF! (e.g. Bad); 2 unused (e.g. Orphan, Bad)."]
+
+
+def test_macro_parts_are_typed_by_content_type_then_folder(tmp_path):
+    parts = {"xl/code/project.bin": b"vba", "xl/macrosheets/sheet1.xml": b"<xm/>", "xl/macrosheets/_rels/sheet1.xml.rels": b"<r/>",
+             "xl/intl/m1.xml": b"<xm/>", "xl/activeX/activeX1.bin": b"ax", "xl/activeX/activeX1.xml": b"<ax/>"}
+    path = xlsx(tmp_path / "macros.xlsm", [("Data", "<sheetData/>")], parts=parts,
+                content_types={"xl/code/project.bin": "application/vnd.ms-office.vbaProject",
+                               "xl/intl/m1.xml": "application/vnd.ms-excel.intlmacrosheet+xml"})
+    with zipfile.ZipFile(path) as zf:
+        assert zip_macros(zf) == {"vba": ["xl/code/project.bin"], "macrosheets": ["xl/macrosheets/sheet1.xml", "xl/intl/m1.xml"],
+                                  "activex": ["xl/activeX/activeX1.bin"]}
+        assert name_macros(zf.namelist()) == {"vba": [], "macrosheets": ["xl/macrosheets/sheet1.xml"], "activex": ["xl/activeX/activeX1.bin"]}
+    assert scan(path)["issues"] == [
+        "VBA Metadata: Script-based security risk.",
+        "Excel 4.0 Macros: 2 macro sheet(s) run XLM code outside the VBA project (xl/macrosheets/sheet1.xml, xl/intl/m1.xml).",
+        "ActiveX Controls: 1 embedded control binaries."]
+
+
+def test_external_links_follow_the_workbook_rels(tmp_path):
+    parts = dict(external_link(1, "file:///C:/Data/Rates.xlsx", ["FX", "Rates"], cells=3), **external_link(2, "Orphan.xlsx"))
+    parts["xl/externalLinks/externalLink3.xml"] = '<externalLink><ddeLink ddeService="Excel" ddeTopic="Prices"/></externalLink>'
+    wb_rels = {"rId8": ("externalLinks/externalLink1.xml", "externalLink"), "rId9": ("externalLinks/externalLink3.xml", "externalLink")}
+    path = xlsx(tmp_path / "links.xlsx", [("Data", "<sheetData/>")], parts=parts, wb_rels=wb_rels)
+    with zipfile.ZipFile(path) as zf: links = [link.as_dict() for link in read_external_links(zf, "xl/workbook.xml")]
+    body = parts["xl/externalLinks/externalLink1.xml"]
+    assert links == [
+        {"target": "file:///C:/Data/Rates.xlsx", "kind": "book", "sheets": ["FX", "Rates"], "cached_cells": 3,
+         "cached_bytes": body.index("</sheetDataSet>") - body.index("<sheetDataSet>")},
+        {"target": "Excel|Prices", "kind": "dde", "sheets": [], "cached_bytes": 0, "cached_cells": 0}]
+    res = scan(path)
+    assert res["links"] == links
+    assert res["issues"][0].startswith("External Links: Network dependency detected on 2 source(s) (file:///C:/Data/Rates.xlsx, Excel|Prices)")
+
+
+def test_pivot_caches_over_the_same_range_are_duplicates(tmp_path):
+    records = b"<r/>" * 1000
+    parts = dict(pivot_cache(1, 'sheet="Data" ref="A1:C50"', records, 'recordCount="49"'),
+                 **pivot_cache(2, 'sheet="data" ref="$A$1:$C$50"', records, 'recordCount="49"'),
+                 **pivot_cache(3, 'sheet="Data" ref="E1:F9"', records, 'refreshOnLoad="1"'),
+                 **pivot_cache(4, 'sheet="Data" ref="H1:H9"', None))
+    wb_rels = {f"rId{10 + n}": (f"pivotCache/pivotCacheDefinition{n}.xml", "pivotCacheDefinition") for n in (1, 2, 3, 4)}
+    path = xlsx(tmp_path / "pivots.xlsx", [("Data", "<sheetData/>")], parts=parts, wb_rels=wb_rels)
+    with zipfile.ZipFile(path) as zf: caches = read_pivot_caches(zf, "xl/workbook.xml")
+    first, twin, refreshed, unsaved = caches
+    assert twin.duplicate_of is first and first.duplicate_of is None and refreshed.duplicate_of is None
+    assert first.recoverable() == 4000 and twin.recoverable() == 4000 + twin.definition_bytes
+    assert (refreshed.reason(), unsaved.save_data, unsaved.recoverable()) == ("rebuilt on open anyway", False, 0)
+    issue = scan(path)["issues"][0]
+    assert issue.startswith("Pivot Cache Bloat: 0.01 MB recoverable from 3 of 4 pivot caches (cache 2 data!$A$1:$C$50, 49 records")
+    assert "duplicate of cache 1" in issue and "cache 3 Data!E1:F9, 0 records" in issue
+
+
+STYLES = ('<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+          '<numFmts count="2"><numFmt numFmtId="164" formatCode="0.0%"/><numFmt numFmtId="165" formatCode="0.0%"/></numFmts>'
+          '<fonts count="3"><font><sz val="11"/><name val="Calibri"/></font><font><sz val="11"/><name val="Calibri"/></font>'
+          '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+          '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+          '<borders count="1"><border><left/><right/><top/><bottom/></border></borders>'
+          '<cellStyleXfs count="2"><xf fontId="0"/><xf fontId="2"/></cellStyleXfs>'
+          '<cellXfs count="6"><xf fontId="0" xfId="0"/><xf fontId="2" xfId="0"/><xf fontId="1" xfId="0"/>'
+          '<xf numFmtId="164" xfId="0"/><xf numFmtId="165" xfId="0"/><xf fontId="2" xfId="1"/></cellXfs>'
+          '<cellStyles count="2"><cellStyle name="Normal" xfId="0" builtinId="0"/><cellStyle name="Heading" xfId="1"/></cellStyles>'
+          '</styleSheet>')
+
+
+def test_style_table_duplicates_and_unused_formats(tmp_path, monkeypatch):
+    body = ('<cols><col min="1" max="1" style="4"/></cols><sheetData><row r="1" s="3" customFormat="1">'
+            '<c r="A1" s="1"><v>1</v></c></row><row r="2" s="2"><c r="A2"><v>2</v></c></row></sheetData>')
+    path = xlsx(tmp_path / "styles.xlsx", [("Data", body)], parts={"xl/styles.xml": STYLES},
+                wb_rels={"rId20": ("styles.xml", "styles")})
+    with zipfile.ZipFile(path) as zf: summary = forensic_styles.read_styles(zf, "xl/styles.xml")
+    assert summary.counts == {"numFmts": 2, "fonts": 3, "fills": 1, "borders": 1, "cellStyleXfs": 2, "cellXfs": 6,
+                              "cellStyles": 2, "dxfs": 0}
+    # font 1 repeats font 0, so xf 2 repeats xf 0; numFmt 165 repeats 164, so xf 4 repeats xf 3
+    assert summary.duplicates == dict(summary.duplicates, numFmts=1, fonts=1, cellXfs=2, cellStyleXfs=0)
+    assert summary.cell_xfs == [0, 0, 0, 0, 0, 1] and summary.styles == [("Normal", 0, True), ("Heading", 1, False)]
+    assert scan(path)["issues"] == []
+    monkeypatch.setattr(forensic_styles, "XF_LIMIT", 5)
+    assert scan(path)["issues"] == ["Style Bloat: 6 cell formats (2 unused, 2 duplicates), 1 custom cell styles (1 unused); "
+                                    "fonts 3 (1 dup), fills 1 (0 dup), borders 1 (0 dup), number formats 2 (1 dup)."]
+
+
+def test_conditional_format_fragments_group_copies_of_one_rule(tmp_path, monkeypatch):
+    cf = "".join(f'<conditionalFormatting sqref="A{r}"><cfRule type="expression" dxfId="0" priority="{r}"><formula>A{r}&gt;0</formula>'
+                 f'</cfRule></conditionalFormatting>' for r in range(1, 6))
+    cf += ('<conditionalFormatting sqref="B1:B10 D1:D10"><cfRule type="cellIs" dxfId="1" priority="9" operator="greaterThan">'
+           '<formula>5</formula></cfRule></conditionalFormatting>')
+    ext = ('<extLst><ext uri="{78C0D931-6437-407d-A8EE-F0AAD7539E65}" xmlns:x14="http://schemas.microsoft.com/office/spreadsheetml/2009/9/main">'
+           '<x14:conditionalFormattings><x14:conditionalFormatting xmlns:xm="http://schemas.microsoft.com/office/excel/2006/main">'
+           '<x14:cfRule type="expression" priority="10" id="{00000000-0000-0000-0000-000000000001}"><xm:f>A6&gt;0</xm:f></x14:cfRule>'
+           '<xm:sqref>A6</xm:sqref></x14:conditionalFormatting></x14:conditionalFormattings></ext></extLst>')
+    path = xlsx(tmp_path / "cf.xlsx", [("Data", '<sheetData><row r="1"><c r="A1"><v>1</v></c></row></sheetData>' + cf + ext)])
+    assert scan(path)["issues"] == []
+    monkeypatch.setattr(forensic_detectors, "CF_FRAGMENT_LIMIT", 7)
+    assert scan(path)["issues"] == ["Conditional Format Fragmentation (Data): 7 rules over 8 ranges covering 26 cells; "
+                                    "4 rules are copies that merge into 3 (largest: one expression rule split 5 ways)."]
+
+
+VALIDATIONS = ('<dataValidations count="4">'
+               '<dataValidation type="list" sqref="A1" prompt="Pick one"><formula1>$Z$1:$Z$5</formula1></dataValidation>'
+               '<dataValidation type="list" sqref="A2"><formula1>$Z$1:$Z$5</formula1></dataValidation>'
+               '<dataValidation type="custom" sqref="B1"><formula1>B1&gt;0</formula1></dataValidation>'
+               '<dataValidation type="custom" sqref="B2:B3"><formula1>B2&gt;0</formula1></dataValidation></dataValidations>')
+HYPERLINKS = ('<hyperlinks><hyperlink ref="A1" r:id="rId1"/><hyperlink ref="A2" r:id="rId2" display="again"/>'
+              '<hyperlink ref="A3" location="Data!B1"/><hyperlink ref="A4:A5" location="Data!B1" tooltip="back"/></hyperlinks>')
+
+
+def test_validation_and_hyperlink_fragments_count_bodies_cells_and_bytes(tmp_path, monkeypatch):
+    xml = f'<worksheet {NS}><sheetData/>{VALIDATIONS}{HYPERLINKS}</worksheet>'.encode()
+    det = RangeListDetector(None, None)
+    PartStream([det]).run(io.BytesIO(xml))
+    (dv_entries, dv_bodies, dv_cells, dv_bytes), (link_entries, link_bodies, link_cells, link_bytes) = det.tally.values()
+    assert (dv_entries, len(dv_bodies), dv_cells, dv_bytes) == (4, 2, 5, len(VALIDATIONS))
+    assert (link_entries, len(link_bodies), link_cells, link_bytes) == (4, 3, 5, len(HYPERLINKS))
+
+    rels = {1: {"rId1": ("https://example.com/a", "hyperlink", "External"), "rId2": ("https://example.com/a", "hyperlink", "External")}}
+    path = xlsx(tmp_path / "fragments.xlsx", [("Data", f"<sheetData/>{VALIDATIONS}{HYPERLINKS}")], sheet_rels=rels)
+    assert scan(path)["issues"] == []
+    monkeypatch.setattr(forensic_detectors, "VALIDATION_ENTRY_LIMIT", 3)
+    monkeypatch.setattr(forensic_detectors, "HYPERLINK_ENTRY_LIMIT", 3)
+    assert scan(path)["issues"] == [  # both r:ids lead to one URL, so there are two distinct destinations
+        "Data Validation Fragmentation (Data): 4 entries, 2 distinct rules, 5 cells covered, 0.00 MB of sheet XML.",
+        "Hyperlink Fragmentation (Data): 4 entries, 2 distinct targets, 5 cells covered, 0.00 MB of sheet XML."]
@@ -0,0 +1,147 @@
+import threading, time
+from forensic_com import ComBackend
+from forensic_pool import ExcelWorkerPool, BatchAudit
+from forensic_standin import StandInExcel
+
+
+def make_books(tmp_path, specs):
+    """Write one placeholder file per spec (ComBackend stats the path) and key the stand-in library by it."""
+    library, paths = {}, []
+    for i, spec in enumerate(specs):
+        path = tmp_path / f"book{i}.xlsx"
+        path.write_bytes(b"\0" * 1024)
+        library[str(path)] = spec
+        paths.append(str(path))
+    return library, paths
+
+
+def standin_pool(library, workers=2, timeout=None, apps=None, **backend_kw):
+    def factory():
+        app = StandInExcel(library)
+        if apps is not None: apps.append(app)
+        return app
+    return ExcelWorkerPool(workers, lambda: ComBackend(app_factory=factory, **backend_kw), timeout=timeout)
+
+
+def test_results_come_back_in_input_order(tmp_path):
+    specs = [{"sheets": [{"name": f"S{i}", "rows": i + 1}], "delay": 0.05 * (5 - i)} for i in range(5)]
+    library, paths = make_books(tmp_path, specs)
+    pool = standin_pool(library, workers=3)
+    seen = []
+    try: results = pool.map(paths, on_result=lambda i, res: seen.append(i))
+    finally: pool.close()
+    assert [r["name"] for r in results] == [f"book{i}.xlsx" for i in range(5)]
+    assert [r["dims"] for r in results] == [f"[{i + 1}R x 1C]" for i in range(5)]
+    assert sorted(seen) == list(range(5))
+
+
+def test_detectors_run_on_standin_sheets(tmp_path):
+    spec = {"sheets": [{"name": "Data", "rows": 10, "last_row": 9000, "formulas": ["=OFFSET(A1,1,1)", "=SUM(B:B)"]}],
+            "vba": True, "links": ("\\\\srv\\share\\a.xlsx",)}
+    library, paths = make_books(tmp_path, [spec])
+    pool = standin_pool(library, workers=1)
+    try: (res,) = pool.map(paths)
+    finally: pool.close()
+    text = " | ".join(res["issues"])
+    assert res["health"] == "Needs Optimization"
+    assert "Phantom Data (Data): 9000 rows" in text
+    assert "Volatile Lag (Data): OFFSET x1 in 1 cells" in text
+    assert "VBA Metadata" in text and "External Links" in text
+
+
+def test_watchdog_kills_hung_worker_and_respawns(tmp_path):
+    specs = [{"delay": 60}, {}, {}]
+    library, paths = make_books(tmp_path, specs)
+    apps = []
+    pool = standin_pool(library, workers=1, timeout=0.3, apps=apps)
+    try: results = pool.map(paths)
+    finally: pool.close()
+    assert results[0]["dims"] == "TIMEOUT" and results[0]["health"] == "Critical"
+    assert [r["dims"] for r in results[1:]] == ["[1R x 1C]", "[1R x 1C]"]
+    assert apps[0].killed.is_set()
+    assert len(apps) == 2  # the killed instance was replaced by a fresh worker
+
+
+def test_close_cancels_a_running_batch(tmp_path):
+    library, paths = make_books(tmp_path, [{"delay": 60}, {}, {}])
+    apps, out = [], []
+    pool = standin_pool(library, workers=1, apps=apps)
+    batch = threading.Thread(target=lambda: out.append(pool.map(paths)))
+    batch.start()
+    while not pool.workers or not pool.workers[0].current: time.sleep(0.01)
+    started = time.monotonic()
+    pool.close(timeout=0.2)
+    batch.join(5)
+    assert time.monotonic() - started < 3 and not batch.is_alive()
+    assert apps[0].killed.is_set()
+    assert all(r["dims"] == "ERR" for r in out[0])
+    assert pool.map(paths)[0]["issues"][0].startswith("Cancelled")  # a closed pool starts nothing new
+    assert len(apps) == 1
+
+
+def test_workers_stay_warm_across_batches(tmp_path):
+    library, paths = make_books(tmp_path, [{}, {}])
+    apps = []
+    pool = standin_pool(library, workers=1, apps=apps)
+    try:
+        pool.map(paths)
+        pool.map(paths)
+    finally: pool.close()
+    assert len(apps) == 1 and apps[0].opened == paths * 2
+    assert apps[0].quit
+
+
+def test_instance_is_recycled_after_limit(tmp_path):
+    library, paths = make_books(tmp_path, [{}] * 5)
+    apps = []
+    pool = standin_pool(library, workers=1, apps=apps, recycle_after=2)
+    try: pool.map(paths)
+    finally: pool.close()
+    assert [len(a.opened) for a in apps] == [2, 2, 1]
+    assert all(a.quit for a in apps)
+
+
+def test_password_list_opens_protected_books(tmp_path):
+    library, paths = make_books(tmp_path, [{"password": "s3cret"}, {"password": "other"}, {}])
+    pool = standin_pool(library, workers=2)
+    try:
+        locked = pool.map(paths)
+        opened = pool.map(paths, passwords=["wrong", "s3cret"])
+    finally: pool.close()
+    assert [r["dims"] for r in locked] == ["LOCKED", "LOCKED", "[1R x 1C]"]
+    assert [r["dims"] for r in opened] == ["[1R x 1C]", "LOCKED", "[1R x 1C]"]
+
+
+def test_password_prompt_is_asked_for_the_file(tmp_path):
+    library, paths = make_books(tmp_path, [{"password": "typed"}])
+    asked = []
+    def prompt(name):
+        asked.append(name)
+        return "typed"
+    pool = standin_pool(library, workers=1)
+    try: (res,) = pool.map(paths, password_prompt=prompt)
+    finally: pool.close()
+    assert asked == ["book0.xlsx"] and res["dims"] == "[1R x 1C]"
+
+
+def test_locked_result_from_plain_pass_joins_the_deferred_queue(tmp_path):
+    library, paths = make_books(tmp_path, [{"password": "s3cret"}, {"password": "other"}, {}])
+    reported = []
+    pool = standin_pool(library, workers=1)
+    try:
+        audit = BatchAudit(pool, paths, on_result=lambda i, res: reported.append((i, res["dims"])))
+        locked = audit.run(passwords=["s3cret"])
+    finally: pool.close()
+    assert locked == [1]
+    assert sorted(reported) == [(0, "[1R x 1C]"), (2, "[1R x 1C]")]  # the still-locked file is left to the caller
+
+
+def test_failed_workbook_is_closed_in_the_warm_instance(tmp_path):
+    library, paths = make_books(tmp_path, [{"error": "Call was rejected by callee."}, {}])
+    apps = []
+    pool = standin_pool(library, workers=1, apps=apps)
+    try: results = pool.map(paths)
+    finally: pool.close()
+    assert results[0]["dims"] == "ERR" and "rejected" in results[0]["issues"][0]
+    assert results[1]["dims"] == "[1R x 1C]"
+    assert apps[0].Workbooks.Count == 0
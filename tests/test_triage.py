@@ -0,0 +1,35 @@
+import zipfile
+from forensic_triage import MB, rank, split_batch, triage
+from builders import xlsx
+
+CLEAN = '<sheetData><row r="1"><c r="A1"><v>1</v></c></row></sheetData>'
+
+
+def test_triage_reads_the_central_directory_only(tmp_path, monkeypatch):
+    path = xlsx(tmp_path / "m.xlsm", [("Data", CLEAN)], parts={"xl/vbaProject.bin": b"x" * 100,
+                                                               "xl/macrosheets/sheet1.xml": b"<xm/>"})
+    def refuse(*a, **kw): raise AssertionError("triage inflated a part")
+    monkeypatch.setattr(zipfile.ZipFile, "open", refuse)
+    prof = triage(str(path), detail=True)
+    assert prof["macros"] == {"vba": ["xl/vbaProject.bin"], "macrosheets": ["xl/macrosheets/sheet1.xml"], "activex": []}
+    assert prof["vba"] == 100
+    sizes = {name: size for name, _, size in prof["parts"]}
+    assert sizes["xl/vbaProject.bin"] == 100 and prof["uncompressed"] == sum(sizes.values())
+
+
+def test_rank_orders_by_bloat_and_split_batch_keeps_flagged_files(tmp_path):
+    clean = str(xlsx(tmp_path / "clean.xlsx", [("Data", CLEAN)]))
+    media = str(xlsx(tmp_path / "media.xlsx", [("Data", CLEAN)], parts={"xl/media/image1.png": b"\0" * (6 * MB)}))
+    pivot = str(xlsx(tmp_path / "pivot.xlsx", [("Data", CLEAN)],
+                     parts={"xl/pivotCache/pivotCacheRecords1.xml": b"\0" * (8 * MB)}))
+    legacy = tmp_path / "old.xls"
+    legacy.write_bytes(b"not a zip")
+    missing = str(tmp_path / "gone.xlsx")
+    profiles = rank([clean, media, missing, pivot, str(legacy)])
+    assert [p["name"] for p in profiles[:2]] == ["pivot.xlsx", "media.xlsx"]
+    assert profiles[0]["flags"] == ["Pivot Cache Bloat: 8.0 MB of cached records."]
+    assert profiles[1]["flags"] == ["Media Bloat: 6.0 MB of embedded images."]
+    assert next(p for p in profiles if p["path"] == missing)["container"] == "err"
+    suspicious, ranked = split_batch([clean, media, missing, pivot, str(legacy)])
+    assert suspicious == [p["path"] for p in ranked if p["path"] != clean]
+    assert clean not in suspicious and set(suspicious) == {media, pivot, missing, str(legacy)}
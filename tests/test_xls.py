@@ -0,0 +1,87 @@
+import struct
+from forensic_cfb import CompoundFile
+from forensic_engine import get_backend, partition_encrypted
+from forensic_xls import XlsWorkbook
+from builders import (biff, biff_dimensions, biff_formula, biff_name, biff_number, biff_ref, biff_shrfmla, compound_file, xls)
+
+INT = lambda n: b"\x1e" + struct.pack("<H", n)
+FUNC_VAR = lambda argc, iftab: b"\x22" + bytes([argc]) + struct.pack("<H", iftab)
+PTG_EXP = lambda row, col: b"\x01" + struct.pack("<HH", row, col)
+
+
+def scan(path): return get_backend("ooxml").scan(str(path))
+
+
+def shared_sheet():
+    """A1:A3 share OFFSET(B<row>,0,0); B1:B3 hold numbers."""
+    shared = b"\x2c" + struct.pack("<HH", 0, 0xC001) + INT(0) + INT(0) + FUNC_VAR(3, 78)
+    body = biff_dimensions(0, 3, 0, 2)
+    body += biff_formula(0, 0, PTG_EXP(0, 0)) + biff_shrfmla(0, 2, 0, 0, shared) + biff_number(0, 1)
+    for r in (1, 2): body += biff_formula(r, 0, PTG_EXP(0, 0)) + biff_number(r, 1)
+    return body
+
+
+def test_globals_sheets_offsets_and_names(tmp_path):
+    rate = b"\x3a" + struct.pack("<H", 0) + biff_ref(0, 1, False, False)  # PtgRef3d into the first sheet
+    externsheet = biff(0x0017, struct.pack("<H", 1) + struct.pack("<HHH", 0, 0, 0))
+    supbook = biff(0x01AE, struct.pack("<HH", 2, 0x0401))
+    path = xls(tmp_path / "book.xls", [("Inputs", biff_number(0, 0)), ("Calc", shared_sheet())],
+               globals_extra=supbook + externsheet + biff_name("Rate", rate, hidden=True))
+    with CompoundFile(path) as cf: book = XlsWorkbook(cf)
+    assert [s.name for s in book.sheets] == ["Inputs", "Calc"]
+    assert sorted(book.offsets) == [0, 1] and not book.encrypted
+    assert [(n, flags & 1) for n, _, flags, _ in book.names] == [("Rate", 1)]
+
+
+def test_globals_records_are_joined_across_continue(tmp_path):
+    def spanning(rt, data):  # MS-XLS caps a record at 8224 bytes and carries the rest in CONTINUE records
+        return biff(rt, data[:8224]) + b"".join(biff(0x003C, data[i:i + 8224]) for i in range(8224, len(data), 8224))
+    xti = struct.pack("<H", 2000) + struct.pack("<HHH", 0, 0, 0) * 2000
+    rgce = INT(1) + (INT(1) + b"\x03") * 2100  # 1+1+1+... : a 8403-byte formula
+    name = biff_name("Total", rgce)[4:]
+    path = xls(tmp_path / "long.xls", [("Data", biff_number(0, 0))],
+               globals_extra=biff(0x01AE, struct.pack("<HH", 1, 0x0401)) + spanning(0x0017, xti) + spanning(0x0018, name))
+    with CompoundFile(path) as cf: book = XlsWorkbook(cf)
+    assert len(book.xti) == 2000
+    assert book.names == [("Total", 0xFFFFFFFF, 0, rgce)]
+    assert scan(path)["dims"] == "[1R x 1C]"
+
+
+def test_sheet_replay_folds_shared_formulas(tmp_path):
+    res = scan(xls(tmp_path / "calc.xls", [("Calc", shared_sheet())]))
+    assert res["dims"] == "[3R x 2C]"
+    assert any(i.startswith("Volatile Lag (Calc): OFFSET x3 in 3 cells") for i in res["issues"]), res["issues"]
+
+
+def test_filepass_is_locked_and_vba_storage_is_reported(tmp_path):
+    locked = scan(xls(tmp_path / "secret.xls", [("S", biff_number(0, 0))], encrypted=True))
+    assert locked["dims"] == "LOCKED" and locked["health"] == "Critical"
+    macro = scan(xls(tmp_path / "macro.xls", [("S", biff_number(0, 0))], storages={"_VBA_PROJECT_CUR": {"VBA": {"dir": b"x" * 10}}}))
+    assert "VBA Metadata: Script-based security risk." in macro["issues"]
+
+
+def test_filepass_xls_is_deferred_with_encrypted_packages(tmp_path):
+    paths = [xls(tmp_path / "plain.xls", [("S", biff_number(0, 0))]),
+             xls(tmp_path / "secret.xls", [("S", biff_number(0, 0))], encrypted=True)]
+    assert partition_encrypted(paths) == ([0], [1])
+
+
+def test_vba_module_sheets_are_vba_not_xlm(tmp_path):
+    boundsheet = lambda name, kind: biff(0x0085, struct.pack("<IBB", 0, 0, kind) + bytes([len(name), 0]) + name.encode())
+    res = scan(xls(tmp_path / "modules.xls", [("S", biff_number(0, 0))], globals_extra=boundsheet("Macro1", 1) + boundsheet("Module1", 6)))
+    assert "VBA Metadata: Script-based security risk." in res["issues"]
+    assert "Excel 4.0 Macros: 1 macro sheet(s) run XLM code outside the VBA project (Macro1)." in res["issues"]
+
+
+def test_biff5_workbook_is_refused(tmp_path):
+    path = compound_file(tmp_path / "old.xls", {"Book": b"\0" * 64})
+    assert scan(path)["issues"][0].startswith("Unsupported Format: pre-Excel 97")
+
+
+def test_pivot_caches_read_savedata_and_record_count_from_sxdb(tmp_path):
+    sxdb = lambda count, flags: biff(0x00C6, struct.pack("<iHH", count, 1, flags) + b"\0" * 12) + b"\0" * (1200 * 1024)
+    path = xls(tmp_path / "pivots.xls", [("S", biff_number(0, 0))],
+               storages={"_SX_DB_CUR": {"0001": sxdb(5000, 1), "0002": sxdb(7000, 0)}})
+    (issue,) = [p for p in scan(path)["issues"] if p.startswith("Pivot Cache Bloat")]
+    assert issue.startswith("Pivot Cache Bloat: ~1.17 MB recoverable from 1 of 2 pivot caches (cache 0001")
+    assert "5000 records, ~1.17 MB (estimated from the cache stream): saved source data" in issue
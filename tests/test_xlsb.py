@@ -0,0 +1,75 @@
+import struct
+from forensic_engine import get_backend
+from forensic_xlsb import BIFF12, decompile
+from builders import brt, brt_dimension, brt_formula, brt_num, brt_ref, brt_rfx, brt_row, brt_table, wide, xlsb
+
+INT = lambda n: b"\x1e" + struct.pack("<H", n)
+FUNC = lambda iftab: b"\x21" + struct.pack("<H", iftab)
+FUNC_VAR = lambda argc, iftab: b"\x22" + bytes([argc]) + struct.pack("<H", iftab)
+REF_N = lambda drow, dcol: b"\x2c" + struct.pack("<iH", drow, (dcol & 0x3FFF) | 0xC000)
+LIST = lambda list_id, flags, c1=0, c2=0: b"\x18\x19" + struct.pack("<HHIHH", 0, flags, list_id, c1, c2)
+PTG_EXP = lambda row: b"\x01" + struct.pack("<I", row)
+
+
+class Book:
+    xti, tables = [], {3: ("Sales", ["Region", "Q1", "Q2"])}
+    names = [("Rate", 0xFFFFFFFF, 0, b"")]
+
+    def name_text(self, index): return self.names[index - 1][0]
+
+
+def test_decompile_operators_functions_and_names():
+    book = Book()
+    assert decompile(b"\x24" + brt_ref(0, 0) + INT(2) + b"\x05", book) == "A1*2"
+    assert decompile(b"\x24" + brt_ref(0, 1, False, False) + FUNC(74) + b"\x03", book) == "$B$1+NOW()"
+    area = b"\x25" + struct.pack("<IIHH", 0, 9, 0xC000, 0xC000)
+    assert decompile(area + FUNC_VAR(1, 4), book) == "SUM(A1:A10)"
+    assert decompile(b"\x23" + struct.pack("<I", 1), book) == "Rate"
+    assert decompile(REF_N(-1, 1), book, 5, 2, BIFF12) == "D5"
+    assert decompile(LIST(3, 1, 1), book) == "Sales[Q1]"
+    assert decompile(LIST(3, 2 | 0x02 << 2, 1, 2), book) == "Sales[[#Headers],[Q1]:[Q2]]"
+    assert decompile(LIST(3, 0x01 << 2), book) == "Sales[#All]"
+    assert decompile(LIST(9, 0), book) == "_TABLE9[]"
+
+
+def test_xlsb_sheet_replays_cells_and_shared_formulas(tmp_path):
+    shared = REF_N(0, 1) + INT(0) + INT(0) + FUNC_VAR(3, 78)  # OFFSET(B<row>,0,0) anchored at A1
+    rows = brt_row(0) + brt_formula(0, PTG_EXP(0)) + brt(428, struct.pack("<IIII", 0, 2, 0, 0) + struct.pack("<I", len(shared)) + shared + struct.pack("<I", 0))
+    rows += brt_num(1, 5.0)
+    for r in (1, 2): rows += brt_row(r) + brt_formula(0, PTG_EXP(0)) + brt_num(1, 5.0)
+    body = brt_dimension(0, 2, 0, 1) + rows
+    res = get_backend("ooxml").scan(xlsb(tmp_path / "book.xlsb", [("Calc", body)]))
+    assert res["dims"] == "[3R x 2C]"
+    assert any(i.startswith("Volatile Lag (Calc): OFFSET x3 in 3 cells") for i in res["issues"]), res["issues"]
+
+
+def test_xlsb_defined_names_are_decompiled(tmp_path):
+    body = brt_dimension(0, 0, 0, 0) + brt_row(0) + brt_num(0, 1.0)
+    broken = b"\x2a" + struct.pack("<IH", 0, 0)  # PtgRefErr
+    res = get_backend("ooxml").scan(xlsb(tmp_path / "names.xlsb", [("S", body)], names=[("Gone", broken)]))
+    assert "Defined Names: 1 names; 1 broken #REF! (e.g. Gone); 1 unused (e.g. Gone)." in res["issues"]
+
+
+def test_xlsb_conditional_formats_validations_and_hyperlinks_are_replayed(tmp_path):
+    body = brt_dimension(0, 0, 0, 0) + brt_row(0) + brt_num(0, 1.0)
+    rule = lambda pri: brt(463, struct.pack("<IIIIIIIHIII", 2, 0, 0, pri, 0, 0, 0, 0, 3, 0, 0) + struct.pack("<I", 0xFFFFFFFF) + INT(1) + b"\0")
+    tail = b"".join(brt(461, struct.pack("<II", 1, 0) + struct.pack("<I", 1) + brt_rfx(r, r, 0, 0)) + rule(r) + brt(464) + brt(462)
+                    for r in range(1200))
+    dval = brt(64, struct.pack("<I", 3) + struct.pack("<I", 1) + brt_rfx(0, 0, 1, 1) + struct.pack("<I", 0xFFFFFFFF) * 4
+               + struct.pack("<I", 3) + INT(1) + struct.pack("<I", 0) + struct.pack("<II", 0, 0))
+    tail += brt(573, struct.pack("<HIIII", 0, 0, 0, 0, 1001)) + dval * 1001 + brt(574)
+    tail += brt(494, brt_rfx(0, 0, 2, 2) + struct.pack("<I", 0xFFFFFFFF) + wide("Sheet1!A1") + wide("") + wide("")) * 10001
+    res = get_backend("ooxml").scan(xlsb(tmp_path / "ranges.xlsb", [("S", body)], tails={1: tail}))
+    text = " | ".join(res["issues"])
+    assert "Conditional Format Fragmentation (S): 1200 rules over 1200 ranges covering 1200 cells; 1199 rules are copies" in text
+    assert "Data Validation Fragmentation (S): 1001 entries, 1 distinct rules, 1001 cells covered." in text
+    assert "Hyperlink Fragmentation (S): 10001 entries, 1 distinct targets, 10001 cells covered." in text
+
+
+def test_xlsb_table_references_reach_the_formula_checks(tmp_path):
+    volatile = LIST(7, 1, 1) + INT(0) + INT(0) + FUNC_VAR(3, 78)  # OFFSET(Sales[Amount],0,0)
+    body = brt_dimension(0, 1, 0, 0) + brt_row(0) + brt_formula(0, volatile) + brt_row(1) + brt_formula(0, b"\x02" + b"\0" * 4)
+    path = xlsb(tmp_path / "tables.xlsb", [("S", body)], parts={"xl/tables/table1.bin": brt_table(7, "Sales", ["Region", "Amount"])})
+    res = get_backend("ooxml").scan(path)
+    assert any(i.startswith("Volatile Lag (S): OFFSET x1 in 1 cells") for i in res["issues"]), res["issues"]
+    assert any(i.startswith("Unparsed Formulas: 1 distinct formulas") for i in res["issues"]), res["issues"]